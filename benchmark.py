@@ -0,0 +1,341 @@
+// benchmark/chatbot_benchmark.dart
+//
+// Hot-path benchmarks for the chatbot services, run over synthetic message
+// corpora:
+//
+//   dart run benchmark/chatbot_benchmark.dart [--sizes=1000,100000,1000000] [--case=classify] [--json]
+//
+// Each case reports throughput, p50/p95/p99 latency and the process RSS
+// growth per call (the VM exposes no per-call allocation counter outside
+// the service protocol, so RSS growth is the portable stand-in). The lookup
+// cases exercise the constant tables in ResourceRegistry and the services,
+// which should show no RSS growth at all.
+import 'dart:convert';
+import 'dart:io';
+import 'dart:math';
+
+import 'package:pondy_travel_companion/models/poi.dart';
+import 'package:pondy_travel_companion/services/ai_service.dart';
+import 'package:pondy_travel_companion/services/candidate_table.dart';
+import 'package:pondy_travel_companion/services/chatbot_engine.dart';
+import 'package:pondy_travel_companion/services/conversation_store.dart';
+import 'package:pondy_travel_companion/services/itinerary_planner.dart';
+import 'package:pondy_travel_companion/services/itinerary_replanner.dart';
+import 'package:pondy_travel_companion/services/itinerary_service.dart';
+import 'package:pondy_travel_companion/services/location_service.dart';
+import 'package:pondy_travel_companion/services/poi_catalog.dart';
+import 'package:pondy_travel_companion/services/pondy_guide.dart';
+import 'package:pondy_travel_companion/services/realtime_data_service.dart';
+import 'package:pondy_travel_companion/services/recommendation_engine.dart';
+import 'package:pondy_travel_companion/services/resource_registry.dart';
+import 'package:pondy_travel_companion/services/response_stream.dart';
+import 'package:pondy_travel_companion/services/semantic_index.dart';
+import 'package:pondy_travel_companion/services/translation_catalog.dart';
+import 'package:pondy_travel_companion/services/translation_service.dart';
+
+const List<int> _defaultSizes = [1000, 10000, 100000];
+
+const List<String> _prefixes = ['', 'hey ', 'can you tell me about ', 'i would love some ', 'Bonjour! any '];
+const List<String> _topics = [
+  'temples', 'beach adventure', 'cheap food', 'bike rental', 'weather today',
+  'nightlife and club', 'plan a 3 day trip', 'museum history', 'where can i buy spices',
+  'somewhere quiet to pray', 'hotel stay', 'festival events', 'scuba diving price',
+];
+const List<String> _suffixes = [
+  '', ' please', ' in pondicherry?', ', it was amazing', ', the last place was terrible',
+  ' not good for kids', ' really beautiful',
+];
+const List<String> _interests = ['devotional', 'adventure', 'culture', 'food'];
+const List<String> _budgets = ['budget', 'moderate', 'luxury'];
+const List<String> _timesOfDay = ['morning', 'afternoon', 'evening'];
+const List<String> _categories = ['devotional', 'adventure', 'culture', 'food', 'party', 'relaxation'];
+const List<int> _durations = [45, 60, 90, 120, 180];
+const List<int> _costs = [0, 0, 100, 500, 1500];
+final List<String> _languages = ResourceRegistry.languageCodes.keys.toList(growable: false);
+
+List<String> syntheticCorpus(int size, {int seed = 42}) {
+  Random random = Random(seed);
+  return List<String>.generate(size, (_) {
+    return _prefixes[random.nextInt(_prefixes.length)] +
+        _topics[random.nextInt(_topics.length)] +
+        _suffixes[random.nextInt(_suffixes.length)];
+  }, growable: false);
+}
+
+// Attractions scattered over the Pondicherry area with random categories,
+// windows, durations and fees, for sizing the itinerary planner.
+List<Attraction> syntheticAttractions(int size, {int seed = 7}) {
+  Random random = Random(seed);
+  return List<Attraction>.generate(size, (i) {
+    return Attraction(
+      name: 'Attraction $i',
+      category: _categories[random.nextInt(_categories.length)],
+      description: '',
+      location: 'Area ${i % 20}',
+      coordinates: GeoPoint(11.90 + random.nextDouble() * 0.12, 79.75 + random.nextDouble() * 0.12),
+      crowdLevel: CrowdLevel.values[random.nextInt(CrowdLevel.values.length)],
+      bestTime: VisitTime.values[random.nextInt(VisitTime.values.length)],
+      story: '',
+      durationMinutes: _durations[random.nextInt(_durations.length)],
+      cost: _costs[random.nextInt(_costs.length)],
+    );
+  }, growable: false);
+}
+
+// Recommendation records in the shape RecommendationEngine's seed table uses
+List<Map<String, dynamic>> syntheticCandidates(int size, {int seed = 13}) {
+  const List<String> costLevels = ['low', 'moderate', 'high'];
+  Random random = Random(seed);
+  return List<Map<String, dynamic>>.generate(size, (i) {
+    return {
+      'name': 'Candidate $i',
+      'type': _categories[random.nextInt(_categories.length)],
+      'relevance_score': random.nextDouble(),
+      'cost_level': costLevels[random.nextInt(3)],
+      'description': '',
+      'times': [_timesOfDay[random.nextInt(_timesOfDay.length)]],
+      'crowd_level': ResourceRegistry.crowdLevels[random.nextInt(3)],
+      'lat': 11.90 + random.nextDouble() * 0.12,
+      'lng': 79.75 + random.nextDouble() * 0.12,
+    };
+  }, growable: false);
+}
+
+// Realtime changes in the shape chatbot.dart produces every 30 s
+List<RealtimeDiff> syntheticRealtimeDiffs(int size, {int seed = 11}) {
+  const List<String> places = ['Sri Aurobindo Ashram', 'Promenade Beach', 'Paradise Beach', 'French Quarter'];
+  const List<String> roads = ['Mission Street', 'MG Road', 'ECR'];
+  Random random = Random(seed);
+  return List<RealtimeDiff>.generate(size, (_) {
+    return RealtimeDiff(
+      crowdLevels: {
+        for (String place in places)
+          if (random.nextBool()) place: ResourceRegistry.crowdLevels[random.nextInt(3)],
+      },
+      trafficConditions: {
+        for (String road in roads)
+          if (random.nextBool()) road: ResourceRegistry.trafficConditions[random.nextInt(3)],
+      },
+      weather: random.nextInt(4) == 0 ? ResourceRegistry.weatherConditions[random.nextInt(4)] : null,
+    );
+  }, growable: false);
+}
+
+class BenchmarkResult {
+  final String name;
+  final int operations;
+  final Duration total;
+  final List<int> latenciesNs;
+  final double rssBytesPerCall;
+
+  BenchmarkResult({
+    required this.name,
+    required this.operations,
+    required this.total,
+    required this.latenciesNs,
+    required this.rssBytesPerCall,
+  });
+
+  double get throughput => operations / (total.inMicroseconds / Duration.microsecondsPerSecond);
+
+  int percentileNs(double quantile) {
+    if (latenciesNs.isEmpty) return 0;
+    return latenciesNs[(quantile * (latenciesNs.length - 1)).round()];
+  }
+
+  Map<String, dynamic> toJson() {
+    return {
+      'name': name,
+      'operations': operations,
+      'total_ms': total.inMicroseconds / 1000,
+      'ops_per_sec': throughput.round(),
+      'p50_ns': percentileNs(0.50),
+      'p95_ns': percentileNs(0.95),
+      'p99_ns': percentileNs(0.99),
+      'rss_bytes_per_call': rssBytesPerCall,
+    };
+  }
+
+  @override
+  String toString() {
+    return '${name.padRight(52)} ${throughput.round().toString().padLeft(10)} ops/s'
+        '  p50 ${_formatNs(percentileNs(0.50))}  p95 ${_formatNs(percentileNs(0.95))}'
+        '  p99 ${_formatNs(percentileNs(0.99))}  rss ${rssBytesPerCall.toStringAsFixed(1)} B/call';
+  }
+
+  static String _formatNs(int ns) {
+    if (ns >= 1000000) return '${(ns / 1000000).toStringAsFixed(2)}ms'.padLeft(9);
+    if (ns >= 1000) return '${(ns / 1000).toStringAsFixed(2)}us'.padLeft(9);
+    return '${ns}ns'.padLeft(9);
+  }
+}
+
+BenchmarkResult runCase(String name, List<String> corpus, void Function(String message, int index) body) {
+  // Warm up so the JIT has compiled the hot path before we measure.
+  for (int i = 0; i < min(corpus.length, 2000); i++) {
+    body(corpus[i], i);
+  }
+
+  List<int> latencies = List<int>.filled(corpus.length, 0);
+  double nsPerTick = 1e9 / Stopwatch().frequency;
+  Stopwatch lap = Stopwatch();
+  Stopwatch total = Stopwatch();
+  int rssBefore = ProcessInfo.currentRss;
+
+  total.start();
+  for (int i = 0; i < corpus.length; i++) {
+    lap
+      ..reset()
+      ..start();
+    body(corpus[i], i);
+    latencies[i] = (lap.elapsedTicks * nsPerTick).round();
+  }
+  total.stop();
+
+  int rssGrowth = max(0, ProcessInfo.currentRss - rssBefore);
+  latencies.sort();
+
+  return BenchmarkResult(
+    name: '$name [${corpus.length}]',
+    operations: corpus.length,
+    total: total.elapsed,
+    latenciesNs: latencies,
+    rssBytesPerCall: rssGrowth / corpus.length,
+  );
+}
+
+Map<String, void Function(String, int)> buildCases() {
+  ChatbotAI ai = ChatbotAI();
+  Map<String, dynamic> context = ChatbotEngine.defaultContext();
+  Map<String, dynamic> realtimeData = ChatbotEngine.defaultRealtimeData();
+  PoiCatalog catalog = PoiCatalog.fromJson(File(PoiCatalog.assetPath).readAsStringSync());
+  PondyGuide guide = PondyGuide(catalog);
+  // What PoiCatalog.load does in the app
+  LocationService.registerLocations(catalog.coordinates);
+  ItineraryService.usePlanner(ItineraryPlanner(catalog.attractions));
+  List<ItineraryRequest> groupBooking = List<ItineraryRequest>.generate(16, (i) => ItineraryRequest(
+    days: 1 + i % 7,
+    interests: [_interests[i % _interests.length], _interests[(i + 1) % _interests.length]],
+    budget: _budgets[i % _budgets.length],
+  ));
+  ItineraryPlanner planner = ItineraryPlanner(syntheticAttractions(300));
+  Map<String, dynamic> shownItinerary = ItineraryService.generateItinerary(
+    days: 3,
+    interests: ['culture', 'adventure'],
+    budget: 'moderate',
+  );
+  ItineraryReplanner replanner = ItineraryReplanner(ItineraryService.planner);
+  List<RealtimeDiff> ticks = syntheticRealtimeDiffs(64);
+  CandidateTable largePool = CandidateTable.fromRecords(syntheticCandidates(100000));
+  GeoPoint whiteTown = GeoPoint(11.9344, 79.8309);
+  ConversationStore history = ConversationStore(capacity: 256);
+  // Never polls: nothing subscribes, so only publish() is measured
+  RealtimeDataService realtime = RealtimeDataService(fetch: () async => const {});
+  ai.semanticIndex = SemanticIndex.build(SemanticIndex.corpusFor(attractions: catalog.attractions));
+  SemanticIndex largeIndex = SemanticIndex.build(SemanticIndex.corpusFor(attractions: syntheticAttractions(5000)));
+  for (String code in ResourceRegistry.languageCodes.values) {
+    TranslationCatalog.shared.loadLocale(code, File(TranslationCatalog.assetPathFor(code)).readAsStringSync());
+  }
+
+  return {
+    'AIService.classifyIntent': (message, i) => AIService.classifyIntent(message),
+    'AIService.calculateSentiment': (message, i) => AIService.calculateSentiment(message),
+    'ChatbotAI.respond': (message, i) => ai.respond(
+      message: message,
+      context: context,
+      conversationHistory: const [],
+      realtimeData: realtimeData,
+    ),
+    'ResponseChunker.chunks + SentenceSplitter (streamed reply)': (message, i) {
+      SentenceSplitter sentences = SentenceSplitter();
+      for (String chunk in ResponseChunker.chunks(message)) {
+        sentences.add(chunk);
+      }
+      sentences.flush();
+    },
+    'ConversationStore.add + contextWindow (256-turn ring)': (message, i) {
+      history.add(ConversationTurn(role: i.isEven ? ConversationTurn.user : ConversationTurn.bot, text: message));
+      history.contextWindow(tokenBudget: 512);
+    },
+    'ItineraryService.generateItinerary': (message, i) => ItineraryService.generateItinerary(
+      days: 1 + i % 7,
+      interests: [_interests[i % _interests.length], _interests[(i + 1) % _interests.length]],
+      budget: _budgets[i % _budgets.length],
+    ),
+    'ItineraryService.generateItineraries (16 per call)': (message, i) =>
+        ItineraryService.generateItineraries(groupBooking),
+    'ItineraryPlanner.plan (300 POIs, 7-14 days)': (message, i) => planner.plan(
+      ItineraryRequest(
+        days: 7 + i % 8,
+        interests: [_interests[i % _interests.length], _interests[(i + 1) % _interests.length]],
+        budget: _budgets[i % _budgets.length],
+      ),
+      dailyAllowance: 2200,
+    ),
+    'ItineraryReplanner.replan (per itinerary per tick)': (message, i) =>
+        replanner.replan(shownItinerary, ticks[i % ticks.length]),
+    'RealtimeDataService.publish (per tick)': (message, i) => realtime.publish({
+      'weather': ResourceRegistry.weatherConditions[i % ResourceRegistry.weatherConditions.length],
+      'crowd_levels': {'Paradise Beach': ResourceRegistry.crowdLevels[i % ResourceRegistry.crowdLevels.length]},
+    }),
+    'RecommendationEngine.getPersonalizedRecommendations': (message, i) =>
+        RecommendationEngine.getPersonalizedRecommendations(
+      userPreferences: {
+        'interests': [_interests[i % _interests.length], 'adventure'],
+        'budget': _budgets[i % _budgets.length],
+      },
+      currentLocation: 'White Town',
+      timeOfDay: _timesOfDay[i % _timesOfDay.length],
+    ),
+    'CandidateTable.topK (100k candidates, k=5)': (message, i) => largePool.topK(
+      preferences: PreferenceVector.fromPreferences({'budget': _budgets[i % _budgets.length]}),
+      interests: {_interests[i % _interests.length], 'adventure'},
+      timeOfDay: _timesOfDay[i % _timesOfDay.length],
+      origin: whiteTown,
+    ),
+    'SemanticIndex.search (5k POIs, IVF)': (message, i) => largeIndex.search(message),
+    'PondyGuide.respond (home page _processUserMessage)': (message, i) => guide.respond(message),
+    'TranslationService.getLanguageCode (lookup)': (message, i) =>
+        TranslationService.getLanguageCode(_languages[i % _languages.length]),
+    'TranslationService.translate (lookup)': (message, i) =>
+        TranslationService.translate('best_time', ResourceRegistry.languageCodes[_languages[i % _languages.length]]!),
+    'ChatbotAI.getLocalizedMessage (lookup)': (message, i) =>
+        ai.getLocalizedMessage('language_changed', _languages[i % _languages.length]),
+    'LocationService.getTrafficCondition (lookup)': (message, i) => LocationService.getTrafficCondition('White Town'),
+  };
+}
+
+void main(List<String> arguments) {
+  bool json = arguments.contains('--json');
+  List<int> sizes = _defaultSizes;
+  String filter = '';
+
+  for (String argument in arguments) {
+    if (argument.startsWith('--sizes=')) {
+      sizes = argument.substring('--sizes='.length).split(',').map(int.parse).toList();
+    } else if (argument.startsWith('--case=')) {
+      filter = argument.substring('--case='.length).toLowerCase();
+    }
+  }
+
+  Map<String, void Function(String, int)> cases = buildCases();
+  List<BenchmarkResult> results = [];
+
+  for (int size in sizes) {
+    List<String> corpus = syntheticCorpus(size);
+    cases.forEach((name, body) {
+      if (filter.isNotEmpty && !name.toLowerCase().contains(filter)) return;
+      BenchmarkResult result = runCase(name, corpus, body);
+      results.add(result);
+      if (!json) print(result);
+    });
+  }
+
+  if (json) {
+    print(const JsonEncoder.withIndent('  ').convert({
+      'dart': Platform.version,
+      'sizes': sizes,
+      'results': results.map((result) => result.toJson()).toList(),
+    }));
+  }
+}
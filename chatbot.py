@@ -4,128 +4,297 @@ import 'package:flutter/services.dart';
 import 'package:speech_to_text/speech_to_text.dart';
 import 'package:flutter_tts/flutter_tts.dart';
 import 'package:geolocator/geolocator.dart';
+import 'package:path_provider/path_provider.dart';
+import 'dart:collection';
 import 'dart:convert';
+import 'dart:io';
 import 'dart:math';
 import 'dart:async';
 
+import 'services/chatbot_engine.dart';
+import 'services/itinerary_replanner.dart';
+import 'services/itinerary_service.dart';
+import 'services/knowledge_base.dart';
+import 'services/latency_policy.dart';
+import 'services/message_store.dart';
+import 'services/poi_catalog.dart';
+import 'services/realtime_data_service.dart';
+import 'services/resource_registry.dart';
+import 'services/response_stream.dart';
+import 'services/semantic_index.dart';
+import 'services/translation_catalog.dart';
+import 'services/translation_service.dart';
+import 'services/worker_pool.dart';
+
 class AdvancedChatbotScreen extends StatefulWidget {
+  // Earlier conversation to show, oldest first
+  final List<ChatMessage> initialMessages;
+  // Shared realtime source; the screen creates and owns one when null
+  final RealtimeDataService? realtime;
+
+  const AdvancedChatbotScreen({
+    Key? key,
+    this.initialMessages = const [],
+    this.realtime,
+  }) : super(key: key);
+
   @override
   _AdvancedChatbotScreenState createState() => _AdvancedChatbotScreenState();
 }
 
+// State is split into notifiers so each change rebuilds only the widgets
+// that show it: a new message rebuilds the list, a streamed chunk one
+// bubble, typing the indicator row, listening the mic icon, and a realtime
+// tick the status bar text. Nothing here calls setState on the screen.
 class _AdvancedChatbotScreenState extends State<AdvancedChatbotScreen>
-    with TickerProviderStateMixin {
+    with WidgetsBindingObserver {
   
   // Controllers and Core Variables
   final TextEditingController _messageController = TextEditingController();
   final ScrollController _scrollController = ScrollController();
   final SpeechToText _speechToText = SpeechToText();
   final FlutterTts _flutterTts = FlutterTts();
+  final Queue<String> _speechQueue = Queue<String>();
+  bool _speaking = false;
   
   // Chatbot State
-  List<ChatMessage> _messages = [];
-  bool _isTyping = false;
-  bool _isListening = false;
-  bool _speechEnabled = false;
-  String _selectedLanguage = 'English';
+  final ChatMessageList _messages = ChatMessageList();
+  final ValueNotifier<bool> _isTyping = ValueNotifier<bool>(false);
+  final ValueNotifier<bool> _isListening = ValueNotifier<bool>(false);
+  final ValueNotifier<bool> _speechEnabled = ValueNotifier<bool>(false);
+  final ValueNotifier<String> _selectedLanguage = ValueNotifier<String>('English');
   
   // User Context and Preferences
-  Map<String, dynamic> _userContext = {
-    'name': '',
-    'interests': <String>[],
-    'budget_preference': 'moderate',
-    'current_location': '',
-    'visit_history': <String, int>{},
-    'preferred_time': 'flexible',
-    'group_size': 1,
-    'visit_duration': 3, // days
-  };
+  Map<String, dynamic> _userContext = ChatbotEngine.defaultContext();
   
   // Real-time Data
-  Map<String, dynamic> _realtimeData = {
-    'weather': 'sunny',
-    'traffic_conditions': {},
-    'crowd_levels': {},
-    'events_today': [],
-    'special_offers': [],
-  };
+  late final RealtimeDataService _realtime = widget.realtime ?? RealtimeDataService(fetch: _fetchRealtimeData);
+  late final Stream<Object?> _weatherUpdates = _realtime.watch('weather');
+  StreamSubscription<RealtimeSnapshot>? _realtimeChanges;
   
   // Advanced AI Components
-  late ChatbotAI _ai;
-  late ConversationManager _conversationManager;
-  late PersonalizationEngine _personalizationEngine;
-  
-  // Animation Controllers
-  late AnimationController _typingAnimationController;
-  late AnimationController _messageAnimationController;
+  late ChatbotEngine _engine;
+  static const String _sessionId = 'local';
+  // Messages per history page, and how many stay in memory at the newest end
+  static const int _pageSize = 50;
+  static const int _maxInMemory = 200;
+  static const double _loadOlderThreshold = 600;
+  final LatencyPolicy _latencyPolicy = LatencyPolicy.production;
+  final Random _random = Random();
+  Map<String, dynamic>? _activeItinerary;
+  MessageStore? _store;
+  late final Future<void> _historyRestored;
+  bool _loadingOlder = false;
   
   @override
   void initState() {
     super.initState();
+    WidgetsBinding.instance.addObserver(this);
+    _scrollController.addListener(_onScroll);
+    // Restored history appears without entrance animations
+    _messages.addAll(widget.initialMessages);
+    _historyRestored = widget.initialMessages.isEmpty ? _restoreHistory() : Future.value();
     _initializeChatbot();
-    _initializeAnimations();
     _initializeSpeech();
     _initializeTTS();
   }
 
   void _initializeChatbot() async {
-    _ai = ChatbotAI();
-    _conversationManager = ConversationManager();
-    _personalizationEngine = PersonalizationEngine();
+    _engine = ChatbotEngine(
+      ai: ChatbotAI(latencyPolicy: _latencyPolicy),
+      realtimeData: Map<String, dynamic>.of(_realtime.current.toJson()),
+    );
+    _engine.setContext(_sessionId, _userContext);
+
+    // Spawn the background workers while the rest of start-up runs
+    WorkerPool.shared.warmUp();
     
     // Load user preferences
     await _loadUserPreferences();
-    
-    // Initialize with welcome message
-    await Future.delayed(Duration(milliseconds: 500));
-    _addMessage(_ai.generateWelcomeMessage(_userContext), false);
-    
-    // Start real-time data updates
+
+    // Greeting and realtime polling come first; nothing below is needed for them
     _startRealtimeUpdates();
+    await Future.wait([_historyRestored, Future.delayed(Duration(milliseconds: 500))]);
+    if (!mounted) return;
+    // Welcome only a fresh conversation
+    if (_messages.length == 0) {
+      _addMessage(_engine.ai.generateWelcomeMessage(_userContext), false);
+    }
+
+    // Each optional load below disables only its own feature on failure
+
+    // Catalog-backed planner for itineraries and their realtime re-planning
+    PoiCatalog? catalog;
+    try {
+      catalog = await PoiCatalog.load(() => rootBundle.loadString(PoiCatalog.assetPath));
+    } catch (e) {
+      // Itineraries fall back to the built-in day plans
+    }
+
+    // Load only the active locale's strings
+    try {
+      TranslationCatalog.shared.attach(rootBundle.loadString);
+      await TranslationCatalog.shared.setLocale(TranslationService.getLanguageCode(_selectedLanguage.value));
+    } catch (e) {
+      // Untranslated keys fall back to English or the key itself
+    }
+
+    // Index the place knowledge base for free-text questions
+    KnowledgeBase? knowledgeBase;
+    try {
+      knowledgeBase = KnowledgeBase.fromJson(await rootBundle.loadString('requirements.txt'));
+      _engine.ai.knowledgeBase = knowledgeBase;
+    } catch (e) {
+      // Free-text questions get the general reply
+    }
+
+    // Paraphrase matching; the built index is cached across launches
+    try {
+      Directory supportDir = await getApplicationSupportDirectory();
+      File indexFile = File('${supportDir.path}/${SemanticIndex.cacheFileName}');
+      _engine.ai.semanticIndex = await SemanticIndex.load(
+        corpus: SemanticIndex.corpusFor(
+          knowledgeBase: knowledgeBase,
+          attractions: catalog?.attractions ?? const [],
+        ),
+        read: () async => await indexFile.exists() ? await indexFile.readAsBytes() : null,
+        write: (bytes) => indexFile.writeAsBytes(bytes, flush: true),
+        pool: WorkerPool.shared,
+      );
+    } catch (e) {
+      // Keyword intents and the knowledge base still answer
+    }
   }
 
-  void _initializeAnimations() {
-    _typingAnimationController = AnimationController(
-      duration: Duration(seconds: 1),
-      vsync: this,
-    )..repeat();
-    
-    _messageAnimationController = AnimationController(
-      duration: Duration(milliseconds: 300),
-      vsync: this,
+  // Only the newest page is read on open; older pages load on scroll-back
+  Future<void> _restoreHistory() async {
+    try {
+      MessageStore store = await MessageStore.shared;
+      _store = store;
+      List<StoredMessage> latest = await store.pageBefore(_sessionId, limit: _pageSize);
+      if (!mounted) return;
+      _messages.insertOlder(latest.map(_fromStored), hasMore: latest.length == _pageSize);
+    } catch (e) {
+      // History is a convenience; the chat works without it
+    }
+  }
+
+  Future<void> _loadOlderMessages() async {
+    MessageStore? store = _store;
+    if (store == null || _loadingOlder || !_messages.hasOlder || _messages.length == 0) return;
+
+    _loadingOlder = true;
+    ChatMessage oldest = _messages[0].value;
+    try {
+      List<StoredMessage> older = await store.pageBefore(
+        _sessionId,
+        before: oldest.timestamp,
+        beforeId: oldest.messageId,
+        limit: _pageSize,
+      );
+      if (mounted) _messages.insertOlder(older.map(_fromStored), hasMore: older.length == _pageSize);
+    } catch (e) {
+      // Keeps what is loaded; the next scroll-up tries again
+    } finally {
+      _loadingOlder = false;
+    }
+  }
+
+  // The list is reversed: offset 0 is the newest message and
+  // maxScrollExtent the oldest one loaded
+  void _onScroll() {
+    ScrollPosition position = _scrollController.position;
+    if (position.pixels >= position.maxScrollExtent - _loadOlderThreshold) {
+      _loadOlderMessages();
+    } else if (position.pixels <= 0) {
+      _trimHistory();
+    }
+  }
+
+  // Back at the newest messages: drop pages read back through. Only
+  // history that can be paged in again from the store is dropped.
+  void _trimHistory() {
+    if (_store == null || _messages.length <= _maxInMemory) return;
+    if (_scrollController.hasClients && _scrollController.position.pixels > 0) return;
+    _messages.trimOldest(_maxInMemory);
+  }
+
+  void _persist(ChatMessage message) {
+    _store?.add(StoredMessage(
+      messageId: message.messageId,
+      sessionId: _sessionId,
+      isUser: message.isUser,
+      text: message.text,
+      timestamp: message.timestamp,
+    ));
+  }
+
+  ChatMessage _fromStored(StoredMessage message) {
+    return ChatMessage(
+      text: message.text,
+      isUser: message.isUser,
+      timestamp: message.timestamp,
+      messageId: message.messageId,
     );
   }
 
   void _initializeSpeech() async {
-    _speechEnabled = await _speechToText.initialize();
-    setState(() {});
+    _speechEnabled.value = await _speechToText.initialize();
   }
 
   void _initializeTTS() async {
-    await _flutterTts.setLanguage(_getLanguageCode(_selectedLanguage));
+    await _flutterTts.setLanguage(_getLanguageCode(_selectedLanguage.value));
     await _flutterTts.setSpeechRate(0.7);
     await _flutterTts.setVolume(0.8);
     await _flutterTts.setPitch(1.0);
+    // speak() completes when the utterance ends, so queued sentences play in order
+    await _flutterTts.awaitSpeakCompletion(true);
   }
 
   void _startRealtimeUpdates() {
-    // Simulate real-time data updates every 30 seconds
-    Timer.periodic(Duration(seconds: 30), (timer) {
-      _updateRealtimeData();
-    });
+    if (!mounted) return;
+    // The service polls only while this screen listens and the app is in front
+    _realtimeChanges = _realtime.changes.listen(_onRealtimeSnapshot);
+    _realtime.markActive();
   }
 
-  void _updateRealtimeData() {
-    setState(() {
-      _realtimeData['crowd_levels'] = _generateCrowdData();
-      _realtimeData['traffic_conditions'] = _generateTrafficData();
-      _realtimeData['weather'] = _getCurrentWeather();
-    });
+  @override
+  void didChangeAppLifecycleState(AppLifecycleState state) {
+    _realtime.setForeground(state == AppLifecycleState.resumed);
+  }
+
+  Future<Map<String, dynamic>> _fetchRealtimeData() async {
+    // In production, fetch from the realtime API
+    return {
+      'crowd_levels': _generateCrowdData(),
+      'traffic_conditions': _generateTrafficData(),
+      'weather': _getCurrentWeather(),
+    };
+  }
+
+  // Only snapshots that changed something arrive here; widgets showing a
+  // single value subscribe to that key instead of rebuilding the screen.
+  void _onRealtimeSnapshot(RealtimeSnapshot snapshot) {
+    Map<String, dynamic> previous = Map<String, dynamic>.of(_engine.realtimeData);
+    _engine.applySnapshot(snapshot);
+    _replanItinerary(RealtimeDiff.between(previous, snapshot.toJson()));
+  }
+
+  // Patches only the slots of today's plan that the new conditions affect
+  void _replanItinerary(RealtimeDiff diff) {
+    Map<String, dynamic>? itinerary = _activeItinerary;
+    if (itinerary == null) return;
+
+    ItineraryDelta delta = ItineraryReplanner(ItineraryService.planner).replan(itinerary, diff);
+    if (delta.isEmpty) return;
+
+    _activeItinerary = delta.applyTo(itinerary);
+    _addMessage('🔄 Itinerary update:\n${delta.summary}', false);
   }
 
   Map<String, String> _generateCrowdData() {
-    List<String> levels = ['low', 'moderate', 'high'];
-    Random random = Random();
+    List<String> levels = ResourceRegistry.crowdLevels;
+    Random random = _random;
     return {
       'Sri Aurobindo Ashram': levels[random.nextInt(3)],
       'Promenade Beach': levels[random.nextInt(3)],
@@ -135,8 +304,8 @@ class _AdvancedChatbotScreenState extends State<AdvancedChatbotScreen>
   }
 
   Map<String, String> _generateTrafficData() {
-    List<String> conditions = ['light', 'moderate', 'heavy'];
-    Random random = Random();
+    List<String> conditions = ResourceRegistry.trafficConditions;
+    Random random = _random;
     return {
       'Mission Street': conditions[random.nextInt(3)],
       'MG Road': conditions[random.nextInt(3)],
@@ -145,32 +314,28 @@ class _AdvancedChatbotScreenState extends State<AdvancedChatbotScreen>
   }
 
   String _getCurrentWeather() {
-    List<String> weather = ['sunny', 'cloudy', 'rainy', 'windy'];
-    return weather[Random().nextInt(weather.length)];
+    List<String> weather = ResourceRegistry.weatherConditions;
+    return weather[_random.nextInt(weather.length)];
   }
 
   Future<void> _loadUserPreferences() async {
     // In production, load from SharedPreferences or API
     // For demo, use default values
-    setState(() {
-      _userContext['interests'] = ['culture', 'adventure'];
-      _userContext['budget_preference'] = 'moderate';
-    });
+    _userContext['interests'] = ['culture', 'adventure'];
+    _userContext['budget_preference'] = 'moderate';
   }
 
   void _addMessage(String text, bool isUser) {
-    setState(() {
-      _messages.add(ChatMessage(
-        text: text,
-        isUser: isUser,
-        timestamp: DateTime.now(),
-        messageId: _generateMessageId(),
-      ));
-    });
-    
-    _messageAnimationController.forward().then((_) {
-      _messageAnimationController.reset();
-    });
+    if (!mounted) return;
+    ChatMessage message = ChatMessage(
+      text: text,
+      isUser: isUser,
+      timestamp: DateTime.now(),
+      messageId: _generateMessageId(),
+    );
+    _messages.add(message, animate: true);
+    _persist(message);
+    _trimHistory();
     
     _scrollToBottom();
     
@@ -180,21 +345,17 @@ class _AdvancedChatbotScreenState extends State<AdvancedChatbotScreen>
   }
 
   String _generateMessageId() {
-    return 'msg_${DateTime.now().millisecondsSinceEpoch}_${Random().nextInt(1000)}';
+    return MessageStore.newMessageId();
   }
 
   void _sendMessage(String text) {
     if (text.trim().isEmpty) return;
 
+    _realtime.markActive();
     _addMessage(text, true);
     _messageController.clear();
-
-    // Update conversation context
-    _conversationManager.addUserMessage(text);
     
-    setState(() {
-      _isTyping = true;
-    });
+    _isTyping.value = true;
 
     // Process with advanced AI
     _processAdvancedMessage(text);
@@ -202,39 +363,73 @@ class _AdvancedChatbotScreenState extends State<AdvancedChatbotScreen>
 
   Future<void> _processAdvancedMessage(String message) async {
     try {
-      // Enhanced message processing
-      final response = await _ai.generateResponse(
-        message: message,
-        context: _userContext,
-        conversationHistory: _conversationManager.getRecentHistory(),
-        realtimeData: _realtimeData,
-      );
+      Stopwatch stopwatch = Stopwatch()..start();
 
-      // Add delay for natural conversation flow
-      await Future.delayed(Duration(milliseconds: 1500 + Random().nextInt(1000)));
+      // Enhanced message processing
+      final response = _engine.respond(ChatQuery(sessionId: _sessionId, message: message));
 
-      setState(() {
-        _isTyping = false;
-      });
+      // Optional cosmetic pause so the typing indicator doesn't just flash
+      Duration remaining = _latencyPolicy.typingDelay - stopwatch.elapsed;
+      if (remaining > Duration.zero) {
+        await Future.delayed(remaining);
+      }
 
-      _addMessage(response.text, false);
+      await _streamBotMessage(_engine.ai.streamResponse(response));
 
       // Handle special actions
       if (response.actions.isNotEmpty) {
         _handleBotActions(response.actions);
       }
 
-      // Update user preferences based on conversation
-      _personalizationEngine.updatePreferences(_userContext, message, response);
-
     } catch (e) {
-      setState(() {
-        _isTyping = false;
-      });
+      _isTyping.value = false;
       _addMessage("I apologize, but I'm having trouble processing that right now. Could you please try again?", false);
     }
   }
 
+  // Grows one bot bubble chunk by chunk and queues each sentence for TTS as
+  // soon as it is complete
+  Future<void> _streamBotMessage(Stream<String> chunks) async {
+    StringBuffer text = StringBuffer();
+    SentenceSplitter sentences = SentenceSplitter();
+    // Looked up by id: paging in older history shifts indices mid-stream
+    String? replyId;
+    _stopSpeaking();
+
+    await for (String chunk in chunks) {
+      if (!mounted) return;
+      text.write(chunk);
+      int? index = replyId == null ? null : _messages.indexOf(replyId);
+      if (index == null) {
+        replyId = _generateMessageId();
+        _isTyping.value = false;
+        _messages.add(ChatMessage(
+          text: text.toString(),
+          isUser: false,
+          timestamp: DateTime.now(),
+          messageId: replyId,
+          isStreaming: true,
+        ), animate: true);
+      } else {
+        // Rebuilds this bubble only
+        _messages.update(index, _messages[index].value.copyWith(text: text.toString()));
+      }
+      _scrollToBottom();
+      sentences.add(chunk).forEach(_enqueueSpeech);
+    }
+
+    String? rest = sentences.flush();
+    if (rest != null) _enqueueSpeech(rest);
+    if (!mounted) return;
+    _isTyping.value = false;
+    int? index = replyId == null ? null : _messages.indexOf(replyId);
+    if (index == null) return;
+    // Stored once complete; partial replies never reach the database
+    ChatMessage reply = _messages[index].value.copyWith(isStreaming: false);
+    _messages.update(index, reply);
+    _persist(reply);
+  }
+
   void _handleBotActions(List<BotAction> actions) {
     for (BotAction action in actions) {
       switch (action.type) {
@@ -261,14 +456,23 @@ class _AdvancedChatbotScreenState extends State<AdvancedChatbotScreen>
     );
   }
 
-  void _createItinerary(Map<String, dynamic> data) {
-    // Implementation for creating itinerary
-    _showItineraryDialog(data);
+  void _createItinerary(Map<String, dynamic> data) async {
+    // Planned on a worker so the chat keeps animating meanwhile
+    Map<String, dynamic> itinerary = await ItineraryService.generateItineraryInBackground(ItineraryRequest(
+      days: data['visit_duration'] ?? 3,
+      interests: List<String>.from(data['interests'] ?? []),
+      budget: data['budget_preference'] ?? 'moderate',
+      startLocation: data['current_location'],
+    ));
+    if (!mounted) return;
+    // Kept so realtime updates can patch it in place
+    _activeItinerary = itinerary;
+    _showItineraryDialog(itinerary);
   }
 
   void _showWeatherInfo() {
     _addMessage(
-      "Current weather in Pondicherry: ${_realtimeData['weather']} 🌤️\n"
+      "Current weather in Pondicherry: ${_realtime.current.weather} 🌤️\n"
       "Perfect for outdoor activities! Would you like weather-specific recommendations?",
       false
     );
@@ -288,19 +492,15 @@ class _AdvancedChatbotScreenState extends State<AdvancedChatbotScreen>
   }
 
   void _startListening() async {
-    if (!_speechEnabled) return;
+    if (!_speechEnabled.value) return;
 
-    setState(() {
-      _isListening = true;
-    });
+    _isListening.value = true;
 
     await _speechToText.listen(
       onResult: (result) {
         if (result.finalResult) {
           _messageController.text = result.recognizedWords;
-          setState(() {
-            _isListening = false;
-          });
+          _isListening.value = false;
         }
       },
       listenFor: Duration(seconds: 30),
@@ -310,38 +510,51 @@ class _AdvancedChatbotScreenState extends State<AdvancedChatbotScreen>
 
   void _stopListening() async {
     await _speechToText.stop();
-    setState(() {
-      _isListening = false;
-    });
+    _isListening.value = false;
   }
 
-  void _speakMessage(String text) async {
+  void _speakMessage(String text) {
+    _stopSpeaking();
+    SentenceSplitter sentences = SentenceSplitter();
+    sentences.add(text).forEach(_enqueueSpeech);
+    String? rest = sentences.flush();
+    if (rest != null) _enqueueSpeech(rest);
+  }
+
+  void _enqueueSpeech(String sentence) {
     // Remove special characters and emojis for better TTS
-    String cleanText = text.replaceAll(RegExp(r'[^\w\s.,!?]'), '');
-    await _flutterTts.speak(cleanText);
+    String cleanText = sentence.replaceAll(RegExp(r'[^\w\s.,!?]'), '').trim();
+    if (cleanText.isEmpty) return;
+    _speechQueue.add(cleanText);
+    if (!_speaking) _drainSpeechQueue();
+  }
+
+  Future<void> _drainSpeechQueue() async {
+    _speaking = true;
+    while (_speechQueue.isNotEmpty && mounted) {
+      await _flutterTts.speak(_speechQueue.removeFirst());
+    }
+    _speaking = false;
+  }
+
+  void _stopSpeaking() {
+    _speechQueue.clear();
+    if (_speaking) _flutterTts.stop();
   }
 
   String _getLanguageCode(String language) {
-    Map<String, String> codes = {
-      'English': 'en-US',
-      'French': 'fr-FR',
-      'Tamil': 'ta-IN',
-      'Hindi': 'hi-IN',
-      'Spanish': 'es-ES',
-      'German': 'de-DE',
-    };
-    return codes[language] ?? 'en-US';
+    return ResourceRegistry.ttsLocales[language] ?? 'en-US';
   }
 
   void _changeLanguage(String newLanguage) async {
-    setState(() {
-      _selectedLanguage = newLanguage;
-    });
+    // Hot-swap the string table; other locales stay unloaded
+    await TranslationCatalog.shared.setLocale(TranslationService.getLanguageCode(newLanguage));
+    _selectedLanguage.value = newLanguage;
     
     await _flutterTts.setLanguage(_getLanguageCode(newLanguage));
     
     _addMessage(
-      _ai.getLocalizedMessage('language_changed', newLanguage),
+      _engine.ai.getLocalizedMessage('language_changed', newLanguage),
       false
     );
   }
@@ -349,8 +562,9 @@ class _AdvancedChatbotScreenState extends State<AdvancedChatbotScreen>
   void _scrollToBottom() {
     WidgetsBinding.instance.addPostFrameCallback((_) {
       if (_scrollController.hasClients) {
+        // Reversed list: the newest message is at offset 0
         _scrollController.animateTo(
-          _scrollController.position.maxScrollExtent,
+          0,
           duration: Duration(milliseconds: 300),
           curve: Curves.easeOut,
         );
@@ -360,9 +574,18 @@ class _AdvancedChatbotScreenState extends State<AdvancedChatbotScreen>
 
   @override
   void dispose() {
-    _typingAnimationController.dispose();
-    _messageAnimationController.dispose();
+    WidgetsBinding.instance.removeObserver(this);
+    _realtimeChanges?.cancel();
+    if (widget.realtime == null) _realtime.dispose();
+    _store?.flushInBackground();
+    _scrollController.dispose();
+    _messages.dispose();
+    _isTyping.dispose();
+    _isListening.dispose();
+    _speechEnabled.dispose();
+    _selectedLanguage.dispose();
     _speechToText.stop();
+    _speechQueue.clear();
     _flutterTts.stop();
     super.dispose();
   }
@@ -372,7 +595,7 @@ class _AdvancedChatbotScreenState extends State<AdvancedChatbotScreen>
     return Scaffold(
       appBar: _buildAppBar(),
       body: _buildBody(),
-      bottomNavigationBar: _buildInputArea(),
+      bottomNavigationBar: RepaintBoundary(child: _buildInputArea()),
     );
   }
 
@@ -382,9 +605,12 @@ class _AdvancedChatbotScreenState extends State<AdvancedChatbotScreen>
         crossAxisAlignment: CrossAxisAlignment.start,
         children: [
           Text('Pondy AI Companion', style: TextStyle(fontSize: 18)),
-          Text(
-            'Powered by Advanced AI • $_selectedLanguage',
-            style: TextStyle(fontSize: 12, color: Colors.white70),
+          ValueListenableBuilder<String>(
+            valueListenable: _selectedLanguage,
+            builder: (context, language, child) => Text(
+              'Powered by Advanced AI • $language',
+              style: TextStyle(fontSize: 12, color: Colors.white70),
+            ),
           ),
         ],
       ),
@@ -415,7 +641,8 @@ class _AdvancedChatbotScreenState extends State<AdvancedChatbotScreen>
       ),
       child: Column(
         children: [
-          _buildStatusBar(),
+          // Realtime ticks repaint the status bar alone
+          RepaintBoundary(child: _buildStatusBar()),
           Expanded(
             child: _buildMessageList(),
           ),
@@ -435,9 +662,13 @@ class _AdvancedChatbotScreenState extends State<AdvancedChatbotScreen>
         children: [
           Icon(Icons.wb_sunny, size: 16, color: Colors.orange),
           SizedBox(width: 4),
-          Text(
-            'Weather: ${_realtimeData['weather']}',
-            style: TextStyle(fontSize: 12, color: Colors.black87),
+          StreamBuilder<Object?>(
+            stream: _weatherUpdates,
+            initialData: _realtime.current.weather,
+            builder: (context, weather) => Text(
+              'Weather: ${weather.data}',
+              style: TextStyle(fontSize: 12, color: Colors.black87),
+            ),
           ),
           Spacer(),
           Icon(Icons.traffic, size: 16, color: Colors.red),
@@ -451,194 +682,39 @@ class _AdvancedChatbotScreenState extends State<AdvancedChatbotScreen>
     );
   }
 
+  // A streamed reply is an ordinary message whose text grows in place; the
+  // typing indicator only covers the time before its first chunk. The list
+  // rebuilds when a message is added or typing toggles; each tile listens
+  // to its own message, and ListView gives every tile a RepaintBoundary.
   Widget _buildMessageList() {
-    return ListView.builder(
-      controller: _scrollController,
-      padding: EdgeInsets.all(16),
-      itemCount: _messages.length + (_isTyping ? 1 : 0),
-      itemBuilder: (context, index) {
-        if (index == _messages.length) {
-          return _buildTypingIndicator();
-        }
-        return _buildAnimatedMessage(_messages[index], index);
-      },
-    );
-  }
-
-  Widget _buildAnimatedMessage(ChatMessage message, int index) {
-    return FadeTransition(
-      opacity: _messageAnimationController,
-      child: SlideTransition(
-        position: Tween<Offset>(
-          begin: Offset(message.isUser ? 1.0 : -1.0, 0.0),
-          end: Offset.zero,
-        ).animate(CurvedAnimation(
-          parent: _messageAnimationController,
-          curve: Curves.easeOut,
-        )),
-        child: _buildMessageBubble(message),
-      ),
-    );
-  }
-
-  Widget _buildMessageBubble(ChatMessage message) {
-    return Padding(
-      padding: EdgeInsets.symmetric(vertical: 8),
-      child: Row(
-        mainAxisAlignment: message.isUser ? MainAxisAlignment.end : MainAxisAlignment.start,
-        crossAxisAlignment: CrossAxisAlignment.end,
-        children: [
-          if (!message.isUser) _buildBotAvatar(),
-          if (!message.isUser) SizedBox(width: 12),
-          
-          Flexible(
-            child: Container(
-              constraints: BoxConstraints(maxWidth: MediaQuery.of(context).size.width * 0.75),
-              padding: EdgeInsets.symmetric(horizontal: 16, vertical: 12),
-              decoration: BoxDecoration(
-                color: message.isUser ? Color(0xFFE65100) : Colors.grey[200],
-                borderRadius: BorderRadius.circular(20).copyWith(
-                  bottomLeft: Radius.circular(message.isUser ? 20 : 4),
-                  bottomRight: Radius.circular(message.isUser ? 4 : 20),
-                ),
-                boxShadow: [
-                  BoxShadow(
-                    color: Colors.black.withOpacity(0.1),
-                    spreadRadius: 1,
-                    blurRadius: 3,
-                    offset: Offset(0, 1),
-                  ),
-                ],
-              ),
-              child: Column(
-                crossAxisAlignment: CrossAxisAlignment.start,
-                children: [
-                  Text(
-                    message.text,
-                    style: TextStyle(
-                      color: message.isUser ? Colors.white : Colors.black87,
-                      fontSize: 16,
-                      height: 1.3,
-                    ),
-                  ),
-                  SizedBox(height: 6),
-                  Row(
-                    mainAxisSize: MainAxisSize.min,
-                    children: [
-                      Text(
-                        _formatTime(message.timestamp),
-                        style: TextStyle(
-                          color: message.isUser ? Colors.white70 : Colors.grey[600],
-                          fontSize: 11,
-                        ),
-                      ),
-                      if (!message.isUser) ...[
-                        SizedBox(width: 8),
-                        GestureDetector(
-                          onTap: () => _speakMessage(message.text),
-                          child: Icon(
-                            Icons.volume_up,
-                            size: 14,
-                            color: Colors.grey[600],
-                          ),
-                        ),
-                      ],
-                    ],
-                  ),
-                ],
-              ),
-            ),
-          ),
-          
-          if (message.isUser) SizedBox(width: 12),
-          if (message.isUser) _buildUserAvatar(),
-        ],
-      ),
-    );
-  }
-
-  Widget _buildBotAvatar() {
-    return Container(
-      width: 36,
-      height: 36,
-      decoration: BoxDecoration(
-        gradient: LinearGradient(
-          colors: [Color(0xFFE65100), Color(0xFFFF9800)],
-        ),
-        borderRadius: BorderRadius.circular(18),
-      ),
-      child: Icon(
-        Icons.smart_toy,
-        color: Colors.white,
-        size: 20,
-      ),
-    );
-  }
-
-  Widget _buildUserAvatar() {
-    return Container(
-      width: 36,
-      height: 36,
-      decoration: BoxDecoration(
-        gradient: LinearGradient(
-          colors: [Colors.blue, Colors.lightBlue],
-        ),
-        borderRadius: BorderRadius.circular(18),
-      ),
-      child: Icon(
-        Icons.person,
-        color: Colors.white,
-        size: 20,
-      ),
-    );
-  }
-
-  Widget _buildTypingIndicator() {
-    return Padding(
-      padding: EdgeInsets.symmetric(vertical: 8),
-      child: Row(
-        children: [
-          _buildBotAvatar(),
-          SizedBox(width: 12),
-          Container(
-            padding: EdgeInsets.symmetric(horizontal: 16, vertical: 12),
-            decoration: BoxDecoration(
-              color: Colors.grey[200],
-              borderRadius: BorderRadius.circular(20).copyWith(
-                bottomLeft: Radius.circular(4),
-              ),
-            ),
-            child: Row(
-              mainAxisSize: MainAxisSize.min,
-              children: [
-                _buildTypingDot(0),
-                SizedBox(width: 4),
-                _buildTypingDot(1),
-                SizedBox(width: 4),
-                _buildTypingDot(2),
-              ],
-            ),
-          ),
-        ],
-      ),
-    );
-  }
-
-  Widget _buildTypingDot(int index) {
     return AnimatedBuilder(
-      animation: _typingAnimationController,
+      animation: Listenable.merge([_messages, _isTyping]),
       builder: (context, child) {
-        double value = (_typingAnimationController.value + index * 0.33) % 1.0;
-        return Transform.translate(
-          offset: Offset(0, -10 * (value < 0.5 ? 2 * value : 2 * (1 - value))),
-          child: Container(
-            width: 8,
-            height: 8,
-            decoration: BoxDecoration(
-              color: Colors.grey[400],
-              borderRadius: BorderRadius.circular(4),
-            ),
-          ),
+        int offset = _isTyping.value ? 1 : 0;
+        int count = _messages.length;
+        // Reversed so the newest message sits at offset 0 and pages of
+        // older history are added past the far end without a scroll jump
+        return ListView.builder(
+          controller: _scrollController,
+          reverse: true,
+          padding: EdgeInsets.all(16),
+          itemCount: count + offset,
+          findChildIndexCallback: (key) {
+            int? index = _messages.indexOf((key as ValueKey<String>).value);
+            return index == null ? null : count - 1 - index + offset;
+          },
+          itemBuilder: (context, index) {
+            if (index < offset) {
+              return TypingIndicator(key: ValueKey('typing'));
+            }
+            ValueNotifier<ChatMessage> entry = _messages[count - 1 - (index - offset)];
+            return ChatMessageTile(
+              key: ValueKey(entry.value.messageId),
+              message: entry,
+              animateEntrance: _messages.takeEntrance(entry.value.messageId),
+              onSpeak: _speakMessage,
+            );
+          },
         );
       },
     );
@@ -681,18 +757,24 @@ class _AdvancedChatbotScreenState extends State<AdvancedChatbotScreen>
                         textCapitalization: TextCapitalization.sentences,
                       ),
                     ),
-                    if (_speechEnabled)
-                      GestureDetector(
-                        onTap: _isListening ? _stopListening : _startListening,
-                        child: Container(
-                          padding: EdgeInsets.all(8),
-                          child: Icon(
-                            _isListening ? Icons.mic : Icons.mic_none,
-                            color: _isListening ? Colors.red : Colors.grey[600],
-                            size: 24,
+                    AnimatedBuilder(
+                      animation: Listenable.merge([_speechEnabled, _isListening]),
+                      builder: (context, child) {
+                        if (!_speechEnabled.value) return SizedBox.shrink();
+                        bool listening = _isListening.value;
+                        return GestureDetector(
+                          onTap: listening ? _stopListening : _startListening,
+                          child: Container(
+                            padding: EdgeInsets.all(8),
+                            child: Icon(
+                              listening ? Icons.mic : Icons.mic_none,
+                              color: listening ? Colors.red : Colors.grey[600],
+                              size: 24,
+                            ),
                           ),
-                        ),
-                      ),
+                        );
+                      },
+                    ),
                   ],
                 ),
               ),
@@ -729,7 +811,7 @@ class _AdvancedChatbotScreenState extends State<AdvancedChatbotScreen>
         borderRadius: BorderRadius.vertical(top: Radius.circular(20)),
       ),
       builder: (context) => LanguageSelectorSheet(
-        currentLanguage: _selectedLanguage,
+        currentLanguage: _selectedLanguage.value,
         onLanguageSelected: _changeLanguage,
       ),
     );
@@ -741,17 +823,14 @@ class _AdvancedChatbotScreenState extends State<AdvancedChatbotScreen>
       builder: (context) => SettingsDialog(
         userContext: _userContext,
         onSettingsChanged: (newContext) {
-          setState(() {
-            _userContext = newContext;
-          });
+          // Nothing on screen shows the context, so no rebuild is needed
+          _userContext = newContext;
+          _engine.setContext(_sessionId, newContext);
         },
       ),
     );
   }
 
-  String _formatTime(DateTime dateTime) {
-    return '${dateTime.hour.toString().padLeft(2, '0')}:${dateTime.minute.toString().padLeft(2, '0')}';
-  }
 }
 
 // Supporting Classes
@@ -761,371 +840,372 @@ class ChatMessage {
   final bool isUser;
   final DateTime timestamp;
   final String messageId;
+  final bool isStreaming;
 
   ChatMessage({
     required this.text,
     required this.isUser,
     required this.timestamp,
     required this.messageId,
+    this.isStreaming = false,
   });
-}
 
-class ChatbotAI {
-  Map<String, List<String>> _responseTemplates = {
-    'welcome': [
-      'Bonjour! Welcome to the beautiful union territory of Pondicherry! 🌺 I\'m your AI travel companion, ready to help you explore this French colonial paradise.',
-      'Namaste and Bonjour! I\'m thrilled you\'re here in Pondicherry! 🙏 Let me be your personal guide to discover the perfect blend of Indian spirituality and French elegance.',
-    ],
-    'devotional': [
-      'Pondicherry is a spiritual haven! Let me guide you through sacred spaces that will touch your soul.',
-      'The spiritual energy here is incredible! I can recommend ashrams, temples, and meditation centers perfect for your journey.',
-    ],
-    'adventure': [
-      'Ready for some excitement? Pondicherry offers amazing water sports, beach adventures, and thrilling experiences!',
-      'Adventure awaits! From scuba diving to parasailing, let\'s plan your adrenaline-filled itinerary.',
-    ],
-    'culture': [
-      'The rich Franco-Tamil culture here is fascinating! Let me show you the best museums, galleries, and cultural sites.',
-      'Dive into 300 years of French colonial history mixed with Tamil traditions - it\'s absolutely unique!',
-    ],
-  };
-
-  Future<AIResponse> generateResponse({
-    required String message,
-    required Map<String, dynamic> context,
-    required List<String> conversationHistory,
-    required Map<String, dynamic> realtimeData,
-  }) async {
-    // Simulate AI processing time
-    await Future.delayed(Duration(milliseconds: 800));
-
-    String intent = _classifyIntent(message);
-    String response = _generateContextualResponse(intent, message, context, realtimeData);
-    List<BotAction> actions = _generateActions(intent, message, context);
-
-    return AIResponse(
-      text: response,
-      intent: intent,
-      confidence: 0.85,
-      actions: actions,
+  ChatMessage copyWith({String? text, bool? isStreaming}) {
+    return ChatMessage(
+      text: text ?? this.text,
+      isUser: isUser,
+      timestamp: timestamp,
+      messageId: messageId,
+      isStreaming: isStreaming ?? this.isStreaming,
     );
   }
+}
 
-  String _classifyIntent(String message) {
-    String lower = message.toLowerCase();
-    
-    if (_containsKeywords(lower, ['temple', 'spiritual', 'ashram', 'meditation', 'prayer'])) {
-      return 'devotional';
-    } else if (_containsKeywords(lower, ['adventure', 'beach', 'diving', 'sports', 'exciting'])) {
-      return 'adventure';
-    } else if (_containsKeywords(lower, ['culture', 'museum', 'history', 'french', 'colonial'])) {
-      return 'culture';
-    } else if (_containsKeywords(lower, ['food', 'restaurant', 'eat', 'cuisine', 'dining'])) {
-      return 'food';
-    } else if (_containsKeywords(lower, ['bike', 'rental', 'transport', 'travel'])) {
-      return 'transport';
-    } else if (_containsKeywords(lower, ['itinerary', 'plan', 'schedule', 'trip'])) {
-      return 'itinerary';
-    } else if (_containsKeywords(lower, ['budget', 'cost', 'price', 'cheap', 'expensive'])) {
-      return 'budget';
-    } else if (_containsKeywords(lower, ['weather', 'rain', 'sunny', 'climate'])) {
-      return 'weather';
-    } else {
-      return 'general';
-    }
+// The conversation as one notifier per message. Appending notifies the
+// list; replacing a message (a streamed reply growing) notifies only that
+// message's tile.
+class ChatMessageList extends ChangeNotifier {
+  final List<ValueNotifier<ChatMessage>> _entries = [];
+  final Map<String, int> _indexById = {};
+  final Set<String> _pendingEntrances = {};
+
+  // Whether the store holds messages older than the first entry
+  bool hasOlder = false;
+
+  int get length => _entries.length;
+
+  ValueNotifier<ChatMessage> operator [](int index) => _entries[index];
+
+  int? indexOf(String messageId) => _indexById[messageId];
+
+  void add(ChatMessage message, {bool animate = false}) {
+    _append(message);
+    if (animate) _pendingEntrances.add(message.messageId);
+    notifyListeners();
+  }
+
+  void addAll(Iterable<ChatMessage> messages) {
+    messages.forEach(_append);
+    notifyListeners();
+  }
+
+  // A page from the store, oldest first, placed before the current entries
+  void insertOlder(Iterable<ChatMessage> messages, {required bool hasMore}) {
+    // Skips anything already shown, e.g. sent while the first page loaded
+    _entries.insertAll(0, [
+      for (ChatMessage message in messages)
+        if (!_indexById.containsKey(message.messageId)) ValueNotifier<ChatMessage>(message),
+    ]);
+    hasOlder = hasMore;
+    _reindex();
+    notifyListeners();
+  }
+
+  // Drops all but the newest [keep] entries; they stay in the store and
+  // page back in on scroll-up.
+  void trimOldest(int keep) {
+    int excess = _entries.length - keep;
+    if (excess <= 0) return;
+    List<ValueNotifier<ChatMessage>> dropped = _entries.sublist(0, excess);
+    _entries.removeRange(0, excess);
+    hasOlder = true;
+    _reindex();
+    notifyListeners();
+    // Tiles may still hold listeners until the next frame
+    WidgetsBinding.instance.addPostFrameCallback((_) {
+      for (ValueNotifier<ChatMessage> entry in dropped) {
+        entry.dispose();
+      }
+    });
   }
 
-  bool _containsKeywords(String text, List<String> keywords) {
-    return keywords.any((keyword) => text.contains(keyword));
-  }
-
-  String _generateContextualResponse(String intent, String message, Map<String, dynamic> context, Map<String, dynamic> realtimeData) {
-    switch (intent) {
-      case 'devotional':
-        return _generateDevotionalResponse(context, realtimeData);
-      case 'adventure':
-        return _generateAdventureResponse(context, realtimeData);
-      case 'culture':
-        return _generateCultureResponse(context, realtimeData);
-      case 'food':
-        return _generateFoodResponse(context, realtimeData);
-      case 'transport':
-        return _generateTransportResponse(context, realtimeData);
-      case 'weather':
-        return _generateWeatherResponse(realtimeData);
-      case 'budget':
-        return _generateBudgetResponse(context);
-      case 'itinerary':
-        return _generateItineraryResponse(context, realtimeData);
-      default:
-        return _generateGeneralResponse(context);
-    }
+  void update(int index, ChatMessage message) {
+    _entries[index].value = message;
   }
 
-  String _generateDevotionalResponse(Map<String, dynamic> context, Map<String, dynamic> realtimeData) {
-    List<String> responses = [
-      '🕉️ For spiritual seekers like yourself, I recommend starting with the Sri Aurobindo Ashram - the spiritual heart of Pondicherry. The current crowd level is ${realtimeData['crowd_levels']?['Sri Aurobindo Ashram'] ?? 'moderate'}.',
-      '🙏 The divine energy here is palpable! Visit the Mother\'s Temple for morning meditation, then explore the peaceful Matrimandir in nearby Auroville. Perfect for your spiritual journey!',
-      '✨ Pondicherry\'s spiritual landscape is extraordinary! The Manakula Vinayagar Temple by the beach offers a unique Tamil spiritual experience, while the ashrams provide French-influenced meditation practices.',
-    ];
-    
-    String response = responses[Random().nextInt(responses.length)];
-    
-    // Add personalized recommendations based on time
-    int hour = DateTime.now().hour;
-    if (hour < 10) {
-      response += '\n\n🌅 Since it\'s morning, this is perfect timing for ashram visits and meditation sessions!';
-    } else if (hour > 17) {
-      response += '\n\n🌆 Evening aarti ceremonies are particularly beautiful at local temples.';
-    }
-    
-    return response;
-  }
+  // True once per message added with animate, so a tile scrolled back into
+  // view does not replay its entrance.
+  bool takeEntrance(String messageId) => _pendingEntrances.remove(messageId);
 
-  String _generateAdventureResponse(Map<String, dynamic> context, Map<String, dynamic> realtimeData) {
-    return '🏄‍♂️ Adventure time! Based on current conditions:\n\n'
-           '🌊 Paradise Beach: Perfect for water sports (crowd level: ${realtimeData['crowd_levels']?['Paradise Beach'] ?? 'moderate'})\n'
-           '🤿 Scuba diving at Temple Adventures\n'
-           '🚴‍♂️ Cycling tour through French Quarter\n'
-           '🌅 Sunrise kayaking in the backwaters\n\n'
-           '💡 Pro tip: Early morning adventures have fewer crowds and better weather!';
+  void _append(ChatMessage message) {
+    _indexById[message.messageId] = _entries.length;
+    _entries.add(ValueNotifier<ChatMessage>(message));
   }
 
-  String _generateCultureResponse(Map<String, dynamic> context, Map<String, dynamic> realtimeData) {
-    return '🏛️ Pondicherry\'s Franco-Tamil culture is absolutely fascinating!\n\n'
-           '🇫🇷 French Quarter highlights:\n'
-           '• French Institute for exhibitions\n'
-           '• Notre Dame Cathedral\n'
-           '• Colonial architecture walking tour\n\n'
-           '🎭 Cultural experiences:\n'
-           '• Traditional Tamil performances\n'
-           '• French cuisine cooking classes\n'
-           '• Local artisan workshops\n\n'
-           'Current crowd at French Quarter: ${realtimeData['crowd_levels']?['French Quarter'] ?? 'moderate'}';
+  void _reindex() {
+    _indexById.clear();
+    for (int i = 0; i < _entries.length; i++) {
+      _indexById[_entries[i].value.messageId] = i;
+    }
   }
 
-  String _generateFoodResponse(Map<String, dynamic> context, Map<String, dynamic> realtimeData) {
-    String budgetLevel = context['budget_preference'] ?? 'moderate';
-    
-    if (budgetLevel == 'budget') {
-      return '🍽️ Delicious budget-friendly options:\n\n'
-             '• Surguru Restaurant - Authentic South Indian (₹100-250)\n'
-             '• Hot Breads - Fresh bakery items (₹50-150)\n'
-             '• Local street food at Goubert Market\n\n'
-             '🥘 Don\'t miss the unique Pondicherry fusion cuisine!';
-    } else if (budgetLevel == 'luxury') {
-      return '🍾 Premium dining experiences:\n\n'
-             '• Villa Shanti - Fine dining French cuisine\n'
-             '• Le Dupleix - Colonial elegance with fusion menu\n'
-             '• Palais de Mahe - Royal dining experience\n\n'
-             '✨ Perfect for a memorable culinary journey!';
-    } else {
-      return '🍛 Wonderful mid-range dining options:\n\n'
-             '• Cafe des Arts - French-Tamil fusion\n'
-             '• Tanto - Italian with local ingredients\n'
-             '• Indian Coffee House - Historic charm\n\n'
-             '🌶️ Mix of traditional Tamil and French colonial flavors!';
+  @override
+  void dispose() {
+    for (ValueNotifier<ChatMessage> entry in _entries) {
+      entry.dispose();
     }
+    super.dispose();
   }
+}
 
-  String _generateTransportResponse(Map<String, dynamic> context, Map<String, dynamic> realtimeData) {
-    return '🏍️ Getting around Pondicherry:\n\n'
-           '🚲 **Recommended: Bike Rental**\n'
-           '• French Quarter Bikes: ₹250/day\n'
-           '• Pondy Bike Rentals: ₹300/day (premium bikes)\n\n'
-           '🚗 **Alternatives:**\n'
-           '• Auto rickshaws: ₹10-15/km\n'
-           '• Taxi services: ₹12-18/km\n\n'
-           '📱 **Apps:** Ola, Uber available\n\n'
-           'Current traffic on MG Road: ${realtimeData['traffic_conditions']?['MG Road'] ?? 'moderate'}\n'
-           '💡 Tip: Bikes give you the freedom to explore narrow French Quarter lanes!';
+// UI Components
+
+// One message row. The entrance slide/fade has its own controller, created
+// only for newly added messages and dropped when it finishes; the bubble
+// rebuilds only when this message changes.
+class ChatMessageTile extends StatefulWidget {
+  final ValueListenable<ChatMessage> message;
+  final bool animateEntrance;
+  final void Function(String text) onSpeak;
+
+  const ChatMessageTile({
+    Key? key,
+    required this.message,
+    required this.onSpeak,
+    this.animateEntrance = false,
+  }) : super(key: key);
+
+  @override
+  _ChatMessageTileState createState() => _ChatMessageTileState();
+}
+
+class _ChatMessageTileState extends State<ChatMessageTile> with SingleTickerProviderStateMixin {
+  AnimationController? _entrance;
+
+  @override
+  void initState() {
+    super.initState();
+    if (widget.animateEntrance) {
+      AnimationController entrance = AnimationController(
+        duration: Duration(milliseconds: 300),
+        vsync: this,
+      );
+      _entrance = entrance;
+      entrance.forward().then((_) {
+        if (!mounted) return;
+        setState(() {
+          _entrance = null;
+        });
+        entrance.dispose();
+      });
+    }
   }
 
-  String _generateWeatherResponse(Map<String, dynamic> realtimeData) {
-    String weather = realtimeData['weather'] ?? 'sunny';
-    
-    Map<String, String> weatherAdvice = {
-      'sunny': '☀️ Beautiful sunny weather! Perfect for beach visits and outdoor exploration. Don\'t forget sunscreen!',
-      'cloudy': '⛅ Nice cloudy weather - ideal for walking tours and sightseeing without harsh sun.',
-      'rainy': '🌧️ Monsoon vibes! Great time for indoor cultural sites, cafes, and ashram meditation sessions.',
-      'windy': '💨 Breezy conditions - perfect for water sports and beachside activities!',
-    };
-    
-    return 'Current weather: $weather\n\n${weatherAdvice[weather] ?? 'Check local weather for updates.'}';
-  }
-
-  String _generateBudgetResponse(Map<String, dynamic> context) {
-    return '💰 Smart budget planning for Pondicherry:\n\n'
-           '🏠 **Accommodation (per night):**\n'
-           '• Budget: ₹800-1500 (hostels/guesthouses)\n'
-           '• Mid-range: ₹2000-4000 (boutique hotels)\n'
-           '• Luxury: ₹5000+ (heritage properties)\n\n'
-           '🍽️ **Food (per day):**\n'
-           '• Street food/local: ₹300-500\n'
-           '• Restaurants: ₹800-1200\n'
-           '• Fine dining: ₹2000+\n\n'
-           '🚲 **Transport:** ₹250-300 (bike rental)\n'
-           '🎫 **Attractions:** Most temples free, museums ₹10-50\n\n'
-           '💡 **Money-saving tips:**\n'
-           '• Visit during off-season (June-September)\n'
-           '• Try local eateries\n'
-           '• Walk in French Quarter (it\'s small!)';
-  }
-
-  String _generateItineraryResponse(Map<String, dynamic> context, Map<String, dynamic> realtimeData) {
-    int days = context['visit_duration'] ?? 3;
-    List<String> interests = List<String>.from(context['interests'] ?? ['culture']);
-    
-    return '📅 Perfect ${days}-day itinerary for you:\n\n'
-           '**Day 1: French Colonial Heritage** 🇫🇷\n'
-           '• 9 AM: Sri Aurobindo Ashram\n'
-           '• 11 AM: French Quarter walking tour\n'
-           '• 2 PM: Pondicherry Museum\n'
-           '• 5 PM: Promenade Beach sunset\n\n'
-           '**Day 2: Adventure & Nature** 🌊\n'
-           '• 8 AM: Paradise Beach (boat ride)\n'
-           '• 1 PM: Auroville exploration\n'
-           '• 4 PM: Scuba diving session\n\n'
-           '**Day 3: Culture & Relaxation** 🎭\n'
-           '• 9 AM: Local market visit\n'
-           '• 11 AM: Cathedral and churches\n'
-           '• 3 PM: Handicraft shopping\n'
-           '• 7 PM: Traditional dinner\n\n'
-           '🚦 Real-time tip: Current traffic is ${realtimeData['traffic_conditions']?['MG Road'] ?? 'moderate'} - plan accordingly!';
-  }
-
-  String _generateGeneralResponse(Map<String, dynamic> context) {
-    List<String> responses = [
-      'I\'m here to make your Pondicherry experience unforgettable! What would you like to explore? 🌺\n\n'
-      '• 🕉️ Spiritual ashrams and temples\n'
-      '• 🏄‍♂️ Beach adventures and water sports\n'
-      '• 🏛️ French colonial culture and history\n'
-      '• 🍽️ Fusion cuisine experiences\n'
-      '• 🚲 Transportation and local tips',
-      
-      'Pondicherry is a magical blend of cultures! Tell me what interests you most:\n\n'
-      '✨ Spiritual journeys and meditation\n'
-      '🌊 Coastal adventures and beaches\n'
-      '🎭 Cultural heritage and art\n'
-      '🍜 Local cuisine and dining\n'
-      '📍 Personalized itinerary planning',
-    ];
-    
-    return responses[Random().nextInt(responses.length)];
+  @override
+  void dispose() {
+    _entrance?.dispose();
+    super.dispose();
   }
 
-  List<BotAction> _generateActions(String intent, String message, Map<String, dynamic> context) {
-    List<BotAction> actions = [];
-    
-    switch (intent) {
-      case 'devotional':
-        actions.add(BotAction(type: 'show_map', data: {'location': 'Sri Aurobindo Ashram'}));
-        break;
-      case 'adventure':
-        actions.add(BotAction(type: 'show_map', data: {'location': 'Paradise Beach'}));
-        break;
-      case 'itinerary':
-        actions.add(BotAction(type: 'create_itinerary', data: context));
-        break;
-      case 'weather':
-        actions.add(BotAction(type: 'show_weather', data: {}));
-        break;
-    }
-    
-    return actions;
+  @override
+  Widget build(BuildContext context) {
+    Widget bubble = ValueListenableBuilder<ChatMessage>(
+      valueListenable: widget.message,
+      builder: (context, message, child) => _buildMessageBubble(context, message),
+    );
+
+    AnimationController? entrance = _entrance;
+    if (entrance == null) return bubble;
+
+    return FadeTransition(
+      opacity: entrance,
+      child: SlideTransition(
+        position: Tween<Offset>(
+          begin: Offset(widget.message.value.isUser ? 1.0 : -1.0, 0.0),
+          end: Offset.zero,
+        ).animate(CurvedAnimation(
+          parent: entrance,
+          curve: Curves.easeOut,
+        )),
+        child: bubble,
+      ),
+    );
   }
 
-  String generateWelcomeMessage(Map<String, dynamic> context) {
-    List<String> welcomeMessages = _responseTemplates['welcome']!;
-    String base = welcomeMessages[Random().nextInt(welcomeMessages.length)];
-    
-    String name = context['name'] ?? '';
-    if (name.isNotEmpty) {
-      base = base.replaceFirst('Welcome', 'Welcome, $name,');
-    }
-    
-    return base + '\n\nWhat would you like to explore today?';
+  Widget _buildMessageBubble(BuildContext context, ChatMessage message) {
+    return Padding(
+      padding: EdgeInsets.symmetric(vertical: 8),
+      child: Row(
+        mainAxisAlignment: message.isUser ? MainAxisAlignment.end : MainAxisAlignment.start,
+        crossAxisAlignment: CrossAxisAlignment.end,
+        children: [
+          if (!message.isUser) ChatAvatar(isUser: false),
+          if (!message.isUser) SizedBox(width: 12),
+          
+          Flexible(
+            child: Container(
+              constraints: BoxConstraints(maxWidth: MediaQuery.of(context).size.width * 0.75),
+              padding: EdgeInsets.symmetric(horizontal: 16, vertical: 12),
+              decoration: BoxDecoration(
+                color: message.isUser ? Color(0xFFE65100) : Colors.grey[200],
+                borderRadius: BorderRadius.circular(20).copyWith(
+                  bottomLeft: Radius.circular(message.isUser ? 20 : 4),
+                  bottomRight: Radius.circular(message.isUser ? 4 : 20),
+                ),
+                boxShadow: [
+                  BoxShadow(
+                    color: Colors.black.withOpacity(0.1),
+                    spreadRadius: 1,
+                    blurRadius: 3,
+                    offset: Offset(0, 1),
+                  ),
+                ],
+              ),
+              child: Column(
+                crossAxisAlignment: CrossAxisAlignment.start,
+                children: [
+                  Text(
+                    message.isStreaming ? '${message.text}▍' : message.text,
+                    style: TextStyle(
+                      color: message.isUser ? Colors.white : Colors.black87,
+                      fontSize: 16,
+                      height: 1.3,
+                    ),
+                  ),
+                  SizedBox(height: 6),
+                  Row(
+                    mainAxisSize: MainAxisSize.min,
+                    children: [
+                      Text(
+                        _formatTime(message.timestamp),
+                        style: TextStyle(
+                          color: message.isUser ? Colors.white70 : Colors.grey[600],
+                          fontSize: 11,
+                        ),
+                      ),
+                      if (!message.isUser && !message.isStreaming) ...[
+                        SizedBox(width: 8),
+                        GestureDetector(
+                          onTap: () => widget.onSpeak(message.text),
+                          child: Icon(
+                            Icons.volume_up,
+                            size: 14,
+                            color: Colors.grey[600],
+                          ),
+                        ),
+                      ],
+                    ],
+                  ),
+                ],
+              ),
+            ),
+          ),
+          
+          if (message.isUser) SizedBox(width: 12),
+          if (message.isUser) ChatAvatar(isUser: true),
+        ],
+      ),
+    );
   }
 
-  String getLocalizedMessage(String key, String language) {
-    Map<String, Map<String, String>> localizedMessages = {
-      'language_changed': {
-        'English': 'Great! I\'ve switched to English. How can I help you explore Pondicherry?',
-        'French': 'Parfait! J\'ai basculé en français. Comment puis-je vous aider à explorer Pondichéry?',
-        'Tamil': 'சிறப்பு! நான் தமிழுக்கு மாறிவிட்டேன். பாண்டிச்சேரியை ஆராய நான் எப்படி உதவ முடியும்?',
-        'Hindi': 'बहुत बढ़िया! मैं हिंदी में स्विच हो गया हूं। मैं आपको पांडिचेरी एक्सप्लोर करने में कैसे मदद कर सकता हूं?',
-      },
-    };
-    
-    return localizedMessages[key]?[language] ?? 
-           localizedMessages[key]?['English'] ?? 
-           'Message not available';
+  String _formatTime(DateTime dateTime) {
+    return '${dateTime.hour.toString().padLeft(2, '0')}:${dateTime.minute.toString().padLeft(2, '0')}';
   }
 }
 
-class AIResponse {
-  final String text;
-  final String intent;
-  final double confidence;
-  final List<BotAction> actions;
+class ChatAvatar extends StatelessWidget {
+  final bool isUser;
 
-  AIResponse({
-    required this.text,
-    required this.intent,
-    required this.confidence,
-    required this.actions,
-  });
+  const ChatAvatar({Key? key, required this.isUser}) : super(key: key);
+
+  @override
+  Widget build(BuildContext context) {
+    return Container(
+      width: 36,
+      height: 36,
+      decoration: BoxDecoration(
+        gradient: LinearGradient(
+          colors: isUser ? [Colors.blue, Colors.lightBlue] : [Color(0xFFE65100), Color(0xFFFF9800)],
+        ),
+        borderRadius: BorderRadius.circular(18),
+      ),
+      child: Icon(
+        isUser ? Icons.person : Icons.smart_toy,
+        color: Colors.white,
+        size: 20,
+      ),
+    );
+  }
 }
 
-class BotAction {
-  final String type;
-  final Map<String, dynamic> data;
+// Bouncing dots shown while a reply is pending. The controller exists only
+// while this widget is in the list, so nothing ticks between replies, and
+// the RepaintBoundary keeps its frames from repainting the messages.
+class TypingIndicator extends StatefulWidget {
+  const TypingIndicator({Key? key}) : super(key: key);
 
-  BotAction({required this.type, required this.data});
+  @override
+  _TypingIndicatorState createState() => _TypingIndicatorState();
 }
 
-class ConversationManager {
-  List<String> _conversationHistory = [];
-  
-  void addUserMessage(String message) {
-    _conversationHistory.add('User: $message');
-    if (_conversationHistory.length > 10) {
-      _conversationHistory.removeAt(0);
-    }
-  }
-  
-  void addBotMessage(String message) {
-    _conversationHistory.add('Bot: $message');
-    if (_conversationHistory.length > 10) {
-      _conversationHistory.removeAt(0);
-    }
+class _TypingIndicatorState extends State<TypingIndicator> with SingleTickerProviderStateMixin {
+  late final AnimationController _controller = AnimationController(
+    duration: Duration(seconds: 1),
+    vsync: this,
+  )..repeat();
+
+  @override
+  void dispose() {
+    _controller.dispose();
+    super.dispose();
   }
-  
-  List<String> getRecentHistory() {
-    return List.from(_conversationHistory);
+
+  @override
+  Widget build(BuildContext context) {
+    return Padding(
+      padding: EdgeInsets.symmetric(vertical: 8),
+      child: Row(
+        children: [
+          ChatAvatar(isUser: false),
+          SizedBox(width: 12),
+          RepaintBoundary(
+            child: Container(
+              padding: EdgeInsets.symmetric(horizontal: 16, vertical: 12),
+              decoration: BoxDecoration(
+                color: Colors.grey[200],
+                borderRadius: BorderRadius.circular(20).copyWith(
+                  bottomLeft: Radius.circular(4),
+                ),
+              ),
+              child: Row(
+                mainAxisSize: MainAxisSize.min,
+                children: [
+                  _buildTypingDot(0),
+                  SizedBox(width: 4),
+                  _buildTypingDot(1),
+                  SizedBox(width: 4),
+                  _buildTypingDot(2),
+                ],
+              ),
+            ),
+          ),
+        ],
+      ),
+    );
   }
-}
 
-class PersonalizationEngine {
-  void updatePreferences(Map<String, dynamic> context, String userMessage, AIResponse response) {
-    // Update user interests based on conversation
-    String intent = response.intent;
-    
-    List<String> interests = List<String>.from(context['interests'] ?? []);
-    if (!interests.contains(intent) && intent != 'general') {
-      interests.add(intent);
-      context['interests'] = interests.take(5).toList(); // Keep top 5 interests
-    }
-    
-    // Update visit history
-    Map<String, int> visitHistory = Map<String, int>.from(context['visit_history'] ?? {});
-    visitHistory[intent] = (visitHistory[intent] ?? 0) + 1;
-    context['visit_history'] = visitHistory;
+  Widget _buildTypingDot(int index) {
+    return AnimatedBuilder(
+      animation: _controller,
+      builder: (context, child) {
+        double value = (_controller.value + index * 0.33) % 1.0;
+        return Transform.translate(
+          offset: Offset(0, -10 * (value < 0.5 ? 2 * value : 2 * (1 - value))),
+          child: child,
+        );
+      },
+      child: Container(
+        width: 8,
+        height: 8,
+        decoration: BoxDecoration(
+          color: Colors.grey[400],
+          borderRadius: BorderRadius.circular(4),
+        ),
+      ),
+    );
   }
 }
 
-// UI Components
-
 class LanguageSelectorSheet extends StatelessWidget {
   final String currentLanguage;
   final Function(String) onLanguageSelected;
@@ -1138,14 +1218,7 @@ class LanguageSelectorSheet extends StatelessWidget {
 
   @override
   Widget build(BuildContext context) {
-    final languages = [
-      {'name': 'English', 'flag': '🇺🇸', 'native': 'English'},
-      {'name': 'French', 'flag': '🇫🇷', 'native': 'Français'},
-      {'name': 'Tamil', 'flag': '🇮🇳', 'native': 'தமிழ்'},
-      {'name': 'Hindi', 'flag': '🇮🇳', 'native': 'हिंदी'},
-      {'name': 'Spanish', 'flag': '🇪🇸', 'native': 'Español'},
-      {'name': 'German', 'flag': '🇩🇪', 'native': 'Deutsch'},
-    ];
+    const List<Map<String, String>> languages = ResourceRegistry.languageOptions;
 
     return Container(
       padding: EdgeInsets.all(20),
@@ -1392,6 +1465,46 @@ class ItineraryDialog extends StatelessWidget {
   }
 
   Widget _buildItineraryContent() {
+    List<dynamic> days = itinerary['days'] ?? const [];
+    if (days.isEmpty) return _buildSampleItinerary();
+
+    return Column(
+      children: [
+        ListTile(
+          leading: Icon(Icons.access_time, color: Color(0xFFE65100)),
+          title: Text('Duration: ${days.length} days'),
+          subtitle: Text('Estimated budget: ₹${itinerary['total_estimated_cost']}'),
+        ),
+        
+        ...days.map((dayPlan) {
+          return ExpansionTile(
+            leading: CircleAvatar(
+              backgroundColor: Color(0xFFE65100),
+              child: Text('${dayPlan['day']}', style: TextStyle(color: Colors.white)),
+            ),
+            title: Text('Day ${dayPlan['day']}: ${dayPlan['theme']}'),
+            children: [
+              Padding(
+                padding: EdgeInsets.symmetric(horizontal: 16),
+                child: Column(
+                  children: [
+                    for (dynamic activity in dayPlan['activities'])
+                      _buildTimelineItem(
+                        activity['time'],
+                        activity['activity'],
+                        activity['advisory'] ?? '${activity['location']} • ${activity['duration']}',
+                      ),
+                  ],
+                ),
+              ),
+            ],
+          );
+        }),
+      ],
+    );
+  }
+
+  Widget _buildSampleItinerary() {
     return Column(
       children: [
         ListTile(
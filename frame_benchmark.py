@@ -0,0 +1,117 @@
+// integration_test/chat_frame_benchmark.dart
+//
+// Frame timings for the advanced chat screen with a 5,000-message
+// conversation loaded, run on a device in profile mode:
+//
+//   flutter drive --profile --driver=test_driver/perf_driver.dart --target=integration_test/chat_frame_benchmark.dart
+//
+// Each scenario runs under watchPerformance, which records build and raster
+// time for every frame and reports averages, percentiles and missed-frame
+// counts under its key. A realtime tick should only rebuild the status bar
+// text and typing only the indicator row, so their frame times should not
+// grow with the conversation length the way whole-screen setState did.
+import 'package:flutter/material.dart';
+import 'package:flutter/services.dart';
+import 'package:flutter_test/flutter_test.dart';
+import 'package:integration_test/integration_test.dart';
+
+import 'package:pondy_travel_companion/advanced_chatbot_screen.dart';
+import 'package:pondy_travel_companion/services/realtime_data_service.dart';
+import 'package:pondy_travel_companion/services/resource_registry.dart';
+
+const int _conversationLength = 5000;
+const Duration _frame = Duration(milliseconds: 16);
+
+const List<String> _userTurns = [
+  'What are the best beaches?',
+  'Where can I meditate in the morning?',
+  'Suggest a cheap lunch near White Town',
+  'How do I rent a scooter?',
+];
+
+const List<String> _botTurns = [
+  'Paradise Beach is a short boat ride from Chunnambar and is quietest before 10 am.',
+  'The Sri Aurobindo Ashram opens at 5 am; the Matrimandir needs a pass booked a day ahead.\n\n'
+      'Both are calm early in the day and close to bike rentals.',
+  'Try the Creole thalis on Mission Street or the bakeries around Goubert Market.',
+  'Pondy Bike Rentals on Mission Street charges about ₹300 a day for an Activa.',
+];
+
+List<ChatMessage> syntheticConversation(int size) {
+  DateTime start = DateTime(2025, 1, 1, 9);
+  return List<ChatMessage>.generate(size, (i) {
+    bool isUser = i.isEven;
+    List<String> turns = isUser ? _userTurns : _botTurns;
+    return ChatMessage(
+      text: turns[(i ~/ 2) % turns.length],
+      isUser: isUser,
+      timestamp: start.add(Duration(seconds: 20 * i)),
+      messageId: 'seed_$i',
+    );
+  }, growable: false);
+}
+
+void main() {
+  IntegrationTestWidgetsFlutterBinding binding = IntegrationTestWidgetsFlutterBinding.ensureInitialized();
+  binding.framePolicy = LiveTestWidgetsFlutterBindingFramePolicy.fullyLive;
+
+  testWidgets('advanced chat screen frame timings', (tester) async {
+    // Never polls on its own; ticks are published by the test
+    RealtimeDataService realtime = RealtimeDataService(fetch: () async => const {});
+    await tester.pumpWidget(MaterialApp(
+      home: AdvancedChatbotScreen(
+        initialMessages: syntheticConversation(_conversationLength),
+        realtime: realtime,
+      ),
+    ));
+    await tester.pumpAndSettle();
+
+    Finder messages = find.byType(Scrollable).first;
+
+    await binding.watchPerformance(() async {
+      for (int i = 0; i < 6; i++) {
+        await tester.fling(messages, Offset(0, i.isEven ? 3000 : -3000), 5000);
+        await tester.pumpAndSettle();
+      }
+    }, reportKey: 'scroll_${_conversationLength}_messages');
+
+    await binding.watchPerformance(() async {
+      List<String> weather = ResourceRegistry.weatherConditions;
+      List<String> crowds = ResourceRegistry.crowdLevels;
+      for (int i = 0; i < 60; i++) {
+        realtime.publish({
+          'weather': weather[i % weather.length],
+          'crowd_levels': {'Paradise Beach': crowds[i % crowds.length]},
+        });
+        await tester.pump(_frame);
+      }
+    }, reportKey: 'realtime_ticks_${_conversationLength}_messages');
+
+    await binding.watchPerformance(() async {
+      await tester.enterText(find.byType(TextField), _userTurns.first);
+      await tester.testTextInput.receiveAction(TextInputAction.done);
+      // Typing indicator, then the streamed reply growing in its bubble
+      for (int i = 0; i < 90; i++) {
+        await tester.pump(_frame);
+      }
+    }, reportKey: 'send_and_stream_${_conversationLength}_messages');
+
+    await tester.pumpWidget(SizedBox.shrink());
+    realtime.dispose();
+  });
+}
+
+// test_driver/perf_driver.dart
+import 'package:integration_test/integration_test_driver.dart';
+
+// Writes each watchPerformance report to build/<reportKey>.json
+Future<void> main() {
+  return integrationDriver(
+    responseDataCallback: (data) async {
+      if (data == null) return;
+      for (MapEntry<String, dynamic> report in data.entries) {
+        await writeResponseData(report.value as Map<String, dynamic>, testOutputFilename: report.key);
+      }
+    },
+  );
+}
@@ -1,7 +1,14 @@
 import 'package:flutter/material.dart';
 import 'package:flutter/services.dart';
 import 'dart:convert';
-import 'dart:math';
+
+import 'services/latency_policy.dart';
+import 'services/message_store.dart';
+import 'services/poi_catalog.dart';
+import 'services/pondy_guide.dart';
+import 'services/resource_registry.dart';
+import 'services/translation_catalog.dart';
+import 'services/translation_service.dart';
 
 void main() {
   runApp(PondyChatbotApp());
@@ -34,382 +41,204 @@ class _ChatbotHomePageState extends State<ChatbotHomePage>
   final TextEditingController _messageController = TextEditingController();
   final ScrollController _scrollController = ScrollController();
   
+  // Newest [_maxInMemory] messages plus any pages read back through;
+  // the rest stays in the store
+  static const String _sessionId = 'home';
+  static const int _pageSize = 50;
+  static const int _maxInMemory = 200;
   List<ChatMessage> _messages = [];
+  MessageStore? _store;
+  bool _hasOlder = false;
+  bool _loadingOlder = false;
   String _selectedLanguage = 'English';
   bool _isTyping = false;
   String _userName = '';
   Map<String, dynamic> _userPreferences = {};
+  final LatencyTracker _latency = LatencyTracker(LatencyPolicy.production);
   
-  // Supported languages
-  final Map<String, String> _languages = {
-    'English': 'en',
-    'French': 'fr',
-    'Tamil': 'ta',
-    'Hindi': 'hi',
-    'Spanish': 'es',
-    'German': 'de',
-  };
-  
-  // Sample Pondicherry data (in production, this would come from APIs)
-  final Map<String, dynamic> _pondyData = {
-    'attractions': {
-      'devotional': [
-        {
-          'name': 'Sri Aurobindo Ashram',
-          'description': 'Spiritual center founded by Sri Aurobindo',
-          'location': 'White Town',
-          'crowd_level': 'moderate',
-          'best_time': 'early_morning',
-          'story': 'Founded in 1926, this ashram is the heart of Pondicherry\'s spiritual heritage.'
-        },
-        {
-          'name': 'Immaculate Conception Cathedral',
-          'description': 'Beautiful French colonial church',
-          'location': 'Mission Street',
-          'crowd_level': 'low',
-          'best_time': 'evening',
-          'story': 'Built in 1791, showcasing Gothic architecture with French colonial influence.'
-        },
-      ],
-      'adventure': [
-        {
-          'name': 'Paradise Beach',
-          'description': 'Pristine beach accessible by boat',
-          'location': 'Chunnambar',
-          'crowd_level': 'high',
-          'best_time': 'morning',
-          'story': 'A secluded paradise reached through backwater boat rides.'
-        },
-        {
-          'name': 'Scuba Diving at Temple Adventures',
-          'description': 'Underwater exploration experience',
-          'location': 'Auroville Beach',
-          'crowd_level': 'low',
-          'best_time': 'afternoon',
-          'story': 'Discover the underwater world of the Bay of Bengal.'
-        },
-      ],
-      'party': [
-        {
-          'name': 'Le Club',
-          'description': 'Beachside nightclub with live music',
-          'location': 'Promenade Beach',
-          'crowd_level': 'high',
-          'best_time': 'night',
-          'story': 'The hotspot for Pondicherry nightlife since 2010.'
-        },
-      ]
-    },
-    'events': [
-      {
-        'name': 'Bastille Day Celebration',
-        'date': '2025-07-14',
-        'location': 'French Quarter',
-        'description': 'French cultural celebration with parades'
-      },
-      {
-        'name': 'International Yoga Festival',
-        'date': '2025-12-21',
-        'location': 'Auroville',
-        'description': 'Week-long yoga and meditation retreat'
-      },
-    ],
-    'transport': {
-      'bike_rentals': [
-        {
-          'name': 'Pondy Bike Rentals',
-          'location': 'Mission Street',
-          'price_per_day': 300,
-          'types': ['Activa', 'Pulsar', 'Royal Enfield'],
-          'contact': '+91-9876543210'
-        },
-        {
-          'name': 'French Quarter Bikes',
-          'location': 'Rue Dumas',
-          'price_per_day': 250,
-          'types': ['Hero Honda', 'Activa'],
-          'contact': '+91-9876543211'
-        },
-      ]
-    }
-  };
+  // Headless responder behind this screen, ready once the shared catalog loads
+  PondyGuide? _guide;
+
+  Future<PondyGuide> _loadGuide() async {
+    return _guide ??= PondyGuide(await PoiCatalog.load(
+      () => rootBundle.loadString(PoiCatalog.assetPath),
+    ));
+  }
 
   @override
   void initState() {
     super.initState();
+    _scrollController.addListener(_onScroll);
     _initializeChat();
   }
 
-  void _initializeChat() {
-    Future.delayed(Duration(milliseconds: 500), () {
-      setState(() {
-        _messages.add(ChatMessage(
-          text: _getLocalizedText('welcome_message'),
-          isUser: false,
-          timestamp: DateTime.now(),
-        ));
-      });
-    });
+  @override
+  void dispose() {
+    _store?.flushInBackground();
+    _scrollController.dispose();
+    _messageController.dispose();
+    super.dispose();
   }
 
-  String _getLocalizedText(String key) {
-    // Simplified localization - in production, use proper i18n
-    Map<String, Map<String, String>> translations = {
-      'welcome_message': {
-        'en': 'Bonjour! Welcome to Pondicherry! 🌺 I\'m your personal travel companion. What would you like to explore today?',
-        'fr': 'Bonjour! Bienvenue à Pondichéry! 🌺 Je suis votre compagnon de voyage personnel. Que souhaitez-vous explorer aujourd\'hui?',
-        'ta': 'வணக்கம்! பாண்டிச்சேரிக்கு வரவேற்கிறோம்! 🌺 நான் உங்கள் தனிப்பட்ட பயண துணை. இன்று நீங்கள் என்ன ஆராய விரும்புகிறீர்கள்?',
-      },
-      'thinking': {
-        'en': 'Let me think about that...',
-        'fr': 'Laissez-moi réfléchir à cela...',
-        'ta': 'அதைப் பற்றி யோசிக்கிறேன்...',
-      }
-    };
-    
-    String langCode = _languages[_selectedLanguage] ?? 'en';
-    return translations[key]?[langCode] ?? translations[key]?['en'] ?? 'Translation not available';
+  void _initializeChat() async {
+    // Only the active locale's strings are read at startup
+    TranslationCatalog.shared.attach(rootBundle.loadString);
+    await Future.wait([
+      TranslationCatalog.shared.setLocale(TranslationService.getLanguageCode(_selectedLanguage)),
+      _restoreHistory(),
+      Future.delayed(Duration(milliseconds: 500)),
+    ]);
+    if (!mounted || _messages.isNotEmpty) return;
+    _addMessage(_getLocalizedText('welcome_message'), false);
   }
 
-  void _sendMessage(String text) {
-    if (text.trim().isEmpty) return;
-
-    setState(() {
-      _messages.add(ChatMessage(
-        text: text,
-        isUser: true,
-        timestamp: DateTime.now(),
-      ));
-      _isTyping = true;
-    });
-
-    _messageController.clear();
-    _scrollToBottom();
-
-    // Simulate AI processing
-    Future.delayed(Duration(seconds: 2), () {
-      String response = _processUserMessage(text);
+  Future<void> _restoreHistory() async {
+    try {
+      MessageStore store = await MessageStore.shared;
+      _store = store;
+      List<StoredMessage> latest = await store.pageBefore(_sessionId, limit: _pageSize);
+      if (!mounted) return;
       setState(() {
-        _messages.add(ChatMessage(
-          text: response,
-          isUser: false,
-          timestamp: DateTime.now(),
-        ));
-        _isTyping = false;
+        _messages.insertAll(0, latest.map(_fromStored));
+        _hasOlder = latest.length == _pageSize;
       });
-      _scrollToBottom();
-    });
-  }
-
-  String _processUserMessage(String message) {
-    String lowerMessage = message.toLowerCase();
-    
-    // Intent recognition (simplified)
-    if (lowerMessage.contains('temple') || lowerMessage.contains('spiritual') || lowerMessage.contains('devotional')) {
-      return _generateDevotionalRecommendations();
-    } else if (lowerMessage.contains('adventure') || lowerMessage.contains('beach') || lowerMessage.contains('diving')) {
-      return _generateAdventureRecommendations();
-    } else if (lowerMessage.contains('party') || lowerMessage.contains('nightlife') || lowerMessage.contains('club')) {
-      return _generatePartyRecommendations();
-    } else if (lowerMessage.contains('bike') || lowerMessage.contains('rental') || lowerMessage.contains('transport')) {
-      return _generateBikeRentalInfo();
-    } else if (lowerMessage.contains('event') || lowerMessage.contains('festival')) {
-      return _generateEventInfo();
-    } else if (lowerMessage.contains('itinerary') || lowerMessage.contains('plan') || lowerMessage.contains('schedule')) {
-      return _generateItinerary();
-    } else if (lowerMessage.contains('budget') || lowerMessage.contains('cheap') || lowerMessage.contains('affordable')) {
-      return _generateBudgetPlan();
-    } else if (lowerMessage.contains('language')) {
-      return _handleLanguageChange(message);
-    } else {
-      return _generateGeneralResponse();
+    } catch (e) {
+      // Chat still works without saved history
     }
   }
 
-  String _generateDevotionalRecommendations() {
-    List<dynamic> devotionalSpots = _pondyData['attractions']['devotional'];
-    StringBuffer response = StringBuffer();
-    
-    response.writeln('🕉️ Here are some spiritual places in Pondicherry:');
-    response.writeln();
-    
-    for (var spot in devotionalSpots) {
-      response.writeln('📍 ${spot['name']}');
-      response.writeln('   ${spot['description']}');
-      response.writeln('   Location: ${spot['location']}');
-      response.writeln('   Best time: ${spot['best_time']}');
-      response.writeln('   Story: ${spot['story']}');
-      response.writeln('   Current crowd: ${spot['crowd_level']}');
-      response.writeln();
-    }
-    
-    response.writeln('Would you like me to create a spiritual itinerary for you? 🙏');
-    return response.toString();
-  }
+  Future<void> _loadOlderMessages() async {
+    MessageStore? store = _store;
+    if (store == null || _loadingOlder || !_hasOlder || _messages.isEmpty) return;
 
-  String _generateAdventureRecommendations() {
-    List<dynamic> adventureSpots = _pondyData['attractions']['adventure'];
-    StringBuffer response = StringBuffer();
-    
-    response.writeln('🏄‍♂️ Adventure awaits in Pondicherry!');
-    response.writeln();
-    
-    for (var spot in adventureSpots) {
-      response.writeln('🌊 ${spot['name']}');
-      response.writeln('   ${spot['description']}');
-      response.writeln('   Location: ${spot['location']}');
-      response.writeln('   Best time: ${spot['best_time']}');
-      response.writeln('   Story: ${spot['story']}');
-      response.writeln('   Current crowd: ${spot['crowd_level']}');
-      response.writeln();
+    _loadingOlder = true;
+    try {
+      List<StoredMessage> older = await store.pageBefore(
+        _sessionId,
+        before: _messages.first.timestamp,
+        beforeId: _messages.first.messageId,
+        limit: _pageSize,
+      );
+      if (!mounted) return;
+      setState(() {
+        _messages.insertAll(0, older.map(_fromStored));
+        _hasOlder = older.length == _pageSize;
+      });
+    } catch (e) {
+      // Keeps what is loaded; the next scroll-up tries again
+    } finally {
+      _loadingOlder = false;
     }
-    
-    response.writeln('💡 Tip: Early morning visits help avoid crowds! Would you like transportation recommendations?');
-    return response.toString();
   }
 
-  String _generatePartyRecommendations() {
-    List<dynamic> partySpots = _pondyData['attractions']['party'];
-    StringBuffer response = StringBuffer();
-    
-    response.writeln('🎉 Let\'s explore Pondy\'s nightlife!');
-    response.writeln();
-    
-    for (var spot in partySpots) {
-      response.writeln('🍹 ${spot['name']}');
-      response.writeln('   ${spot['description']}');
-      response.writeln('   Location: ${spot['location']}');
-      response.writeln('   Best time: ${spot['best_time']}');
-      response.writeln('   Story: ${spot['story']}');
-      response.writeln('   Current crowd: ${spot['crowd_level']}');
-      response.writeln();
+  // The list is reversed, so maxScrollExtent is the oldest loaded message
+  void _onScroll() {
+    ScrollPosition position = _scrollController.position;
+    if (position.pixels >= position.maxScrollExtent - 600) {
+      _loadOlderMessages();
+    } else if (position.pixels <= 0) {
+      _trimHistory();
     }
-    
-    response.writeln('🚨 Safety tip: Always travel in groups and inform someone about your plans!');
-    return response.toString();
   }
 
-  String _generateBikeRentalInfo() {
-    List<dynamic> rentals = _pondyData['transport']['bike_rentals'];
-    StringBuffer response = StringBuffer();
-    
-    response.writeln('🏍️ Bike Rental Options in Pondicherry:');
-    response.writeln();
-    
-    for (var rental in rentals) {
-      response.writeln('🚲 ${rental['name']}');
-      response.writeln('   Location: ${rental['location']}');
-      response.writeln('   Price: ₹${rental['price_per_day']}/day');
-      response.writeln('   Available bikes: ${rental['types'].join(', ')}');
-      response.writeln('   Contact: ${rental['contact']}');
-      response.writeln();
-    }
-    
-    response.writeln('📋 Required documents: Valid ID, Driving License');
-    response.writeln('💡 Tip: Book in advance during peak season!');
-    return response.toString();
+  // Drops pages read back through once the newest messages are in view
+  void _trimHistory() {
+    if (_store == null || _messages.length <= _maxInMemory) return;
+    if (_scrollController.hasClients && _scrollController.position.pixels > 0) return;
+    setState(() {
+      _messages.removeRange(0, _messages.length - _maxInMemory);
+      _hasOlder = true;
+    });
   }
 
-  String _generateEventInfo() {
-    List<dynamic> events = _pondyData['events'];
-    StringBuffer response = StringBuffer();
-    
-    response.writeln('🎭 Upcoming Events in Pondicherry:');
-    response.writeln();
-    
-    for (var event in events) {
-      response.writeln('🎪 ${event['name']}');
-      response.writeln('   Date: ${event['date']}');
-      response.writeln('   Location: ${event['location']}');
-      response.writeln('   ${event['description']}');
-      response.writeln();
-    }
-    
-    response.writeln('Would you like me to add any of these events to your itinerary?');
-    return response.toString();
+  void _addMessage(String text, bool isUser) {
+    ChatMessage message = ChatMessage(
+      text: text,
+      isUser: isUser,
+      timestamp: DateTime.now(),
+      messageId: MessageStore.newMessageId(),
+    );
+    setState(() {
+      _messages.add(message);
+    });
+    _store?.add(StoredMessage(
+      messageId: message.messageId,
+      sessionId: _sessionId,
+      isUser: isUser,
+      text: text,
+      timestamp: message.timestamp,
+    ));
+    _trimHistory();
   }
 
-  String _generateItinerary() {
-    StringBuffer response = StringBuffer();
-    
-    response.writeln('📅 Suggested 3-Day Pondicherry Itinerary:');
-    response.writeln();
-    
-    response.writeln('Day 1: French Heritage 🇫🇷');
-    response.writeln('• Morning: Sri Aurobindo Ashram');
-    response.writeln('• Afternoon: French Quarter walk');
-    response.writeln('• Evening: Promenade Beach sunset');
-    response.writeln();
-    
-    response.writeln('Day 2: Adventure & Nature 🌊');
-    response.writeln('• Morning: Paradise Beach (boat ride)');
-    response.writeln('• Afternoon: Auroville exploration');
-    response.writeln('• Evening: Scuba diving session');
-    response.writeln();
-    
-    response.writeln('Day 3: Culture & Relaxation 🎭');
-    response.writeln('• Morning: Local market visit');
-    response.writeln('• Afternoon: Cathedral visit');
-    response.writeln('• Evening: Le Club for nightlife');
-    response.writeln();
-    
-    response.writeln('⏰ Current traffic conditions suggest starting early morning for better experience!');
-    response.writeln('Would you like me to customize this based on your preferences?');
-    
-    return response.toString();
+  ChatMessage _fromStored(StoredMessage message) {
+    return ChatMessage(
+      text: message.text,
+      isUser: message.isUser,
+      timestamp: message.timestamp,
+      messageId: message.messageId,
+    );
   }
 
-  String _generateBudgetPlan() {
-    StringBuffer response = StringBuffer();
-    
-    response.writeln('💰 Budget-Friendly Pondicherry Plan:');
-    response.writeln();
-    
-    response.writeln('🏠 Accommodation (per night):');
-    response.writeln('• Budget: ₹800-1500 (hostels/guesthouses)');
-    response.writeln('• Mid-range: ₹2000-4000 (boutique hotels)');
-    response.writeln();
-    
-    response.writeln('🍽️ Food (per day):');
-    response.writeln('• Local eateries: ₹400-600');
-    response.writeln('• Mid-range restaurants: ₹800-1200');
-    response.writeln();
-    
-    response.writeln('🚲 Transportation:');
-    response.writeln('• Bike rental: ₹250-300/day');
-    response.writeln('• Auto/taxi: ₹500-800/day');
-    response.writeln();
-    
-    response.writeln('🎫 Attractions:');
-    response.writeln('• Most spiritual sites: Free');
-    response.writeln('• Museums: ₹10-50');
-    response.writeln('• Adventure activities: ₹500-2000');
-    response.writeln();
-    
-    response.writeln('💡 Total budget estimate: ₹1500-3000 per day');
-    response.writeln('Would you like specific money-saving tips?');
-    
-    return response.toString();
+  String _getLocalizedText(String key) {
+    return TranslationCatalog.shared.translate(key, orElse: 'Translation not available');
   }
 
-  String _handleLanguageChange(String message) {
-    return 'To change language, please use the language selector at the top. I support English, French, Tamil, Hindi, Spanish, and German! 🌍';
+  void _changeLanguage(String language) async {
+    await TranslationCatalog.shared.setLocale(TranslationService.getLanguageCode(language));
+    setState(() {
+      _selectedLanguage = language;
+    });
+    _sendMessage('Language changed to $_selectedLanguage');
   }
 
-  String _generateGeneralResponse() {
-    List<String> responses = [
-      'I can help you with:\n• Tourist attractions (devotional, adventure, party spots)\n• Bike rentals and transportation\n• Cultural events and festivals\n• Budget planning\n• Custom itineraries\n• Real-time crowd and traffic updates\n\nWhat interests you most?',
-      'Pondicherry is beautiful! I can guide you through its French colonial charm, spiritual ashrams, pristine beaches, and vibrant culture. What aspect would you like to explore?',
-      'As your travel companion, I\'m here to make your Pondicherry experience unforgettable! Tell me about your interests - adventure, spirituality, culture, or nightlife?',
-    ];
-    
-    return responses[Random().nextInt(responses.length)];
+  void _sendMessage(String text) async {
+    if (text.trim().isEmpty) return;
+
+    _addMessage(text, true);
+    setState(() {
+      _isTyping = true;
+    });
+
+    _messageController.clear();
+    _scrollToBottom();
+
+    PondyGuide guide;
+    try {
+      guide = await _loadGuide();
+    } catch (e) {
+      if (!mounted) return;
+      setState(() {
+        _isTyping = false;
+      });
+      _addMessage("I apologize, but I'm having trouble processing that right now. Could you please try again?", false);
+      _scrollToBottom();
+      return;
+    }
+    Stopwatch stopwatch = Stopwatch()..start();
+    String response = guide.respond(text);
+    _latency.record(stopwatch.elapsed);
+
+    // Optional cosmetic pause so the typing indicator doesn't just flash
+    Duration remaining = _latency.policy.typingDelay - stopwatch.elapsed;
+    if (remaining > Duration.zero) {
+      await Future.delayed(remaining);
+    }
+
+    if (!mounted) return;
+    setState(() {
+      _isTyping = false;
+    });
+    _addMessage(response, false);
+    _scrollToBottom();
   }
 
   void _scrollToBottom() {
     Future.delayed(Duration(milliseconds: 100), () {
+      if (!_scrollController.hasClients) return;
+      // Reversed list: the newest message is at offset 0
       _scrollController.animateTo(
-        _scrollController.position.maxScrollExtent,
+        0,
         duration: Duration(milliseconds: 300),
         curve: Curves.easeOut,
       );
@@ -426,14 +255,9 @@ class _ChatbotHomePageState extends State<ChatbotHomePage>
         actions: [
           PopupMenuButton<String>(
             icon: Icon(Icons.language),
-            onSelected: (String language) {
-              setState(() {
-                _selectedLanguage = language;
-              });
-              _sendMessage('Language changed to $_selectedLanguage');
-            },
+            onSelected: _changeLanguage,
             itemBuilder: (BuildContext context) {
-              return _languages.keys.map((String language) {
+              return ResourceRegistry.languageCodes.keys.map((String language) {
                 return PopupMenuItem<String>(
                   value: language,
                   child: Text('$language ${language == _selectedLanguage ? '✓' : ''}'),
@@ -449,13 +273,15 @@ class _ChatbotHomePageState extends State<ChatbotHomePage>
           Expanded(
             child: ListView.builder(
               controller: _scrollController,
+              reverse: true,
               padding: EdgeInsets.all(16),
               itemCount: _messages.length + (_isTyping ? 1 : 0),
               itemBuilder: (context, index) {
-                if (index == _messages.length) {
+                int offset = _isTyping ? 1 : 0;
+                if (index < offset) {
                   return _buildTypingIndicator();
                 }
-                return _buildMessageBubble(_messages[index]);
+                return _buildMessageBubble(_messages[_messages.length - 1 - (index - offset)]);
               },
             ),
           ),
@@ -600,10 +426,12 @@ class ChatMessage {
   final String text;
   final bool isUser;
   final DateTime timestamp;
+  final String messageId;
 
   ChatMessage({
     required this.text,
     required this.isUser,
     required this.timestamp,
+    required this.messageId,
   });
 }
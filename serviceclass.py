@@ -1,470 +1,5142 @@
 // services/ai_service.dart
+import 'dart:async';
+import 'dart:collection';
 import 'dart:convert';
+import 'dart:developer' as developer;
+import 'dart:isolate';
 import 'dart:math';
+import 'dart:typed_data';
+
+import 'package:path/path.dart' show join;
+import 'package:sqflite/sqflite.dart';
+import 'package:uuid/uuid.dart';
 
 class AIService {
-  static const Map<String, List<String>> _intentKeywords = {
-    'devotional': ['temple', 'spiritual', 'prayer', 'ashram', 'devotional', 'meditation', 'peace'],
-    'adventure': ['adventure', 'beach', 'diving', 'water sports', 'thrilling', 'exciting', 'outdoor'],
-    'party': ['party', 'nightlife', 'club', 'bar', 'music', 'dance', 'drinks'],
-    'transport': ['bike', 'rental', 'transport', 'vehicle', 'scooter', 'travel'],
-    'events': ['event', 'festival', 'celebration', 'culture', 'show', 'performance'],
-    'food': ['food', 'restaurant', 'eat', 'cuisine', 'dining', 'meal', 'hungry'],
-    'accommodation': ['hotel', 'stay', 'accommodation', 'room', 'lodge', 'guesthouse'],
-    'budget': ['budget', 'cheap', 'affordable', 'cost', 'price', 'money', 'expense'],
-    'itinerary': ['plan', 'itinerary', 'schedule', 'route', 'trip', 'visit', 'tour'],
+  static String classifyIntent(String message) {
+    return IntentClassifier.shared.classify(message).intent;
+  }
+
+  static double calculateSentiment(String message) {
+    return SentimentLexicon.shared.score(message);
+  }
+
+  static Float64List calculateSentimentBatch(List<String> messages) {
+    return SentimentLexicon.shared.scoreBatch(messages);
+  }
+}
+
+// services/keyword_automaton.dart
+// Aho-Corasick automaton over a labelled keyword table. Matches are only
+// reported on word boundaries, allowing common inflections (-s, -es, -ed,
+// -ing), so "bar" no longer fires inside "Bharathi" while "temples",
+// "eating" and "planning" still find their keywords.
+class KeywordAutomaton {
+  final List<String> labels;
+  final List<String> _patternKeywords = [];
+  final List<int> _patternLabels = [];
+  final List<int> _patternLengths = [];
+  final List<Map<int, int>> _transitions = [{}];
+  final List<int> _failure = [0];
+  final List<List<int>> _outputs = [[]];
+
+  KeywordAutomaton(Map<String, List<String>> keywordsByLabel)
+      : labels = List.unmodifiable(keywordsByLabel.keys) {
+    int label = 0;
+    for (List<String> keywords in keywordsByLabel.values) {
+      for (String keyword in keywords) {
+        _addPattern(keyword, label);
+      }
+      label++;
+    }
+    _buildFailureLinks();
+  }
+
+  int get patternCount => _patternLabels.length;
+
+  int labelOf(int pattern) => _patternLabels[pattern];
+
+  String keywordOf(int pattern) => _patternKeywords[pattern];
+
+  // Returns the ids of every distinct pattern found in [text].
+  Set<int> match(String text) {
+    Set<int> matched = <int>{};
+    String lower = text.toLowerCase();
+    int state = 0;
+
+    for (int i = 0; i < lower.length; i++) {
+      int unit = lower.codeUnitAt(i);
+      while (state != 0 && !_transitions[state].containsKey(unit)) {
+        state = _failure[state];
+      }
+      state = _transitions[state][unit] ?? 0;
+
+      for (int pattern in _outputs[state]) {
+        int start = i - _patternLengths[pattern] + 1;
+        if (_isWordStart(lower, start) && _isWordEnd(lower, i + 1)) {
+          matched.add(pattern);
+        }
+      }
+    }
+
+    return matched;
+  }
+
+  void _addPattern(String keyword, int label) {
+    if (keyword.isEmpty) return;
+
+    int state = 0;
+    for (int unit in keyword.toLowerCase().codeUnits) {
+      int? next = _transitions[state][unit];
+      if (next == null) {
+        next = _transitions.length;
+        _transitions.add({});
+        _failure.add(0);
+        _outputs.add([]);
+        _transitions[state][unit] = next;
+      }
+      state = next;
+    }
+
+    _outputs[state].add(_patternLabels.length);
+    _patternKeywords.add(keyword);
+    _patternLabels.add(label);
+    _patternLengths.add(keyword.toLowerCase().length);
+  }
+
+  void _buildFailureLinks() {
+    Queue<int> queue = Queue<int>.of(_transitions[0].values);
+
+    while (queue.isNotEmpty) {
+      int state = queue.removeFirst();
+      _transitions[state].forEach((unit, child) {
+        int fallback = _failure[state];
+        while (fallback != 0 && !_transitions[fallback].containsKey(unit)) {
+          fallback = _failure[fallback];
+        }
+        _failure[child] = _transitions[fallback][unit] ?? 0;
+        _outputs[child].addAll(_outputs[_failure[child]]);
+        queue.add(child);
+      });
+    }
+  }
+
+  static bool _isWordStart(String text, int start) {
+    return start == 0 || !_isWordUnit(text.codeUnitAt(start - 1));
+  }
+
+  static bool _isWordEnd(String text, int end) {
+    if (_isBoundary(text, end)) return true;
+    if (_endsWithSuffix(text, end, 's') || _endsWithSuffix(text, end, 'ed') || _endsWithSuffix(text, end, 'ing')) {
+      return true;
+    }
+    // "-es" only after a sibilant ("beaches"), so "plan" skips "planes"
+    if ('sxzh'.contains(text[end - 1]) && _endsWithSuffix(text, end, 'es')) return true;
+    // Doubled final consonant: "planning", "clubbed"
+    int last = text.codeUnitAt(end - 1);
+    return text.codeUnitAt(end) == last &&
+        !'aeiou'.contains(text[end - 1]) &&
+        (_endsWithSuffix(text, end + 1, 'ing') || _endsWithSuffix(text, end + 1, 'ed'));
+  }
+
+  static bool _endsWithSuffix(String text, int end, String suffix) {
+    return text.startsWith(suffix, end) && _isBoundary(text, end + suffix.length);
+  }
+
+  static bool _isBoundary(String text, int index) {
+    return index == text.length || !_isWordUnit(text.codeUnitAt(index));
+  }
+
+  static bool _isWordUnit(int unit) {
+    return (unit >= 0x61 && unit <= 0x7a) || (unit >= 0x30 && unit <= 0x39) || unit >= 0x80;
+  }
+}
+
+// services/sentiment_lexicon.dart
+// Weighted sentiment lexicon compiled into a character trie. A message is
+// scored in one pass over its code units with no per-word allocation:
+// negators ("not good") flip and dampen the next sentiment term within three
+// words, and intensifiers ("very") scale it.
+class SentimentLexicon {
+  static const Map<String, double> defaultWeights = {
+    'good': 0.1, 'great': 0.15, 'amazing': 0.2, 'love': 0.2, 'loved': 0.2, 'lovely': 0.15,
+    'beautiful': 0.15, 'wonderful': 0.2, 'excellent': 0.2, 'awesome': 0.2, 'fantastic': 0.2,
+    'nice': 0.1, 'enjoy': 0.1, 'enjoyed': 0.15, 'happy': 0.15, 'perfect': 0.2, 'best': 0.15,
+    'peaceful': 0.1, 'clean': 0.1, 'friendly': 0.1, 'delicious': 0.15, 'fun': 0.1,
+    'recommend': 0.1, 'helpful': 0.1, 'relaxing': 0.1, 'stunning': 0.2, 'charming': 0.1,
+    'cozy': 0.1, 'like': 0.05, 'liked': 0.1, 'thanks': 0.05, 'thank': 0.05,
+    'bad': -0.1, 'terrible': -0.2, 'awful': -0.2, 'hate': -0.2, 'hated': -0.2,
+    'horrible': -0.2, 'disappointing': -0.15, 'disappointed': -0.15, 'dirty': -0.15,
+    'crowded': -0.1, 'expensive': -0.05, 'overpriced': -0.1, 'rude': -0.15, 'boring': -0.1,
+    'worst': -0.2, 'poor': -0.1, 'noisy': -0.1, 'unsafe': -0.2, 'scam': -0.2, 'sad': -0.1,
+    'annoying': -0.1, 'slow': -0.05, 'problem': -0.1, 'unfortunately': -0.1, 'smelly': -0.1,
   };
 
-  static String classifyIntent(String message) {
-    String lowerMessage = message.toLowerCase();
-    Map<String, int> intentScores = {};
-
-    for (String intent in _intentKeywords.keys) {
-      int score = 0;
-      for (String keyword in _intentKeywords[intent]!) {
-        if (lowerMessage.contains(keyword)) {
-          score++;
+  static const List<String> _negators = [
+    'not', 'no', 'never', 'hardly', 'nothing', 'without', 'cannot',
+    "don't", 'dont', "doesn't", "didn't", "isn't", "wasn't", "aren't", "can't", "won't",
+  ];
+
+  static const Map<String, double> _intensifiers = {
+    'very': 1.5, 'really': 1.4, 'so': 1.3, 'extremely': 1.8, 'super': 1.5,
+    'absolutely': 1.6, 'too': 1.2, 'quite': 1.2,
+  };
+
+  static const int _none = 0;
+  static const int _term = 1;
+  static const int _negator = 2;
+  static const int _intensifier = 3;
+
+  static const int _negationReach = 3;
+  static const double _negationFactor = -0.75;
+
+  static final SentimentLexicon shared = SentimentLexicon(defaultWeights);
+
+  final List<Map<int, int>> _children = [{}];
+  final List<int> _kinds = [_none];
+  final List<double> _values = [0.0];
+
+  SentimentLexicon(Map<String, double> weights) {
+    weights.forEach((term, weight) => _insert(term, _term, weight));
+    for (String negator in _negators) {
+      _insert(negator, _negator, 0.0);
+    }
+    _intensifiers.forEach((word, factor) => _insert(word, _intensifier, factor));
+  }
+
+  // Loads a larger lexicon from a JSON object of term -> weight.
+  factory SentimentLexicon.fromJson(String source) {
+    Map<String, dynamic> entries = jsonDecode(source);
+    return SentimentLexicon(entries.map((term, weight) => MapEntry(term, (weight as num).toDouble())));
+  }
+
+  double score(String message) {
+    double sentiment = 0.0;
+    double intensity = 1.0;
+    int negation = 0;
+    int node = 0;
+    bool inWord = false;
+
+    for (int i = 0; i <= message.length; i++) {
+      int unit = i < message.length ? _fold(message.codeUnitAt(i)) : 0x20;
+
+      if (_isWordUnit(unit)) {
+        inWord = true;
+        if (node != -1) node = _children[node][unit] ?? -1;
+        continue;
+      }
+
+      if (inWord) {
+        int kind = node == -1 ? _none : _kinds[node];
+        if (kind == _negator) {
+          negation = _negationReach;
+        } else if (kind == _intensifier) {
+          intensity *= _values[node];
+        } else if (kind == _term) {
+          double weight = _values[node] * intensity;
+          sentiment += negation > 0 ? weight * _negationFactor : weight;
+          negation = 0;
+          intensity = 1.0;
+        } else {
+          if (negation > 0) negation--;
+          intensity = 1.0;
+        }
+        node = 0;
+        inWord = false;
+      }
+
+      // Clause punctuation ends any pending negation or intensifier.
+      if (unit == 0x2e || unit == 0x21 || unit == 0x3f || unit == 0x2c || unit == 0x3b) {
+        negation = 0;
+        intensity = 1.0;
+      }
+    }
+
+    return sentiment.clamp(-1.0, 1.0);
+  }
+
+  Float64List scoreBatch(List<String> messages) {
+    Float64List scores = Float64List(messages.length);
+    for (int i = 0; i < messages.length; i++) {
+      scores[i] = score(messages[i]);
+    }
+    return scores;
+  }
+
+  void _insert(String word, int kind, double value) {
+    int node = 0;
+    for (int unit in word.toLowerCase().codeUnits) {
+      int? next = _children[node][unit];
+      if (next == null) {
+        next = _children.length;
+        _children.add({});
+        _kinds.add(_none);
+        _values.add(0.0);
+        _children[node][unit] = next;
+      }
+      node = next;
+    }
+    _kinds[node] = kind;
+    _values[node] = value;
+  }
+
+  static int _fold(int unit) {
+    if (unit >= 0x41 && unit <= 0x5a) return unit + 0x20;
+    if (unit == 0x2019) return 0x27; // typographic apostrophe
+    return unit;
+  }
+
+  static bool _isWordUnit(int unit) {
+    return (unit >= 0x61 && unit <= 0x7a) ||
+        (unit >= 0x30 && unit <= 0x39) ||
+        unit == 0x27 ||
+        unit >= 0x80;
+  }
+}
+
+// services/intent_classifier.dart
+class IntentResult {
+  final String intent;
+  final double score;
+  final double confidence;
+
+  const IntentResult({
+    required this.intent,
+    required this.score,
+    required this.confidence,
+  });
+
+  static const IntentResult general = IntentResult(intent: 'general', score: 0.0, confidence: 0.0);
+}
+
+// One classifier for every entry point (home page, advanced chatbot and
+// AIService). The keyword/weight table is compiled into a KeywordAutomaton
+// once, and each message is scored for all intents in a single scan.
+// Intents earlier in the table win ties.
+class IntentClassifier {
+  static const Map<String, Map<String, double>> defaultKeywordWeights = {
+    'devotional': {
+      'temple': 1.0, 'spiritual': 1.0, 'devotional': 1.0, 'ashram': 1.0,
+      'prayer': 1.0, 'meditation': 1.0, 'peace': 0.5,
+    },
+    'adventure': {
+      'adventure': 1.0, 'beach': 1.0, 'diving': 1.0, 'water sports': 1.0,
+      'sports': 0.5, 'thrilling': 0.5, 'exciting': 0.5, 'outdoor': 0.5,
+    },
+    'party': {
+      'party': 1.0, 'nightlife': 1.0, 'club': 1.0, 'bar': 1.0,
+      'drinks': 0.5, 'dance': 0.5, 'music': 0.5,
+    },
+    'culture': {
+      'culture': 1.0, 'museum': 1.0, 'history': 1.0, 'heritage': 1.0,
+      'french': 0.5, 'colonial': 0.5,
+    },
+    'food': {
+      'food': 1.0, 'restaurant': 1.0, 'eat': 1.0, 'cuisine': 1.0,
+      'dining': 1.0, 'meal': 0.5, 'hungry': 0.5,
+    },
+    'transport': {
+      'bike': 1.0, 'rental': 1.0, 'transport': 1.0, 'scooter': 1.0,
+      'vehicle': 0.5, 'travel': 0.5,
+    },
+    'events': {
+      'event': 1.0, 'festival': 1.0, 'celebration': 1.0,
+      'show': 0.5, 'performance': 0.5,
+    },
+    'itinerary': {
+      'itinerary': 1.0, 'plan': 1.0, 'schedule': 1.0,
+      'route': 0.5, 'trip': 0.5, 'visit': 0.5, 'tour': 0.5,
+    },
+    'budget': {
+      'budget': 1.0, 'cheap': 1.0, 'affordable': 1.0, 'cost': 1.0,
+      'price': 1.0, 'expensive': 1.0, 'money': 0.5, 'expense': 0.5,
+    },
+    'accommodation': {
+      'hotel': 1.0, 'accommodation': 1.0, 'lodge': 1.0, 'guesthouse': 1.0,
+      'stay': 0.5, 'room': 0.5,
+    },
+    'weather': {
+      'weather': 1.0, 'rain': 1.0, 'rainy': 1.0, 'sunny': 1.0, 'climate': 1.0,
+    },
+    'language': {
+      'language': 1.0,
+    },
+  };
+
+  static final IntentClassifier shared = IntentClassifier(defaultKeywordWeights);
+
+  // Score at which the evidence term reaches 1 - 1/e: one strong keyword
+  // gives about 0.49, two about 0.74
+  static const double _confidenceScale = 1.5;
+
+  final KeywordAutomaton _automaton;
+  final List<double> _patternWeights;
+
+  IntentClassifier._(this._automaton, this._patternWeights);
+
+  factory IntentClassifier(Map<String, Map<String, double>> keywordWeights) {
+    KeywordAutomaton automaton = KeywordAutomaton(
+      keywordWeights.map((intent, weights) => MapEntry(intent, weights.keys.toList())),
+    );
+    List<double> patternWeights = List<double>.generate(automaton.patternCount, (pattern) {
+      String intent = automaton.labels[automaton.labelOf(pattern)];
+      return keywordWeights[intent]![automaton.keywordOf(pattern)]!;
+    });
+    return IntentClassifier._(automaton, patternWeights);
+  }
+
+  List<String> get intents => _automaton.labels;
+
+  IntentResult classify(String message) {
+    List<double> scores = List<double>.filled(_automaton.labels.length, 0.0);
+
+    for (int pattern in _automaton.match(message)) {
+      scores[_automaton.labelOf(pattern)] += _patternWeights[pattern];
+    }
+
+    int best = -1;
+    double runnerUp = 0.0;
+    for (int intent = 0; intent < scores.length; intent++) {
+      if (scores[intent] <= 0) continue;
+      if (best == -1 || scores[intent] > scores[best]) {
+        if (best != -1) runnerUp = scores[best];
+        best = intent;
+      } else if (scores[intent] > runnerUp) {
+        runnerUp = scores[intent];
+      }
+    }
+
+    if (best == -1) return IntentResult.general;
+
+    // Grows with the absolute evidence and shrinks when a rival intent
+    // scores close behind, down to half at a tie
+    double score = scores[best];
+    double evidence = 1 - exp(-score / _confidenceScale);
+    double margin = (score - runnerUp) / score;
+
+    return IntentResult(
+      intent: _automaton.labels[best],
+      score: score,
+      confidence: evidence * (0.5 + 0.5 * margin),
+    );
+  }
+}
+
+// services/knowledge_base.dart
+class KnowledgeMatch {
+  final String key;
+  final String text;
+  final double score;
+
+  const KnowledgeMatch({
+    required this.key,
+    required this.text,
+    required this.score,
+  });
+}
+
+// Inverted index over the place-name -> description knowledge base, ranked
+// with BM25. Entries are indexed one at a time: postings and length totals
+// are updated in place and IDF comes from live document frequencies at
+// query time, so adding or editing an entry never rebuilds the index.
+class KnowledgeBase {
+  static const double _k1 = 1.2;
+  static const double _b = 0.75;
+
+  static const Set<String> _stopWords = {
+    'a', 'an', 'and', 'are', 'as', 'at', 'be', 'by', 'can', 'could', 'do', 'does',
+    'for', 'from', 'get', 'here', 'how', 'in', 'is', 'it', 'its', 'me', 'my', 'of',
+    'on', 'or', 'some', 'that', 'the', 'there', 'this', 'to', 'want', 'was', 'we',
+    'what', 'when', 'where', 'which', 'who', 'with', 'you', 'your',
+  };
+
+  // Query-side synonyms, written as stems.
+  static const Map<String, List<String>> _queryExpansions = {
+    'buy': ['shop'],
+    'purchase': ['shop'],
+    'eat': ['food'],
+    'pray': ['temple', 'meditation'],
+    'swim': ['beach'],
+    'dive': ['scuba', 'div'],
+    'div': ['scuba', 'dive'],
+    'party': ['nightlife'],
+  };
+
+  static final RegExp _separator = RegExp(r'[^a-z0-9\u00c0-\uffff]+');
+
+  final Map<String, int> _docIds = {};
+  final List<String?> _keys = [];
+  final List<String?> _texts = [];
+  final List<int> _docLengths = [];
+  // Slots of removed entries, reused so repeated edits do not grow the lists
+  final List<int> _freeIds = [];
+  final Map<String, Map<int, int>> _postings = {};
+  int _documentCount = 0;
+  int _totalLength = 0;
+
+  KnowledgeBase();
+
+  factory KnowledgeBase.fromJson(String source) {
+    KnowledgeBase knowledgeBase = KnowledgeBase();
+    Map<String, dynamic> entries = jsonDecode(source);
+    entries.forEach((key, value) => knowledgeBase.addEntry(key, value as String));
+    return knowledgeBase;
+  }
+
+  int get length => _documentCount;
+
+  Iterable<MapEntry<String, String>> get entries {
+    return _docIds.entries.map((entry) => MapEntry(entry.key, _texts[entry.value]!));
+  }
+
+  String? lookup(String key) {
+    int? id = _docIds[key];
+    return id == null ? null : _texts[id];
+  }
+
+  void addEntry(String key, String text) {
+    removeEntry(key);
+
+    int id = _freeIds.isNotEmpty ? _freeIds.removeLast() : _keys.length;
+    List<String> terms = tokenize('$key $text');
+    Map<String, int> termFrequencies = {};
+    for (String term in terms) {
+      termFrequencies[term] = (termFrequencies[term] ?? 0) + 1;
+    }
+    termFrequencies.forEach((term, frequency) {
+      (_postings[term] ??= {})[id] = frequency;
+    });
+
+    _docIds[key] = id;
+    if (id == _keys.length) {
+      _keys.add(key);
+      _texts.add(text);
+      _docLengths.add(terms.length);
+    } else {
+      _keys[id] = key;
+      _texts[id] = text;
+      _docLengths[id] = terms.length;
+    }
+    _documentCount++;
+    _totalLength += terms.length;
+  }
+
+  bool removeEntry(String key) {
+    int? id = _docIds.remove(key);
+    if (id == null) return false;
+
+    for (String term in tokenize('$key ${_texts[id]}').toSet()) {
+      Map<int, int>? posting = _postings[term];
+      if (posting == null) continue;
+      posting.remove(id);
+      if (posting.isEmpty) _postings.remove(term);
+    }
+
+    _documentCount--;
+    _totalLength -= _docLengths[id];
+    _keys[id] = null;
+    _texts[id] = null;
+    _docLengths[id] = 0;
+    _freeIds.add(id);
+    return true;
+  }
+
+  List<KnowledgeMatch> search(String query, {int limit = 3}) {
+    if (_documentCount == 0) return [];
+
+    Set<String> queryTerms = {};
+    for (String term in tokenize(query)) {
+      queryTerms.add(term);
+      queryTerms.addAll(_queryExpansions[term] ?? const []);
+    }
+
+    double averageLength = _totalLength / _documentCount;
+    Map<int, double> scores = {};
+
+    for (String term in queryTerms) {
+      Map<int, int>? posting = _postings[term];
+      if (posting == null) continue;
+
+      double idf = log(1 + (_documentCount - posting.length + 0.5) / (posting.length + 0.5));
+      posting.forEach((doc, frequency) {
+        double norm = frequency + _k1 * (1 - _b + _b * _docLengths[doc] / averageLength);
+        scores[doc] = (scores[doc] ?? 0.0) + idf * frequency * (_k1 + 1) / norm;
+      });
+    }
+
+    List<MapEntry<int, double>> ranked = scores.entries.toList()
+      ..sort((a, b) => b.value.compareTo(a.value));
+
+    return ranked.take(limit).map((entry) => KnowledgeMatch(
+      key: _keys[entry.key]!,
+      text: _texts[entry.key]!,
+      score: entry.value,
+    )).toList();
+  }
+
+  static List<String> tokenize(String text) {
+    List<String> terms = [];
+    for (String word in text.toLowerCase().split(_separator)) {
+      if (word.length < 2 || _stopWords.contains(word)) continue;
+      terms.add(_stem(word));
+    }
+    return terms;
+  }
+
+  // Light suffix stripping: plurals and -ing forms ("spices" -> "spice",
+  // "beaches" -> "beach", "shopping" -> "shop").
+  static String _stem(String word) {
+    int length = word.length;
+    if (length > 4 && word.endsWith('ies')) {
+      return '${word.substring(0, length - 3)}y';
+    }
+    if (length > 5 && word.endsWith('ing')) {
+      String stem = word.substring(0, length - 3);
+      int last = stem.length - 1;
+      if (stem[last] == stem[last - 1] && !'aeiouls'.contains(stem[last])) {
+        return stem.substring(0, last);
+      }
+      return stem;
+    }
+    if (length > 4 &&
+        (word.endsWith('ches') || word.endsWith('shes') || word.endsWith('sses') || word.endsWith('xes'))) {
+      return word.substring(0, length - 2);
+    }
+    if (length > 3 && word.endsWith('s') && !word.endsWith('ss')) {
+      return word.substring(0, length - 1);
+    }
+    return word;
+  }
+}
+
+// services/semantic_index.dart
+// Paraphrase matching for messages the keyword classifier leaves as
+// 'general' ("somewhere quiet to pray"). Intent exemplars, knowledge-base
+// entries and catalog attractions are embedded once into one IVF index, so
+// a query costs one embedding plus one nearest-neighbour lookup. The built
+// index is serialized and cached on disk and rebuilt only when the corpus or
+// the embedder changes.
+abstract class TextEmbedder {
+  // Changes whenever the produced vectors would change
+  String get id;
+
+  int get dimensions;
+
+  // Unit-length vector for [text]
+  Float32List embed(String text);
+}
+
+// CPU-only sentence embedding without a model file: stemmed words, their
+// character trigrams and a small concept lexicon are feature-hashed into a
+// fixed-size vector. Trigrams catch inflections ("pray"/"prayer") and the
+// lexicon links words that share no letters ("quiet"/"meditation").
+class HashedNgramEmbedder implements TextEmbedder {
+  static const Map<String, List<String>> concepts = {
+    'worship': [
+      'pray', 'prayer', 'temple', 'church', 'mosque', 'ashram', 'spiritual', 'devotional', 'god',
+      'bless', 'aarti', 'worship', 'basilica', 'cathedral', 'shrine', 'divine', 'sacred', 'holy',
+    ],
+    'calm': [
+      'quiet', 'peaceful', 'peace', 'calm', 'serene', 'tranquil', 'silent', 'silence', 'relax',
+      'meditate', 'meditation', 'yoga', 'wellness', 'retreat',
+    ],
+    'thrill': [
+      'adventure', 'thrill', 'excit', 'adrenaline', 'sport', 'surf', 'div', 'dive', 'scuba',
+      'kayak', 'snorkel', 'water',
+    ],
+    'sea': ['beach', 'sea', 'ocean', 'swim', 'sand', 'coast', 'wave', 'shore'],
+    'food': [
+      'food', 'eat', 'hungry', 'restaurant', 'cafe', 'dinner', 'lunch', 'breakfast', 'cuisine',
+      'dish', 'meal', 'snack', 'taste', 'tasty', 'deliciou', 'bite',
+    ],
+    'night': ['party', 'club', 'nightlife', 'bar', 'drink', 'dance', 'night', 'pub', 'music'],
+    'heritage': [
+      'history', 'heritage', 'museum', 'colonial', 'culture', 'art', 'architecture', 'monument',
+      'old', 'gallery',
+    ],
+    'transport': [
+      'bike', 'scooter', 'taxi', 'auto', 'rickshaw', 'bus', 'cab', 'ride', 'rent', 'rental',
+      'transport', 'drive', 'commute', 'around',
+    ],
+    'money': ['cheap', 'budget', 'cost', 'price', 'expensive', 'afford', 'affordable', 'money', 'rupee', 'spend'],
+    'stay': ['hotel', 'stay', 'room', 'hostel', 'guesthouse', 'accommodation', 'sleep', 'resort', 'homestay'],
+    'weather': ['weather', 'rain', 'shower', 'sunny', 'hot', 'temperature', 'forecast', 'monsoon', 'climate', 'humid'],
+    'plan': ['plan', 'itinerary', 'schedule', 'trip', 'day', 'tour', 'route'],
+    'language': ['language', 'translate', 'tamil', 'speak', 'say', 'word', 'phrase'],
+    'events': ['festival', 'event', 'celebration', 'concert', 'happen'],
+    'shop': ['shop', 'buy', 'market', 'souvenir', 'purchase', 'gift', 'bazaar', 'spice'],
+  };
+
+  static const double _wordWeight = 1.0;
+  static const double _conceptWeight = 1.5;
+  static const double _trigramWeight = 0.3;
+
+  static Map<String, List<String>>? _conceptsByWord;
+
+  @override
+  final int dimensions;
+
+  const HashedNgramEmbedder({this.dimensions = 256});
+
+  @override
+  String get id => 'hashed-ngram-v2-$dimensions';
+
+  @override
+  Float32List embed(String text) {
+    Float32List vector = Float32List(dimensions);
+    Map<String, List<String>> conceptsByWord = _conceptsByWord ??= _invertConcepts();
+
+    for (String word in KnowledgeBase.tokenize(text)) {
+      _add(vector, word, _wordWeight);
+      for (String concept in conceptsByWord[word] ?? const <String>[]) {
+        _add(vector, '~$concept', _conceptWeight);
+      }
+      String padded = '<$word>';
+      for (int i = 0; i + 3 <= padded.length; i++) {
+        _add(vector, '#${padded.substring(i, i + 3)}', _trigramWeight);
+      }
+    }
+
+    double norm = 0.0;
+    for (double value in vector) {
+      norm += value * value;
+    }
+    if (norm > 0) {
+      double scale = 1 / sqrt(norm);
+      for (int i = 0; i < dimensions; i++) {
+        vector[i] *= scale;
+      }
+    }
+    return vector;
+  }
+
+  // Signed feature hashing keeps collisions unbiased
+  void _add(Float32List vector, String feature, double weight) {
+    int hash = fnv1a(feature);
+    vector[hash % dimensions] += hash & 0x80000000 == 0 ? weight : -weight;
+  }
+
+  static Map<String, List<String>> _invertConcepts() {
+    Map<String, List<String>> byWord = {};
+    concepts.forEach((concept, words) {
+      for (String word in words) {
+        // Lexicon entries are written as the stems tokenize produces
+        assert(KnowledgeBase.tokenize(word).join(' ') == word, 'Concept word "$word" is not a stem');
+        (byWord[word] ??= []).add(concept);
+      }
+    });
+    return byWord;
+  }
+
+  static int fnv1a(String text, [int hash = 0x811c9dc5]) {
+    for (int unit in text.codeUnits) {
+      hash = ((hash ^ unit) * 0x01000193) & 0xffffffff;
+    }
+    return hash;
+  }
+}
+
+// Inverted-file index over unit vectors: k-means centroids partition the
+// rows, and a query scans only the [nprobe] lists whose centroids are most
+// similar. Small corpora use a single list, which makes search exact.
+class IvfIndex {
+  static const int exactSearchLimit = 256;
+
+  final int dimensions;
+  final int length;
+  final Float32List _centroids; // lists * dimensions
+  final Int32List _offsets; // lists + 1, into the grouped rows
+  final Int32List _ids; // grouped row -> original row
+  final Float32List _vectors; // grouped rows * dimensions
+
+  IvfIndex._(this.dimensions, this.length, this._centroids, this._offsets, this._ids, this._vectors);
+
+  int get lists => _offsets.length - 1;
+
+  factory IvfIndex.build(List<Float32List> vectors, int dimensions, {int? lists, int iterations = 8}) {
+    int count = vectors.length;
+    int listCount = max(1, min(count, lists ?? (count < exactSearchLimit ? 1 : sqrt(count).round())));
+
+    // Deterministic k-means so a rebuilt index matches the cached one
+    Random random = Random(0);
+    List<int> seeds = List<int>.generate(count, (i) => i)..shuffle(random);
+    Float32List centroids = Float32List(listCount * dimensions);
+    for (int c = 0; c < listCount && c < count; c++) {
+      centroids.setRange(c * dimensions, (c + 1) * dimensions, vectors[seeds[c]]);
+    }
+
+    Int32List assignment = Int32List(count);
+    for (int iteration = 0; iteration <= iterations; iteration++) {
+      for (int i = 0; i < count; i++) {
+        assignment[i] = _nearestCentroid(centroids, listCount, dimensions, vectors[i]);
+      }
+      if (iteration == iterations || listCount == 1) break;
+
+      Float32List sums = Float32List(listCount * dimensions);
+      for (int i = 0; i < count; i++) {
+        int base = assignment[i] * dimensions;
+        for (int d = 0; d < dimensions; d++) {
+          sums[base + d] += vectors[i][d];
+        }
+      }
+      for (int c = 0; c < listCount; c++) {
+        double norm = 0.0;
+        for (int d = 0; d < dimensions; d++) {
+          norm += sums[c * dimensions + d] * sums[c * dimensions + d];
+        }
+        // Empty lists keep their previous centroid
+        if (norm == 0) continue;
+        double scale = 1 / sqrt(norm);
+        for (int d = 0; d < dimensions; d++) {
+          centroids[c * dimensions + d] = sums[c * dimensions + d] * scale;
         }
       }
-      if (score > 0) {
-        intentScores[intent] = score;
+    }
+
+    Int32List offsets = Int32List(listCount + 1);
+    for (int i = 0; i < count; i++) {
+      offsets[assignment[i] + 1]++;
+    }
+    for (int c = 0; c < listCount; c++) {
+      offsets[c + 1] += offsets[c];
+    }
+    Int32List cursor = Int32List.fromList(offsets);
+    Int32List ids = Int32List(count);
+    Float32List grouped = Float32List(count * dimensions);
+    for (int i = 0; i < count; i++) {
+      int row = cursor[assignment[i]]++;
+      ids[row] = i;
+      grouped.setRange(row * dimensions, (row + 1) * dimensions, vectors[i]);
+    }
+
+    return IvfIndex._(dimensions, count, centroids, offsets, ids, grouped);
+  }
+
+  // Original row numbers of the k most similar vectors, best first
+  TopK search(Float32List query, {int k = 10, int? nprobe}) {
+    int probeCount = min(lists, nprobe ?? max(1, (lists * 0.3).ceil()));
+    TopK probes = TopK(probeCount);
+    for (int c = 0; c < lists; c++) {
+      probes.offer(c, _dot(_centroids, c * dimensions, query, dimensions));
+    }
+
+    TopK best = TopK(k);
+    for (int list in probes.indices()) {
+      for (int row = _offsets[list]; row < _offsets[list + 1]; row++) {
+        best.offer(_ids[row], _dot(_vectors, row * dimensions, query, dimensions));
+      }
+    }
+    return best;
+  }
+
+  static int _nearestCentroid(Float32List centroids, int lists, int dimensions, Float32List vector) {
+    int best = 0;
+    double bestScore = double.negativeInfinity;
+    for (int c = 0; c < lists; c++) {
+      double score = _dot(centroids, c * dimensions, vector, dimensions);
+      if (score > bestScore) {
+        bestScore = score;
+        best = c;
       }
     }
+    return best;
+  }
+
+  static double _dot(Float32List rows, int offset, Float32List vector, int dimensions) {
+    double sum = 0.0;
+    for (int d = 0; d < dimensions; d++) {
+      sum += rows[offset + d] * vector[d];
+    }
+    return sum;
+  }
+}
+
+class SemanticMatch {
+  final String kind; // 'intent', 'kb' or 'poi'
+  final String key;
+  final String text;
+  final double similarity;
+
+  const SemanticMatch({
+    required this.kind,
+    required this.key,
+    required this.text,
+    required this.similarity,
+  });
+}
+
+class SemanticIndex {
+  static const int _magic = 0x49465650; // 'PVFI'
+  static const int formatVersion = 1;
+  static const String cacheFileName = 'semantic_index.bin';
+  static const double minIntentSimilarity = 0.35;
+  static const double minEntrySimilarity = 0.4;
+
+  // A few phrasings per intent; queries are matched against each one
+  static const Map<String, List<String>> intentExemplars = {
+    'devotional': [
+      'a peaceful place for prayer', 'where can I meditate', 'spiritual retreat or ashram',
+      'visit a temple or church', 'somewhere holy to seek blessings',
+    ],
+    'adventure': [
+      'exciting outdoor activities', 'water sports and scuba diving', 'something thrilling on the beach',
+      'go surfing or kayaking',
+    ],
+    'party': ['where is the nightlife', 'bars and clubs to dance', 'a fun night out with drinks', 'live music tonight'],
+    'culture': [
+      'history and heritage sites', 'museums and art galleries', 'colonial architecture walk',
+      'learn about local culture',
+    ],
+    'food': [
+      'where should I eat', 'good restaurants and cafes', 'local cuisine to taste', 'I am hungry, recommend a dish',
+    ],
+    'transport': [
+      'how do I get around town', 'rent a bike or scooter', 'book a taxi or auto rickshaw',
+      'getting from the bus stand',
+    ],
+    'events': ['festivals happening this week', 'events and celebrations today', 'concerts or shows to attend'],
+    'itinerary': ['plan my trip for three days', 'suggest a day by day schedule', 'make a tour route for me'],
+    'budget': [
+      'cheap things to do', 'how much will it cost', 'affordable options on a budget', 'save money while travelling',
+    ],
+    'accommodation': [
+      'a place to stay tonight', 'hotels and guesthouses', 'book a room near the beach', 'affordable hostel or homestay',
+    ],
+    'weather': ['will it rain today', 'what is the weather like', 'is it too hot to go out', 'monsoon season forecast'],
+    'language': ['translate this phrase', 'how do I say thank you in tamil', 'what language do people speak'],
+  };
 
-    if (intentScores.isEmpty) return 'general';
+  final TextEmbedder embedder;
+  final int fingerprint;
+  final List<String> _keys;
+  final Map<String, String> _corpus;
+  final IvfIndex _index;
+
+  SemanticIndex._(this.embedder, this.fingerprint, this._keys, this._corpus, this._index);
+
+  // Corpus keys are '<kind>:<key>'; intent exemplars are numbered
+  // ('intent:food#2') so each phrasing is its own row.
+  static Map<String, String> corpusFor({
+    KnowledgeBase? knowledgeBase,
+    Iterable<Attraction> attractions = const [],
+  }) {
+    return {
+      for (MapEntry<String, List<String>> intent in intentExemplars.entries)
+        for (int i = 0; i < intent.value.length; i++) 'intent:${intent.key}#$i': intent.value[i],
+      if (knowledgeBase != null)
+        for (MapEntry<String, String> entry in knowledgeBase.entries) 'kb:${entry.key}': entry.value,
+      for (Attraction attraction in attractions)
+        'poi:${attraction.name}': '${attraction.name}: ${attraction.description}. ${attraction.story}',
+    };
+  }
+
+  factory SemanticIndex.build(Map<String, String> corpus, {TextEmbedder embedder = const HashedNgramEmbedder()}) {
+    List<String> keys = corpus.keys.toList(growable: false);
+    List<Float32List> vectors = [for (String key in keys) embedder.embed(corpus[key]!)];
+    return SemanticIndex._(
+      embedder,
+      _fingerprintOf(corpus, embedder),
+      keys,
+      corpus,
+      IvfIndex.build(vectors, embedder.dimensions),
+    );
+  }
+
+  // Reads the cached index if it was built from the same corpus with the
+  // same embedder; otherwise builds it, on [pool] when given, and hands the
+  // bytes to [write].
+  static Future<SemanticIndex> load({
+    required Map<String, String> corpus,
+    required Future<Uint8List?> Function() read,
+    required Future<void> Function(Uint8List bytes) write,
+    TextEmbedder embedder = const HashedNgramEmbedder(),
+    WorkerPool? pool,
+  }) async {
+    Uint8List? cached = await read();
+    SemanticIndex? index = cached == null ? null : SemanticIndex.fromBytes(cached, corpus, embedder: embedder);
+    if (index != null) return index;
+
+    index = pool == null
+        ? SemanticIndex.build(corpus, embedder: embedder)
+        : await pool.run(SemanticIndexBuildTask(corpus, embedder));
+    await write(index.toBytes());
+    return index;
+  }
+
+  int get length => _keys.length;
+
+  List<SemanticMatch> search(String query, {int k = 10, int? nprobe}) {
+    TopK best = _index.search(embedder.embed(query), k: k, nprobe: nprobe);
+    List<int> rows = best.indices();
+    List<double> scores = best.scores();
+    return [for (int i = 0; i < rows.length; i++) _matchAt(rows[i], scores[i])];
+  }
+
+  // Most similar intent among [matches], if any is close enough
+  static SemanticMatch? bestIntent(List<SemanticMatch> matches) {
+    for (SemanticMatch match in matches) {
+      if (match.kind == 'intent') return match.similarity >= minIntentSimilarity ? match : null;
+    }
+    return null;
+  }
+
+  SemanticMatch _matchAt(int row, double similarity) {
+    String key = _keys[row];
+    int colon = key.indexOf(':');
+    String kind = key.substring(0, colon);
+    String name = key.substring(colon + 1);
+    if (kind == 'intent') name = name.substring(0, name.indexOf('#'));
+    return SemanticMatch(kind: kind, key: name, text: _corpus[key]!, similarity: similarity);
+  }
+
+  // Layout (little-endian): magic, version, fingerprint, dimensions, rows,
+  // lists; centroids, list offsets, row ids, vectors; then each key as a
+  // uint32 byte length and its UTF-8 bytes.
+  Uint8List toBytes() {
+    ByteData header = ByteData(24)
+      ..setUint32(0, _magic, Endian.little)
+      ..setUint32(4, formatVersion, Endian.little)
+      ..setUint32(8, fingerprint, Endian.little)
+      ..setUint32(12, _index.dimensions, Endian.little)
+      ..setUint32(16, _index.length, Endian.little)
+      ..setUint32(20, _index.lists, Endian.little);
+
+    BytesBuilder builder = BytesBuilder(copy: false);
+    builder.add(header.buffer.asUint8List());
+    // Views, not whole buffers: a loaded index shares one buffer
+    for (TypedData column in <TypedData>[_index._centroids, _index._offsets, _index._ids, _index._vectors]) {
+      builder.add(column.buffer.asUint8List(column.offsetInBytes, column.lengthInBytes));
+    }
+    for (String key in _keys) {
+      List<int> encoded = utf8.encode(key);
+      builder.add((ByteData(4)..setUint32(0, encoded.length, Endian.little)).buffer.asUint8List());
+      builder.add(encoded);
+    }
+    return builder.takeBytes();
+  }
+
+  // Null when [bytes] is not a current index for [corpus] and [embedder].
+  static SemanticIndex? fromBytes(
+    Uint8List bytes,
+    Map<String, String> corpus, {
+    TextEmbedder embedder = const HashedNgramEmbedder(),
+  }) {
+    if (bytes.length < 24) return null;
+    // Typed views need 4-byte alignment
+    if (bytes.offsetInBytes % 4 != 0) bytes = Uint8List.fromList(bytes);
+
+    ByteData data = ByteData.sublistView(bytes);
+    int fingerprint = _fingerprintOf(corpus, embedder);
+    if (data.getUint32(0, Endian.little) != _magic ||
+        data.getUint32(4, Endian.little) != formatVersion ||
+        data.getUint32(8, Endian.little) != fingerprint ||
+        data.getUint32(12, Endian.little) != embedder.dimensions) {
+      return null;
+    }
+
+    int dimensions = embedder.dimensions;
+    int rows = data.getUint32(16, Endian.little);
+    int lists = data.getUint32(20, Endian.little);
+    // Truncated file
+    if (bytes.length < 24 + 4 * ((lists + rows) * dimensions + lists + 1 + rows * 2)) return null;
+
+    int offset = bytes.offsetInBytes + 24;
+    Float32List centroids = bytes.buffer.asFloat32List(offset, lists * dimensions);
+    offset += lists * dimensions * 4;
+    Int32List offsets = bytes.buffer.asInt32List(offset, lists + 1);
+    offset += (lists + 1) * 4;
+    Int32List ids = bytes.buffer.asInt32List(offset, rows);
+    offset += rows * 4;
+    Float32List vectors = bytes.buffer.asFloat32List(offset, rows * dimensions);
+    offset += rows * dimensions * 4;
+
+    int position = offset - bytes.offsetInBytes;
+    List<String> keys = [];
+    for (int i = 0; i < rows; i++) {
+      if (position + 4 > bytes.length) return null;
+      int length = data.getUint32(position, Endian.little);
+      if (position + 4 + length > bytes.length) return null;
+      keys.add(utf8.decode(bytes.sublist(position + 4, position + 4 + length)));
+      position += 4 + length;
+    }
+    if (!keys.every(corpus.containsKey)) return null;
+
+    return SemanticIndex._(
+      embedder,
+      fingerprint,
+      keys,
+      corpus,
+      IvfIndex._(dimensions, rows, centroids, offsets, ids, vectors),
+    );
+  }
+
+  static int _fingerprintOf(Map<String, String> corpus, TextEmbedder embedder) {
+    int hash = HashedNgramEmbedder.fnv1a(embedder.id);
+    corpus.forEach((key, text) {
+      hash = HashedNgramEmbedder.fnv1a(text, HashedNgramEmbedder.fnv1a(key, hash));
+    });
+    return hash;
+  }
+}
+
+// Builds the index on a worker and ships it back as its serialized bytes,
+// which move between isolates without a copy.
+class SemanticIndexBuildTask extends WorkerTask<SemanticIndex> {
+  final Map<String, String> corpus;
+  final TextEmbedder embedder;
+
+  const SemanticIndexBuildTask(this.corpus, [this.embedder = const HashedNgramEmbedder()]);
+
+  @override
+  SemanticIndex run() => SemanticIndex.build(corpus, embedder: embedder);
+
+  @override
+  Object? encode(SemanticIndex result) => result.toBytes();
+
+  @override
+  SemanticIndex decode(Object? message) {
+    return SemanticIndex.fromBytes(message as Uint8List, corpus, embedder: embedder)!;
+  }
+}
+
+// services/latency_policy.dart
+// Response timing policy. The pipeline itself never sleeps: typingDelay is a
+// purely cosmetic minimum the UI may keep the typing indicator up for,
+// chunkInterval paces streamed chunks, and the p50/p99 budgets are what
+// measured compute latency is reported against.
+class LatencyPolicy {
+  final Duration typingDelay;
+  final Duration chunkInterval;
+  final Duration p50Budget;
+  final Duration p99Budget;
+
+  const LatencyPolicy({
+    this.typingDelay = Duration.zero,
+    this.chunkInterval = Duration.zero,
+    this.p50Budget = const Duration(milliseconds: 5),
+    this.p99Budget = const Duration(milliseconds: 50),
+  });
+
+  static const LatencyPolicy production = LatencyPolicy();
+  static const LatencyPolicy conversational = LatencyPolicy(
+    typingDelay: Duration(milliseconds: 600),
+    chunkInterval: Duration(milliseconds: 40),
+  );
+}
+
+class LatencyReport {
+  final int sampleCount;
+  final Duration p50;
+  final Duration p99;
+  final LatencyPolicy policy;
+
+  const LatencyReport({
+    required this.sampleCount,
+    required this.p50,
+    required this.p99,
+    required this.policy,
+  });
+
+  bool get withinBudget => p50 <= policy.p50Budget && p99 <= policy.p99Budget;
+
+  Map<String, dynamic> toJson() {
+    return {
+      'samples': sampleCount,
+      'p50_us': p50.inMicroseconds,
+      'p99_us': p99.inMicroseconds,
+      'p50_budget_us': policy.p50Budget.inMicroseconds,
+      'p99_budget_us': policy.p99Budget.inMicroseconds,
+      'within_budget': withinBudget,
+    };
+  }
+}
+
+// Keeps the most recent [windowSize] latencies in a ring buffer.
+class LatencyTracker {
+  final LatencyPolicy policy;
+  final List<int> _samples;
+  int _next = 0;
+  int _count = 0;
+
+  LatencyTracker(this.policy, {int windowSize = 1024})
+      : _samples = List<int>.filled(windowSize, 0);
+
+  void record(Duration elapsed) {
+    _samples[_next] = elapsed.inMicroseconds;
+    _next = (_next + 1) % _samples.length;
+    if (_count < _samples.length) _count++;
+  }
+
+  LatencyReport report() {
+    List<int> sorted = _samples.sublist(0, _count)..sort();
+    return LatencyReport(
+      sampleCount: _count,
+      p50: _percentile(sorted, 0.50),
+      p99: _percentile(sorted, 0.99),
+      policy: policy,
+    );
+  }
+
+  static Duration _percentile(List<int> sorted, double quantile) {
+    if (sorted.isEmpty) return Duration.zero;
+    int index = (quantile * (sorted.length - 1)).round();
+    return Duration(microseconds: sorted[index]);
+  }
+}
+
+// services/worker_pool.dart
+// Long-lived background isolates for CPU-heavy work (itinerary planning,
+// route optimization, index builds) so it never runs on the UI isolate.
+// Workers are spawned once and reused, which keeps spawn cost and cold
+// statics off the per-task path. Task results are copied back by the port
+// unless the task encodes them as bytes, which travel as
+// TransferableTypedData and are moved rather than copied. Tasks returning
+// large object graphs can instead ask for an isolate of their own that
+// hands its heap over with Isolate.exit.
+abstract class WorkerTask<R> {
+  const WorkerTask();
+
+  // Runs on the worker isolate; the task object itself is copied over, so it
+  // should carry everything it needs rather than rely on statics there.
+  R run();
+
+  // Results too large to copy cheaply can be sent as a Uint8List instead
+  Object? encode(R result) => result;
+
+  R decode(Object? message) => message as R;
+
+  // Runs on a fresh isolate whose result is passed back by Isolate.exit
+  // without a copy; worth the spawn only for large results.
+  bool get exitWithResult => false;
+
+  Object? _runEncoded() {
+    Object? encoded = encode(run());
+    return encoded is Uint8List ? TransferableTypedData.fromList([encoded]) : encoded;
+  }
+}
+
+class WorkerPool {
+  static WorkerPool? _shared;
+
+  // App-wide pool, small enough to leave cores for the UI and raster threads
+  static WorkerPool get shared => _shared ??= WorkerPool();
+
+  final int size;
+  final String debugName;
+  final List<_Worker> _workers = [];
+  final List<_Worker> _idle = [];
+  final Queue<Completer<_Worker>> _waiters = Queue<Completer<_Worker>>();
+  bool _closed = false;
+
+  WorkerPool({this.size = 2, this.debugName = 'worker'});
+
+  int get activeWorkers => _workers.length;
+
+  // Spawns every worker up front, e.g. during app start-up, so the first
+  // task does not pay for isolate creation.
+  Future<void> warmUp() async {
+    List<Future<_Worker>> spawning = [
+      for (int i = _workers.length; i < size; i++) _spawn(),
+    ];
+    _idle.addAll(await Future.wait(spawning));
+  }
+
+  Future<R> run<R>(WorkerTask<R> task) async {
+    if (_closed) throw StateError('WorkerPool is closed');
+    if (task.exitWithResult) return _runExiting(task);
+
+    _Worker worker = await _acquire();
+    try {
+      Object? reply = await worker.send(task);
+      if (reply is RemoteError) throw reply;
+
+      Object? value = (reply as _TaskResult).value;
+      if (value is TransferableTypedData) {
+        value = value.materialize().asUint8List();
+      }
+      return task.decode(value);
+    } finally {
+      _release(worker);
+    }
+  }
+
+  // Lets idle workers exit; tasks already running still complete.
+  void close() {
+    _closed = true;
+    for (_Worker worker in _workers) {
+      worker.shutdown();
+    }
+    _workers.clear();
+    _idle.clear();
+    while (_waiters.isNotEmpty) {
+      _waiters.removeFirst().completeError(StateError('WorkerPool is closed'));
+    }
+    if (identical(this, _shared)) _shared = null;
+  }
+
+  Future<_Worker> _acquire() {
+    while (_idle.isNotEmpty) {
+      _Worker worker = _idle.removeLast();
+      if (!worker.exited) return Future.value(worker);
+      _workers.remove(worker);
+    }
+    if (_workers.length < size) return _spawn();
+
+    Completer<_Worker> waiter = Completer<_Worker>();
+    _waiters.add(waiter);
+    return waiter.future;
+  }
+
+  void _release(_Worker worker) {
+    if (_closed) return;
+    if (worker.exited) {
+      // A crashed worker is replaced for the next waiting task
+      _workers.remove(worker);
+      if (_waiters.isNotEmpty) _waiters.removeFirst().complete(_spawn());
+      return;
+    }
+    if (_waiters.isNotEmpty) {
+      _waiters.removeFirst().complete(worker);
+    } else {
+      _idle.add(worker);
+    }
+  }
+
+  Future<_Worker> _spawn() async {
+    _Worker worker = _Worker();
+    _workers.add(worker);
+    try {
+      await worker.start('$debugName-${_workers.length}');
+    } catch (_) {
+      _workers.remove(worker);
+      rethrow;
+    }
+    return worker;
+  }
+
+  Future<R> _runExiting<R>(WorkerTask<R> task) async {
+    ReceivePort reply = ReceivePort();
+    try {
+      await Isolate.spawn(
+        _exitingMain,
+        _ExitingTask(task, reply.sendPort),
+        onExit: reply.sendPort,
+        debugName: '$debugName-exit',
+      );
+      Object? message = await reply.first;
+      if (message is RemoteError) throw message;
+      if (message is! _TaskResult) throw StateError('Worker isolate exited before replying');
+      return message.value as R;
+    } finally {
+      reply.close();
+    }
+  }
+
+  static void _exitingMain(_ExitingTask job) {
+    Object? result;
+    try {
+      result = _TaskResult(job.task.run());
+    } catch (error, stackTrace) {
+      result = RemoteError(error.toString(), stackTrace.toString());
+    }
+    Isolate.exit(job.reply, result);
+  }
+
+  static void _workerMain(SendPort replies) {
+    ReceivePort commands = ReceivePort();
+    replies.send(commands.sendPort);
+    commands.listen((message) {
+      if (message is! WorkerTask) {
+        // Shutdown: closing the last port lets the isolate exit
+        commands.close();
+        return;
+      }
+      try {
+        replies.send(_TaskResult(message._runEncoded()));
+      } catch (error, stackTrace) {
+        replies.send(RemoteError(error.toString(), stackTrace.toString()));
+      }
+    });
+  }
+}
+
+class _TaskResult {
+  final Object? value;
+
+  const _TaskResult(this.value);
+}
+
+class _ExitingTask {
+  final WorkerTask task;
+  final SendPort reply;
+
+  const _ExitingTask(this.task, this.reply);
+}
+
+// One worker isolate running one task at a time.
+class _Worker {
+  final ReceivePort _replies = ReceivePort();
+  final Completer<SendPort> _commands = Completer<SendPort>();
+  Completer<Object?>? _pending;
+  bool exited = false;
+
+  Future<void> start(String debugName) async {
+    _replies.listen(_onMessage);
+    await Isolate.spawn(
+      WorkerPool._workerMain,
+      _replies.sendPort,
+      onExit: _replies.sendPort,
+      debugName: debugName,
+    );
+    await _commands.future;
+  }
+
+  Future<Object?> send(WorkerTask task) async {
+    SendPort commands = await _commands.future;
+    Completer<Object?> pending = _pending = Completer<Object?>();
+    commands.send(task);
+    return pending.future;
+  }
+
+  void shutdown() {
+    if (_commands.isCompleted && !exited) {
+      _commands.future.then((commands) => commands.send(null));
+    }
+  }
+
+  void _onMessage(Object? message) {
+    if (message is SendPort && !_commands.isCompleted) {
+      _commands.complete(message);
+      return;
+    }
+    if (message == null) {
+      // onExit: the isolate is gone, with or without a task in flight
+      exited = true;
+      _replies.close();
+      if (!_commands.isCompleted) {
+        _commands.completeError(StateError('Worker isolate exited during start-up'));
+      }
+      _pending?.completeError(StateError('Worker isolate exited before replying'));
+      _pending = null;
+      return;
+    }
+    Completer<Object?>? pending = _pending;
+    _pending = null;
+    pending?.complete(message);
+  }
+}
+
+// services/location_service.dart
+class GeoPoint {
+  final double lat;
+  final double lng;
+
+  const GeoPoint(this.lat, this.lng);
+}
+
+class NearbyLocation {
+  final String name;
+  final double distanceKm;
+
+  const NearbyLocation(this.name, this.distanceKm);
+}
+
+class LocationService {
+  static const double earthRadiusKm = 6371.0;
+
+  static final Map<String, GeoPoint> _pondyLocations = {
+    'Sri Aurobindo Ashram': GeoPoint(11.9416, 79.8083),
+    'French Quarter': GeoPoint(11.9344, 79.8309),
+    'Paradise Beach': GeoPoint(12.0167, 79.8667),
+    'Auroville': GeoPoint(12.0051, 79.8095),
+    'Promenade Beach': GeoPoint(11.9270, 79.8368),
+  };
+
+  static final Random _random = Random();
+
+  // Built on first use and dropped whenever the location set changes.
+  static DistanceMatrix? _distanceMatrix;
+  static SpatialIndex? _spatialIndex;
+
+  static Iterable<String> get knownLocations => _pondyLocations.keys;
+
+  static GeoPoint? coordinatesOf(String location) => _pondyLocations[location];
+
+  static void registerLocations(Map<String, GeoPoint> locations) {
+    _pondyLocations.addAll(locations);
+    _distanceMatrix = null;
+    _spatialIndex = null;
+  }
+
+  static DistanceMatrix get distanceMatrix => _distanceMatrix ??= DistanceMatrix(_pondyLocations);
+
+  static SpatialIndex get spatialIndex => _spatialIndex ??= SpatialIndex(_pondyLocations);
+
+  // Distance matrix over a subset of known locations, e.g. one day's stops.
+  static DistanceMatrix distanceMatrixFor(Iterable<String> locations) {
+    return DistanceMatrix({
+      for (String location in locations)
+        if (_pondyLocations.containsKey(location)) location: _pondyLocations[location]!,
+    });
+  }
+
+  static List<NearbyLocation> nearest(GeoPoint origin, {int k = 10}) {
+    return spatialIndex.nearest(origin, k);
+  }
+
+  // Great-circle distance in km; double.infinity when either location is unknown.
+  static double calculateDistance(String location1, String location2) {
+    GeoPoint? point1 = _pondyLocations[location1];
+    GeoPoint? point2 = _pondyLocations[location2];
+    if (point1 == null || point2 == null) return double.infinity;
+
+    return haversineKm(point1, point2);
+  }
+
+  static double haversineKm(GeoPoint a, GeoPoint b) {
+    double deltaLat = _radians(b.lat - a.lat);
+    double deltaLng = _radians(b.lng - a.lng);
+    double h = sin(deltaLat / 2) * sin(deltaLat / 2) +
+        cos(_radians(a.lat)) * cos(_radians(b.lat)) * sin(deltaLng / 2) * sin(deltaLng / 2);
+    return 2 * earthRadiusKm * asin(min(1.0, sqrt(h)));
+  }
+
+  static double _radians(double degrees) => degrees * pi / 180;
+
+  static String getTrafficCondition(String location) {
+    // Simulate real-time traffic data
+    List<String> conditions = ResourceRegistry.trafficConditions;
+    return conditions[_random.nextInt(conditions.length)];
+  }
+
+  static String getCrowdDensity(String location) {
+    // Simulate crowd density based on location and time
+    DateTime now = DateTime.now();
+    int hour = now.hour;
+    
+    if (location.contains('Beach') && (hour >= 17 && hour <= 20)) {
+      return 'high'; // Evening beach crowds
+    } else if (location.contains('Ashram') && (hour >= 6 && hour <= 10)) {
+      return 'moderate'; // Morning meditation
+    } else {
+      return 'low';
+    }
+  }
+}
+
+class DistanceMatrix {
+  final List<String> names;
+  final Map<String, int> _indexOf = {};
+  final Float64List _distances;
+
+  DistanceMatrix(Map<String, GeoPoint> points)
+      : names = List.unmodifiable(points.keys),
+        _distances = Float64List(points.length * points.length) {
+    List<GeoPoint> coordinates = points.values.toList();
+    int n = coordinates.length;
+    for (int i = 0; i < n; i++) {
+      _indexOf[names[i]] = i;
+      for (int j = i + 1; j < n; j++) {
+        double distance = LocationService.haversineKm(coordinates[i], coordinates[j]);
+        _distances[i * n + j] = distance;
+        _distances[j * n + i] = distance;
+      }
+    }
+  }
+
+  int get size => names.length;
+
+  int indexOf(String name) => _indexOf[name] ?? -1;
+
+  double between(int i, int j) => _distances[i * names.length + j];
+
+  double distance(String from, String to) {
+    int i = indexOf(from);
+    int j = indexOf(to);
+    if (i == -1 || j == -1) return double.infinity;
+    return between(i, j);
+  }
+}
+
+// 2-d tree over locations projected onto a local plane (equirectangular
+// around the mean latitude, accurate at city scale). k-nearest queries visit
+// O(log n) nodes on average; reported distances are exact Haversine.
+class SpatialIndex {
+  final List<String> _names;
+  final List<GeoPoint> _points;
+  final Float64List _x;
+  final Float64List _y;
+  final Int32List _order;
+  final double _cosReference;
+
+  SpatialIndex._(this._names, this._points, this._cosReference)
+      : _x = Float64List(_points.length),
+        _y = Float64List(_points.length),
+        _order = Int32List(_points.length);
+
+  factory SpatialIndex(Map<String, GeoPoint> locations) {
+    List<GeoPoint> points = locations.values.toList();
+    double meanLat = points.isEmpty
+        ? 0.0
+        : points.map((point) => point.lat).reduce((a, b) => a + b) / points.length;
+    SpatialIndex index = SpatialIndex._(locations.keys.toList(), points, cos(meanLat * pi / 180));
+    index._project();
+    index._build(0, points.length, 0);
+    return index;
+  }
+
+  int get length => _points.length;
+
+  List<NearbyLocation> nearest(GeoPoint origin, int k) {
+    if (k <= 0 || _points.isEmpty) return [];
+
+    List<int> best = [];
+    List<double> bestDistances = [];
+    _search(0, _points.length, 0, _projectX(origin), _projectY(origin), k, best, bestDistances);
+
+    List<NearbyLocation> result = best
+        .map((i) => NearbyLocation(_names[i], LocationService.haversineKm(origin, _points[i])))
+        .toList();
+    result.sort((a, b) => a.distanceKm.compareTo(b.distanceKm));
+    return result;
+  }
+
+  void _project() {
+    for (int i = 0; i < _points.length; i++) {
+      _x[i] = _projectX(_points[i]);
+      _y[i] = _projectY(_points[i]);
+      _order[i] = i;
+    }
+  }
+
+  double _projectX(GeoPoint point) => point.lng * pi / 180 * LocationService.earthRadiusKm * _cosReference;
+
+  double _projectY(GeoPoint point) => point.lat * pi / 180 * LocationService.earthRadiusKm;
+
+  double _coordinate(int point, int axis) => axis == 0 ? _x[point] : _y[point];
+
+  // Implicit tree: the median of each range is the node, halves are subtrees.
+  void _build(int lo, int hi, int axis) {
+    if (hi - lo <= 1) return;
+
+    List<int> range = _order.sublist(lo, hi)
+      ..sort((a, b) => _coordinate(a, axis).compareTo(_coordinate(b, axis)));
+    _order.setRange(lo, hi, range);
+
+    int mid = (lo + hi) >> 1;
+    _build(lo, mid, 1 - axis);
+    _build(mid + 1, hi, 1 - axis);
+  }
+
+  void _search(int lo, int hi, int axis, double qx, double qy, int k,
+      List<int> best, List<double> bestDistances) {
+    if (lo >= hi) return;
+
+    int mid = (lo + hi) >> 1;
+    int point = _order[mid];
+    double dx = _x[point] - qx;
+    double dy = _y[point] - qy;
+    _offer(point, dx * dx + dy * dy, k, best, bestDistances);
+
+    double split = axis == 0 ? qx - _x[point] : qy - _y[point];
+    if (split < 0) {
+      _search(lo, mid, 1 - axis, qx, qy, k, best, bestDistances);
+      if (best.length < k || split * split < bestDistances.last) {
+        _search(mid + 1, hi, 1 - axis, qx, qy, k, best, bestDistances);
+      }
+    } else {
+      _search(mid + 1, hi, 1 - axis, qx, qy, k, best, bestDistances);
+      if (best.length < k || split * split < bestDistances.last) {
+        _search(lo, mid, 1 - axis, qx, qy, k, best, bestDistances);
+      }
+    }
+  }
+
+  // Keeps the k closest candidates sorted by squared planar distance.
+  static void _offer(int point, double distance, int k, List<int> best, List<double> bestDistances) {
+    if (best.length == k && distance >= bestDistances.last) return;
+
+    int position = best.length;
+    while (position > 0 && bestDistances[position - 1] > distance) {
+      position--;
+    }
+    best.insert(position, point);
+    bestDistances.insert(position, distance);
+
+    if (best.length > k) {
+      best.removeLast();
+      bestDistances.removeLast();
+    }
+  }
+}
+
+// services/route_optimizer.dart
+class OptimizedRoute {
+  final List<String> order;
+  final double distanceKm;
+
+  const OptimizedRoute(this.order, this.distanceKm);
+}
+
+// Orders stops to minimise travel using LocationService distances. Stops
+// with a best_time are visited in time-window order; within a window the
+// shortest open path is found exactly (Held-Karp) for up to [exactLimit]
+// stops, otherwise by nearest neighbour refined with 2-opt and Or-opt.
+// Stops without a window are then placed by cheapest insertion.
+class RouteOptimizer {
+  static const int exactLimit = 12;
+
+  // optimize() on a worker isolate
+  static Future<OptimizedRoute> optimizeInBackground(
+    List<String> stops, {
+    Map<String, String> bestTimes = const {},
+    String? start,
+    WorkerPool? pool,
+  }) {
+    return (pool ?? WorkerPool.shared).run(RouteTask(stops, bestTimes: bestTimes, start: start));
+  }
+
+  static const Map<String, int> timeWindows = {
+    'early_morning': 0,
+    'morning': 1,
+    'afternoon': 2,
+    'evening': 3,
+    'night': 4,
+  };
+
+  static OptimizedRoute optimize(
+    List<String> stops, {
+    Map<String, String> bestTimes = const {},
+    String? start,
+  }) {
+    if (stops.isEmpty) return const OptimizedRoute([], 0.0);
+
+    List<String> names = [if (start != null) start, ...stops];
+    DistanceMatrix matrix = LocationService.distanceMatrixFor(names);
+    _Distances distances = _Distances(matrix, names);
+
+    int offset = start == null ? 0 : 1;
+    Map<int, List<int>> windows = SplayTreeMap<int, List<int>>();
+    List<int> flexible = [];
+    for (int i = 0; i < stops.length; i++) {
+      int? window = timeWindows[bestTimes[stops[i]]];
+      if (window == null) {
+        flexible.add(i + offset);
+      } else {
+        (windows[window] ??= []).add(i + offset);
+      }
+    }
+
+    List<int> route = [if (start != null) 0];
+    for (List<int> group in windows.values) {
+      int? anchor = route.isEmpty ? null : route.last;
+      route.addAll(_solveOpenPath(group, anchor, distances));
+    }
+    if (windows.isEmpty) {
+      route.addAll(_solveOpenPath(flexible, start == null ? null : 0, distances));
+    } else {
+      for (int stop in flexible) {
+        _insertCheapest(route, stop, distances, fixedPrefix: offset);
+      }
+    }
+
+    List<String> order = route.skip(offset).map((i) => names[i]).toList();
+    return OptimizedRoute(order, distances.pathLength(route));
+  }
+
+  static List<int> _solveOpenPath(List<int> stops, int? anchor, _Distances distances) {
+    if (stops.length <= 1) return List<int>.of(stops);
+    if (stops.length <= exactLimit) return _heldKarp(stops, anchor, distances);
+
+    List<int> path = _nearestNeighbour(stops, anchor, distances);
+    List<int> full = [if (anchor != null) anchor, ...path];
+    int fixed = anchor == null ? 0 : 1;
+    bool improved = true;
+    while (improved) {
+      improved = _twoOpt(full, fixed, distances) | _orOpt(full, fixed, distances);
+    }
+    return full.sublist(fixed);
+  }
+
+  static List<int> _heldKarp(List<int> stops, int? anchor, _Distances distances) {
+    int n = stops.length;
+    int subsets = 1 << n;
+    Float64List cost = Float64List(subsets * n)..fillRange(0, subsets * n, double.infinity);
+    Int32List parent = Int32List(subsets * n)..fillRange(0, subsets * n, -1);
+
+    for (int j = 0; j < n; j++) {
+      cost[(1 << j) * n + j] = anchor == null ? 0.0 : distances.between(anchor, stops[j]);
+    }
+
+    for (int mask = 1; mask < subsets; mask++) {
+      for (int last = 0; last < n; last++) {
+        double current = cost[mask * n + last];
+        if ((mask & (1 << last)) == 0 || current == double.infinity) continue;
+        for (int next = 0; next < n; next++) {
+          if ((mask & (1 << next)) != 0) continue;
+          int nextMask = mask | (1 << next);
+          double candidate = current + distances.between(stops[last], stops[next]);
+          if (candidate < cost[nextMask * n + next]) {
+            cost[nextMask * n + next] = candidate;
+            parent[nextMask * n + next] = last;
+          }
+        }
+      }
+    }
+
+    int full = subsets - 1;
+    int last = 0;
+    for (int j = 1; j < n; j++) {
+      if (cost[full * n + j] < cost[full * n + last]) last = j;
+    }
+
+    List<int> path = [];
+    int mask = full;
+    while (last != -1) {
+      path.add(stops[last]);
+      int previous = parent[mask * n + last];
+      mask &= ~(1 << last);
+      last = previous;
+    }
+    return path.reversed.toList();
+  }
+
+  static List<int> _nearestNeighbour(List<int> stops, int? anchor, _Distances distances) {
+    List<int> remaining = List<int>.of(stops);
+    List<int> path = [];
+    int? current = anchor;
+    while (remaining.isNotEmpty) {
+      int best = 0;
+      if (current != null) {
+        for (int i = 1; i < remaining.length; i++) {
+          if (distances.between(current, remaining[i]) < distances.between(current, remaining[best])) {
+            best = i;
+          }
+        }
+      }
+      current = remaining.removeAt(best);
+      path.add(current);
+    }
+    return path;
+  }
+
+  // Reverses segments of the open path while that shortens it.
+  static bool _twoOpt(List<int> path, int fixed, _Distances distances) {
+    bool improved = false;
+    for (int i = max(fixed, 1); i < path.length - 1; i++) {
+      for (int j = i + 1; j < path.length; j++) {
+        double before = distances.between(path[i - 1], path[i]) +
+            (j + 1 < path.length ? distances.between(path[j], path[j + 1]) : 0.0);
+        double after = distances.between(path[i - 1], path[j]) +
+            (j + 1 < path.length ? distances.between(path[i], path[j + 1]) : 0.0);
+        if (after < before - 1e-9) {
+          _reverse(path, i, j);
+          improved = true;
+        }
+      }
+    }
+    // Without an anchor the first stop is free, so also try reversing a prefix.
+    if (fixed == 0) {
+      for (int j = 1; j < path.length - 1; j++) {
+        if (distances.between(path[0], path[j + 1]) < distances.between(path[j], path[j + 1]) - 1e-9) {
+          _reverse(path, 0, j);
+          improved = true;
+        }
+      }
+    }
+    return improved;
+  }
+
+  // Moves runs of 1-3 consecutive stops to a cheaper position.
+  static bool _orOpt(List<int> path, int fixed, _Distances distances) {
+    bool improved = false;
+    for (int length = 1; length <= 3; length++) {
+      for (int i = fixed; i + length <= path.length; i++) {
+        List<int> segment = path.sublist(i, i + length);
+        double removalGain = _edge(path, i - 1, i, distances) +
+            _edge(path, i + length - 1, i + length, distances) -
+            (i > 0 && i + length < path.length ? distances.between(path[i - 1], path[i + length]) : 0.0);
+
+        List<int> rest = [...path.sublist(0, i), ...path.sublist(i + length)];
+        int bestPosition = -1;
+        double bestCost = removalGain - 1e-9;
+        for (int position = max(fixed, 1); position <= rest.length; position++) {
+          if (position == i) continue;
+          double insertCost = (position < rest.length ? distances.between(segment.last, rest[position]) : 0.0) +
+              distances.between(rest[position - 1], segment.first) -
+              (position < rest.length ? distances.between(rest[position - 1], rest[position]) : 0.0);
+          if (insertCost < bestCost) {
+            bestCost = insertCost;
+            bestPosition = position;
+          }
+        }
+
+        if (bestPosition != -1) {
+          rest.insertAll(bestPosition, segment);
+          path.setAll(0, rest);
+          improved = true;
+        }
+      }
+    }
+    return improved;
+  }
+
+  static void _insertCheapest(List<int> route, int stop, _Distances distances, {required int fixedPrefix}) {
+    int bestPosition = route.length;
+    double bestCost = route.isEmpty ? 0.0 : distances.between(route.last, stop);
+    for (int position = max(fixedPrefix, 0); position < route.length; position++) {
+      double cost = distances.between(stop, route[position]) -
+          (position > 0 ? distances.between(route[position - 1], route[position]) : 0.0) +
+          (position > 0 ? distances.between(route[position - 1], stop) : 0.0);
+      if (cost < bestCost) {
+        bestCost = cost;
+        bestPosition = position;
+      }
+    }
+    route.insert(bestPosition, stop);
+  }
+
+  static double _edge(List<int> path, int from, int to, _Distances distances) {
+    if (from < 0 || to >= path.length) return 0.0;
+    return distances.between(path[from], path[to]);
+  }
+
+  static void _reverse(List<int> path, int i, int j) {
+    while (i < j) {
+      int swap = path[i];
+      path[i++] = path[j];
+      path[j--] = swap;
+    }
+  }
+}
+
+// Carries the coordinates of its own stops, since locations registered on
+// the UI isolate are not visible from a worker.
+class RouteTask extends WorkerTask<OptimizedRoute> {
+  final List<String> stops;
+  final Map<String, String> bestTimes;
+  final String? start;
+  final Map<String, GeoPoint> coordinates;
+
+  RouteTask(this.stops, {this.bestTimes = const {}, this.start})
+      : coordinates = {
+          for (String name in [if (start != null) start, ...stops])
+            if (LocationService.coordinatesOf(name) != null) name: LocationService.coordinatesOf(name)!,
+        };
+
+  @override
+  OptimizedRoute run() {
+    LocationService.registerLocations(coordinates);
+    return RouteOptimizer.optimize(stops, bestTimes: bestTimes, start: start);
+  }
+}
+
+// Distances between positions in the caller's stop list. Unknown stops are
+// treated as a fixed penalty so they do not poison sums with infinity.
+class _Distances {
+  static const double _unknownPenaltyKm = 1000.0;
+
+  final DistanceMatrix _matrix;
+  final Int32List _matrixIndex;
+
+  _Distances(this._matrix, List<String> names)
+      : _matrixIndex = Int32List.fromList(names.map(_matrix.indexOf).toList());
+
+  double between(int a, int b) {
+    if (a == b) return 0.0;
+    int i = _matrixIndex[a];
+    int j = _matrixIndex[b];
+    if (i == -1 || j == -1) return _unknownPenaltyKm;
+    return _matrix.between(i, j);
+  }
+
+  // Total over known legs only.
+  double pathLength(List<int> path) {
+    double total = 0.0;
+    for (int i = 1; i < path.length; i++) {
+      double leg = between(path[i - 1], path[i]);
+      if (leg < _unknownPenaltyKm) total += leg;
+    }
+    return total;
+  }
+}
+
+// services/resource_registry.dart
+// Lookup tables shared by the services and both chat screens. Everything here
+// is a compile-time constant, so the VM canonicalizes each table once and
+// callers index into it instead of rebuilding maps on every call.
+abstract class ResourceRegistry {
+  static const String defaultLanguage = 'English';
+
+  static const Map<String, String> languageCodes = {
+    'English': 'en',
+    'French': 'fr',
+    'Tamil': 'ta',
+    'Hindi': 'hi',
+    'Spanish': 'es',
+    'German': 'de',
+  };
+
+  // Locales handed to the text-to-speech engine
+  static const Map<String, String> ttsLocales = {
+    'English': 'en-US',
+    'French': 'fr-FR',
+    'Tamil': 'ta-IN',
+    'Hindi': 'hi-IN',
+    'Spanish': 'es-ES',
+    'German': 'de-DE',
+  };
+
+  static const List<Map<String, String>> languageOptions = [
+    {'name': 'English', 'flag': '🇺🇸', 'native': 'English'},
+    {'name': 'French', 'flag': '🇫🇷', 'native': 'Français'},
+    {'name': 'Tamil', 'flag': '🇮🇳', 'native': 'தமிழ்'},
+    {'name': 'Hindi', 'flag': '🇮🇳', 'native': 'हिंदी'},
+    {'name': 'Spanish', 'flag': '🇪🇸', 'native': 'Español'},
+    {'name': 'German', 'flag': '🇩🇪', 'native': 'Deutsch'},
+  ];
+
+  static const List<String> crowdLevels = ['low', 'moderate', 'high'];
+  static const List<String> trafficConditions = ['light', 'moderate', 'heavy'];
+  static const List<String> weatherConditions = ['sunny', 'cloudy', 'rainy', 'windy'];
+}
+
+// services/translation_catalog.dart
+// UI strings live in one JSON file per locale (assets/translations/<code>.json).
+// Only the active locale and the English fallback are read; switching
+// language loads the new file once and swaps the active table without
+// touching the others. Keys and values are interned in one pool, so every
+// locale shares a single copy of each key.
+class TranslationCatalog {
+  static const String fallbackLocale = 'en';
+
+  static final TranslationCatalog shared = TranslationCatalog();
+
+  static String assetPathFor(String locale) => 'assets/translations/$locale.json';
+
+  Future<String> Function(String path)? _read;
+  final Map<String, Map<String, String>> _tables = {};
+  final Map<String, Future<void>> _pending = {};
+  final Map<String, String> _strings = {};
+  String _locale = fallbackLocale;
+
+  String get locale => _locale;
+
+  Iterable<String> get loadedLocales => _tables.keys;
+
+  bool isLoaded(String locale) => _tables.containsKey(locale);
+
+  // Tells the catalog how to read locale files; the app passes
+  // rootBundle.loadString. Attaching again keeps the loaded tables.
+  void attach(Future<String> Function(String path) read) {
+    _read = read;
+  }
+
+  // Makes [locale] active, loading it (and the fallback) on first use.
+  Future<void> setLocale(String locale) async {
+    await Future.wait([ensureLoaded(fallbackLocale), ensureLoaded(locale)]);
+    _locale = locale;
+  }
+
+  Future<void> ensureLoaded(String locale) {
+    if (_tables.containsKey(locale)) return Future.value();
+    Future<String> Function(String path)? read = _read;
+    if (read == null) {
+      throw StateError('TranslationCatalog.attach must be called before loading "$locale"');
+    }
+    return _pending[locale] ??= read(assetPathFor(locale))
+        .then((source) => loadLocale(locale, source))
+        .whenComplete(() => _pending.remove(locale));
+  }
+
+  // Parses a locale file directly; used by ensureLoaded and by tools that
+  // read the files from disk.
+  void loadLocale(String locale, String source) {
+    Map<String, dynamic> json = jsonDecode(source);
+    _tables[locale] = Map<String, String>.unmodifiable({
+      for (MapEntry<String, dynamic> entry in json.entries)
+        if (entry.value is String) _intern(entry.key): _intern(entry.value as String),
+    });
+  }
+
+  // Looks [key] up in [locale] (the active locale by default), then in the
+  // fallback locale. Unknown keys return [orElse], or the key itself.
+  String translate(String key, {String? locale, String? orElse}) {
+    return _tables[locale ?? _locale]?[key] ??
+        _tables[fallbackLocale]?[key] ??
+        orElse ??
+        key;
+  }
+
+  String _intern(String value) => _strings.putIfAbsent(value, () => value);
+}
+
+// services/translation_service.dart
+class TranslationService {
+  // Synchronous lookup: [languageCode] must already be loaded, through
+  // TranslationCatalog.setLocale or ensureLoaded. An unloaded locale would
+  // otherwise quietly come back as English, or as the key itself.
+  static String translate(String key, String languageCode) {
+    assert(
+      TranslationCatalog.shared.isLoaded(languageCode),
+      'Locale "$languageCode" is not loaded; await TranslationCatalog.shared.ensureLoaded first',
+    );
+    return TranslationCatalog.shared.translate(key, locale: languageCode);
+  }
+
+  static String getLanguageCode(String language) {
+    return ResourceRegistry.languageCodes[language] ?? 'en';
+  }
+}
+
+// services/itinerary_planner.dart
+// Packs catalog attractions into day plans. Each attraction may start inside
+// its best-time window and must finish before closing; travel between stops
+// is charged at city driving speed. Days are filled greedily: every round
+// inserts the candidate and position with the highest interest weight net of
+// the detour it adds, until the day is full, over budget or out of slots.
+// A day costs O(stops * candidates * positions), which keeps a 14-day plan
+// over a few hundred attractions in the low milliseconds.
+class ItineraryPlanner {
+  static const int maxActivitiesPerDay = 4;
+  static const double travelSpeedKmh = 22.0;
+  static const double unknownHopKm = 5.0;
+  static const double detourPenaltyPerKm = 0.02;
+  static const double offInterestWeight = 0.25;
+  static const double repeatCategoryFactor = 0.7;
+  static const Map<CrowdLevel, double> _crowdFactors = {
+    CrowdLevel.low: 1.0,
+    CrowdLevel.moderate: 0.95,
+    CrowdLevel.high: 0.85,
+  };
+
+  final List<Attraction> attractions;
+  final DistanceMatrix _distances;
+  final Int32List _matrixIndex;
+  final Int32List _earliestStart;
+  final Int32List _latestStart;
+
+  factory ItineraryPlanner(Iterable<Attraction> attractions) {
+    List<Attraction> candidates = List<Attraction>.unmodifiable(attractions);
+    return ItineraryPlanner._(candidates, DistanceMatrix({
+      for (Attraction attraction in candidates)
+        if (attraction.coordinates != null) attraction.name: attraction.coordinates!,
+    }));
+  }
+
+  ItineraryPlanner._(this.attractions, this._distances)
+      : _matrixIndex = Int32List(attractions.length),
+        _earliestStart = Int32List(attractions.length),
+        _latestStart = Int32List(attractions.length) {
+    for (int i = 0; i < attractions.length; i++) {
+      Attraction attraction = attractions[i];
+      _matrixIndex[i] = _distances.indexOf(attraction.name);
+      _earliestStart[i] = max(attraction.bestTime.startMinute, attraction.opensMinute);
+      _latestStart[i] = min(attraction.bestTime.endMinute, attraction.closesMinute - attraction.durationMinutes);
+    }
+  }
+
+  // One list of activities per requested day. [dailyAllowance] caps what the
+  // activities of a single day may cost.
+  List<List<Activity>> plan(ItineraryRequest request, {required int dailyAllowance}) {
+    Float64List weights = _weightsFor(request.interests);
+    String? startLocation = request.startLocation;
+    GeoPoint? origin = startLocation == null ? null : LocationService.coordinatesOf(startLocation);
+    List<bool> visited = List<bool>.filled(attractions.length, false);
+    List<List<Activity>> days = [];
+
+    for (int day = 1; day <= request.days; day++) {
+      List<Activity> activities = _planDay(weights, visited, origin, dailyAllowance);
+      if (activities.isEmpty && visited.contains(true)) {
+        // Everything that fits has been seen; start revisiting favourites
+        visited.fillRange(0, visited.length, false);
+        activities = _planDay(weights, visited, origin, dailyAllowance);
+      }
+      days.add(activities);
+    }
+    return days;
+  }
+
+  List<Activity> _planDay(Float64List weights, List<bool> visited, GeoPoint? origin, int allowance) {
+    List<int> stops = [];
+    List<int> starts = [];
+    Map<String, int> categoryCounts = {};
+    int spent = 0;
+
+    while (stops.length < maxActivitiesPerDay) {
+      int bestCandidate = -1;
+      int bestPosition = 0;
+      int bestStart = 0;
+      double bestValue = 0.0;
+
+      for (int candidate = 0; candidate < attractions.length; candidate++) {
+        Attraction attraction = attractions[candidate];
+        if (visited[candidate] || spent + attraction.cost > allowance) continue;
+        if (_earliestStart[candidate] > _latestStart[candidate]) continue;
+
+        double value = weights[candidate] * pow(repeatCategoryFactor, categoryCounts[attraction.category] ?? 0);
+        // Detours between known points are never negative, so this bounds
+        // every insertion position
+        if (value <= bestValue) continue;
+
+        for (int position = 0; position <= stops.length; position++) {
+          int previous = position == 0 ? -1 : stops[position - 1];
+          int next = position == stops.length ? -1 : stops[position];
+
+          double inbound = previous == -1 ? _fromOrigin(origin, candidate) : _between(previous, candidate);
+          int start = previous == -1
+              ? _earliestStart[candidate]
+              : max(_earliestStart[candidate],
+                  starts[position - 1] + attractions[previous].durationMinutes + _travelMinutes(inbound));
+          if (start > _latestStart[candidate]) continue;
+
+          double detour = inbound;
+          if (next != -1) {
+            double outbound = _between(candidate, next);
+            if (start + attraction.durationMinutes + _travelMinutes(outbound) > starts[position]) continue;
+            detour += outbound - (previous == -1 ? _fromOrigin(origin, next) : _between(previous, next));
+          }
+
+          double net = value - detourPenaltyPerKm * detour;
+          if (net > bestValue) {
+            bestValue = net;
+            bestCandidate = candidate;
+            bestPosition = position;
+            bestStart = start;
+          }
+        }
+      }
+
+      if (bestCandidate == -1) break;
+      stops.insert(bestPosition, bestCandidate);
+      starts.insert(bestPosition, bestStart);
+      visited[bestCandidate] = true;
+      spent += attractions[bestCandidate].cost;
+      categoryCounts.update(attractions[bestCandidate].category, (count) => count + 1, ifAbsent: () => 1);
+    }
+
+    return [for (int i = 0; i < stops.length; i++) _activityAt(stops[i], starts[i])];
+  }
+
+  // Best attraction that fits between [startMinute] and [endMinute], for
+  // filling a slot that had to be dropped. Same-category places are
+  // preferred, and ones close to [near]. Returns null when nothing fits.
+  Activity? alternativeFor({
+    required int startMinute,
+    required int endMinute,
+    String? category,
+    GeoPoint? near,
+    Set<String> exclude = const {},
+    bool Function(Attraction attraction)? accept,
+  }) {
+    int bestCandidate = -1;
+    int bestStart = 0;
+    double bestValue = double.negativeInfinity;
+
+    for (int candidate = 0; candidate < attractions.length; candidate++) {
+      Attraction attraction = attractions[candidate];
+      if (exclude.contains(attraction.name)) continue;
+      if (accept != null && !accept(attraction)) continue;
+
+      int start = max(startMinute, _earliestStart[candidate]);
+      if (start > _latestStart[candidate] || start + attraction.durationMinutes > endMinute) continue;
+
+      double value = (attraction.category == category ? 1.0 : offInterestWeight) *
+          _crowdFactors[attraction.crowdLevel]!;
+      GeoPoint? point = attraction.coordinates;
+      if (near != null) {
+        value -= detourPenaltyPerKm * (point == null ? unknownHopKm : LocationService.haversineKm(near, point));
+      }
+      if (value > bestValue) {
+        bestValue = value;
+        bestCandidate = candidate;
+        bestStart = start;
+      }
+    }
+
+    return bestCandidate == -1 ? null : _activityAt(bestCandidate, bestStart);
+  }
+
+  Activity _activityAt(int candidate, int startMinute) {
+    Attraction attraction = attractions[candidate];
+    return Activity(
+      startMinute: startMinute,
+      durationMinutes: attraction.durationMinutes,
+      name: attraction.name,
+      location: attraction.location,
+      type: attraction.category,
+      cost: attraction.cost,
+    );
+  }
+
+  // Listed interests weigh 1.0 down to 0.6 by rank; other categories only
+  // fill gaps. Crowded places are mildly discounted.
+  Float64List _weightsFor(List<String> interests) {
+    Float64List weights = Float64List(attractions.length);
+    for (int i = 0; i < attractions.length; i++) {
+      int rank = interests.indexOf(attractions[i].category);
+      double weight = interests.isEmpty
+          ? 1.0
+          : rank == -1
+              ? offInterestWeight
+              : max(0.6, 1.0 - 0.1 * rank);
+      weights[i] = weight * _crowdFactors[attractions[i].crowdLevel]!;
+    }
+    return weights;
+  }
+
+  double _between(int a, int b) {
+    int i = _matrixIndex[a];
+    int j = _matrixIndex[b];
+    if (i == -1 || j == -1) return unknownHopKm;
+    return _distances.between(i, j);
+  }
+
+  double _fromOrigin(GeoPoint? origin, int candidate) {
+    if (origin == null) return 0.0;
+    GeoPoint? point = attractions[candidate].coordinates;
+    return point == null ? unknownHopKm : LocationService.haversineKm(origin, point);
+  }
+
+  static int _travelMinutes(double km) => (km / travelSpeedKmh * 60).ceil();
+}
+
+// services/itinerary_replanner.dart
+// Keeps itineraries that are already on screen in step with realtime data.
+// The caller diffs consecutive realtime snapshots once per tick and asks for
+// a delta per itinerary. Only slots on the current day that touch a changed
+// place or road, or an outdoor slot when rain starts, are revisited. An
+// unaffected itinerary costs a few map lookups and yields an empty delta.
+class RealtimeDiff {
+  final Map<String, String> crowdLevels;
+  final Map<String, String> trafficConditions;
+  final String? weather;
+
+  const RealtimeDiff({
+    this.crowdLevels = const {},
+    this.trafficConditions = const {},
+    this.weather,
+  });
+
+  // Entries of [current] that differ from [previous]
+  factory RealtimeDiff.between(Map<String, dynamic> previous, Map<String, dynamic> current) {
+    return RealtimeDiff(
+      crowdLevels: _changed(previous['crowd_levels'], current['crowd_levels']),
+      trafficConditions: _changed(previous['traffic_conditions'], current['traffic_conditions']),
+      weather: previous['weather'] == current['weather'] ? null : current['weather'],
+    );
+  }
+
+  bool get isEmpty => crowdLevels.isEmpty && trafficConditions.isEmpty && weather == null;
+
+  static Map<String, String> _changed(Map? before, Map? after) {
+    if (after == null) return const {};
+    return {
+      for (MapEntry entry in after.entries)
+        if (before == null || before[entry.key] != entry.value) entry.key as String: entry.value as String,
+    };
+  }
+}
+
+class ItineraryChange {
+  final int day;
+  final int slot;
+  final String type; // 'replace', 'retime' or 'advisory'
+  final String reason;
+  final Map<String, dynamic> activity; // the slot after the change
+
+  const ItineraryChange({
+    required this.day,
+    required this.slot,
+    required this.type,
+    required this.reason,
+    required this.activity,
+  });
+
+  Map<String, dynamic> toJson() {
+    return {
+      'day': day,
+      'slot': slot,
+      'type': type,
+      'reason': reason,
+      'activity': activity,
+    };
+  }
+}
+
+class ItineraryDelta {
+  final List<ItineraryChange> changes;
+
+  const ItineraryDelta(this.changes);
+
+  static const ItineraryDelta empty = ItineraryDelta([]);
+
+  bool get isEmpty => changes.isEmpty;
+
+  String get summary => changes.map((change) => change.reason).join('\n');
+
+  // A new itinerary with the changes applied. Only the touched days are
+  // copied; every other day is shared with [itinerary].
+  Map<String, dynamic> applyTo(Map<String, dynamic> itinerary) {
+    if (isEmpty) return itinerary;
+
+    List<dynamic> days = List<dynamic>.of(itinerary['days']);
+    Map<int, List<dynamic>> touched = {};
+    for (ItineraryChange change in changes) {
+      List<dynamic> slots = touched.putIfAbsent(change.day, () {
+        Map<String, dynamic> day = Map<String, dynamic>.of(days[change.day - 1]);
+        List<dynamic> activities = List<dynamic>.of(day['activities']);
+        day['activities'] = activities;
+        days[change.day - 1] = day;
+        return activities;
+      });
+      slots[change.slot] = change.activity;
+    }
+    return {...itinerary, 'days': days};
+  }
+
+  List<Map<String, dynamic>> toJson() => changes.map((change) => change.toJson()).toList();
+}
+
+class ItineraryReplanner {
+  static const Set<String> outdoorCategories = {'adventure', 'relaxation'};
+  static const int heavyTrafficDelayMinutes = 20;
+
+  // Roads in the realtime feed and the areas reached through them
+  static const Map<String, List<String>> roadAreas = {
+    'Mission Street': ['Mission Street', 'White Town', 'French Quarter'],
+    'MG Road': ['MG Road', 'Saint Louis Street', 'Suffren Street', 'Dumas Street'],
+    'ECR': ['Auroville', 'Auroville Beach', 'Kottakuppam', 'Chunnambar'],
+  };
+
+  // Replacements come from the planner's catalog; without one, affected
+  // slots only get an advisory.
+  final ItineraryPlanner? planner;
+
+  const ItineraryReplanner([this.planner]);
+
+  // Delta for [day] of [itinerary] (1 is the day the realtime data covers).
+  ItineraryDelta replan(Map<String, dynamic> itinerary, RealtimeDiff diff, {int day = 1}) {
+    List<dynamic> days = itinerary['days'] ?? const [];
+    if (diff.isEmpty || day < 1 || day > days.length) return ItineraryDelta.empty;
+
+    List<dynamic> activities = days[day - 1]['activities'] ?? const [];
+    bool raining = diff.weather == 'rainy';
+    Set<String>? planned;
+    List<ItineraryChange> changes = [];
+
+    for (int slot = 0; slot < activities.length; slot++) {
+      Map<String, dynamic> activity = activities[slot];
+      String name = activity['activity'];
+      String location = activity['location'] ?? '';
+      int nextStart = slot + 1 < activities.length
+          ? Activity.fromJson(activities[slot + 1]).startMinute
+          : 1440;
+
+      String? reason;
+      if (diff.crowdLevels[name] == 'high' || diff.crowdLevels[location] == 'high') {
+        reason = '$name is very crowded right now';
+      } else if (raining && outdoorCategories.contains(activity['type'])) {
+        reason = 'Rain is expected during $name';
+      }
+
+      if (reason != null) {
+        planned ??= _plannedNames(days);
+        Activity? alternative = _alternativeFor(
+          activity,
+          slot == 0 ? null : activities[slot - 1],
+          nextStart,
+          planned,
+          diff,
+          raining,
+        );
+        if (alternative != null) {
+          planned.add(alternative.name);
+          changes.add(ItineraryChange(
+            day: day,
+            slot: slot,
+            type: 'replace',
+            reason: '$reason, so it is swapped for ${alternative.name} at ${alternative.time}.',
+            activity: alternative.toJson(),
+          ));
+        } else {
+          changes.add(_advisory(day, slot, activity, '$reason; consider visiting at another time.'));
+        }
+        continue;
+      }
+
+      String? road = _congestedRoadTo(location, diff);
+      if (road != null) {
+        Activity current = Activity.fromJson(activity);
+        Activity later = Activity(
+          startMinute: current.startMinute + heavyTrafficDelayMinutes,
+          durationMinutes: current.durationMinutes,
+          name: current.name,
+          location: current.location,
+          type: current.type,
+          cost: current.cost,
+        );
+        if (later.endMinute <= nextStart) {
+          changes.add(ItineraryChange(
+            day: day,
+            slot: slot,
+            type: 'retime',
+            reason: 'Heavy traffic on $road: $name now starts at ${later.time}.',
+            activity: later.toJson(),
+          ));
+        } else {
+          changes.add(_advisory(day, slot, activity, 'Heavy traffic on $road; allow extra time to reach $name.'));
+        }
+      }
+    }
+
+    return changes.isEmpty ? ItineraryDelta.empty : ItineraryDelta(changes);
+  }
+
+  Activity? _alternativeFor(
+    Map<String, dynamic> activity,
+    Map<String, dynamic>? previous,
+    int nextStart,
+    Set<String> exclude,
+    RealtimeDiff diff,
+    bool raining,
+  ) {
+    ItineraryPlanner? planner = this.planner;
+    if (planner == null) return null;
+
+    return planner.alternativeFor(
+      startMinute: Activity.fromJson(activity).startMinute,
+      endMinute: nextStart,
+      category: activity['type'],
+      near: previous == null ? null : LocationService.coordinatesOf(previous['activity']),
+      exclude: exclude,
+      accept: (attraction) =>
+          diff.crowdLevels[attraction.name] != 'high' &&
+          diff.crowdLevels[attraction.location] != 'high' &&
+          !(raining && outdoorCategories.contains(attraction.category)),
+    );
+  }
+
+  String? _congestedRoadTo(String location, RealtimeDiff diff) {
+    for (MapEntry<String, String> entry in diff.trafficConditions.entries) {
+      if (entry.value == 'heavy' && (roadAreas[entry.key]?.contains(location) ?? entry.key == location)) {
+        return entry.key;
+      }
+    }
+    return null;
+  }
+
+  static ItineraryChange _advisory(int day, int slot, Map<String, dynamic> activity, String reason) {
+    return ItineraryChange(
+      day: day,
+      slot: slot,
+      type: 'advisory',
+      reason: reason,
+      activity: {...activity, 'advisory': reason},
+    );
+  }
+
+  static Set<String> _plannedNames(List<dynamic> days) {
+    return {
+      for (dynamic day in days)
+        for (dynamic activity in day['activities'] ?? const []) activity['activity'] as String,
+    };
+  }
+}
+
+// services/itinerary_service.dart
+class ItineraryService {
+  // Fallback day plans used until a catalog planner is registered
+  static const Map<int, List<Activity>> _dayActivities = {
+    1: [
+      Activity(
+        startMinute: 480,
+        durationMinutes: 120,
+        name: 'Sri Aurobindo Ashram Visit',
+        location: 'White Town',
+        type: 'devotional',
+      ),
+      Activity(
+        startMinute: 660,
+        durationMinutes: 180,
+        name: 'French Quarter Walking Tour',
+        location: 'French Quarter',
+        type: 'culture',
+      ),
+      Activity(
+        startMinute: 1020,
+        durationMinutes: 120,
+        name: 'Promenade Beach Sunset',
+        location: 'Promenade Beach',
+        type: 'relaxation',
+      ),
+    ],
+    2: [
+      Activity(
+        startMinute: 420,
+        durationMinutes: 240,
+        name: 'Paradise Beach Trip',
+        location: 'Chunnambar',
+        type: 'adventure',
+      ),
+      Activity(
+        startMinute: 840,
+        durationMinutes: 180,
+        name: 'Auroville Exploration',
+        location: 'Auroville',
+        type: 'spiritual',
+      ),
+      Activity(
+        startMinute: 1140,
+        durationMinutes: 120,
+        name: 'Local Market Visit',
+        location: 'Mission Street',
+        type: 'culture',
+      ),
+    ],
+    3: [
+      Activity(
+        startMinute: 540,
+        durationMinutes: 180,
+        name: 'Scuba Diving Experience',
+        location: 'Auroville Beach',
+        type: 'adventure',
+      ),
+      Activity(
+        startMinute: 900,
+        durationMinutes: 60,
+        name: 'Cathedral Visit',
+        location: 'Mission Street',
+        type: 'devotional',
+      ),
+      Activity(
+        startMinute: 1260,
+        durationMinutes: 180,
+        name: 'Le Club Nightlife',
+        location: 'Promenade Beach',
+        type: 'party',
+      ),
+    ],
+  };
+
+  static const List<Meal> _meals = [
+    Meal(
+      meal: 'Breakfast',
+      recommendation: 'Baker Street Cafe',
+      cuisine: 'French-Indian Fusion',
+      minPrice: 200,
+      maxPrice: 400,
+    ),
+    Meal(
+      meal: 'Lunch',
+      recommendation: 'Surguru Restaurant',
+      cuisine: 'South Indian',
+      minPrice: 150,
+      maxPrice: 300,
+    ),
+    Meal(
+      meal: 'Dinner',
+      recommendation: 'Villa Shanti',
+      cuisine: 'Continental',
+      minPrice: 800,
+      maxPrice: 1500,
+    ),
+  ];
+
+  static const Map<String, dynamic> _transportation = {
+    'recommended': 'Bike Rental',
+    'cost': '₹$_transportCostPerDay/day',
+    'alternatives': ['Auto Rickshaw', 'Taxi', 'Walking'],
+    'tips': 'Book bike early morning for best rates',
+  };
+
+  static const int _transportCostPerDay = 300;
+
+  static const Map<String, int> _dailyBudgets = {
+    'budget': 1500,
+    'moderate': 2500,
+    'luxury': 4000,
+  };
+
+  static const List<String> _transportationTips = [
+    'Rent a bike for maximum flexibility',
+    'Avoid peak hours (8-10 AM, 5-7 PM) for better traffic',
+    'Keep your documents handy',
+    'Wear helmet at all times',
+    'Use GPS navigation for unfamiliar routes',
+  ];
+
+  static const List<String> _weatherConsiderations = [
+    'Carry sunscreen and hat for daytime activities',
+    'Keep light jacket for evening beach visits',
+    'Monsoon season (June-September): Carry umbrella',
+    'Best visiting months: October to March',
+  ];
+
+  static const Map<String, dynamic> _crowdPredictions = {
+    'morning': 'Low to Moderate',
+    'afternoon': 'Moderate to High',
+    'evening': 'High (especially beaches)',
+    'night': 'Low to Moderate',
+  };
+
+  static ItineraryPlanner? _planner;
+
+  static ItineraryPlanner? get planner => _planner;
+
+  // Plans activities from the catalog instead of the fallback day tables.
+  // PoiCatalog.load registers one as soon as the catalog is read.
+  static void usePlanner(ItineraryPlanner? planner) {
+    _planner = planner;
+  }
+
+  static Map<String, dynamic> generateItinerary({
+    required int days,
+    required List<String> interests,
+    required String budget,
+    String? startLocation,
+  }) {
+    return _buildItinerary(
+      ItineraryRequest(days: days, interests: interests, budget: budget, startLocation: startLocation),
+      _ItineraryBlocks(shared: false),
+    );
+  }
+
+  // Builds every requested itinerary against one set of per-day blocks, so
+  // a group booking serializes each day's activities and the meal list once
+  // rather than once per traveller. Shared blocks are unmodifiable: copy an
+  // itinerary's activities and meals before editing them, or pass
+  // [shareBlocks] false to get mutable ones as generateItinerary does.
+  static List<Map<String, dynamic>> generateItineraries(List<ItineraryRequest> requests, {bool shareBlocks = true}) {
+    _ItineraryBlocks blocks = _ItineraryBlocks(shared: shareBlocks);
+    return [for (ItineraryRequest request in requests) _buildItinerary(request, blocks)];
+  }
+
+  // Plans off the UI isolate; the itinerary dialog awaits this instead of
+  // blocking a frame on the planner.
+  static Future<Map<String, dynamic>> generateItineraryInBackground(
+    ItineraryRequest request, {
+    WorkerPool? pool,
+  }) async {
+    List<Map<String, dynamic>> itineraries =
+        await (pool ?? WorkerPool.shared).run(ItineraryBatchTask([request], _planner, shareBlocks: false));
+    return itineraries.first;
+  }
+
+  // Splits large batches into up to [WorkerPool.size] chunks; batches too
+  // small to pay for the round trip run inline on the calling isolate. Each
+  // chunk gets its own exiting isolate so its maps come back without a copy.
+  static Future<List<Map<String, dynamic>>> generateItinerariesConcurrently(
+    List<ItineraryRequest> requests, {
+    WorkerPool? pool,
+    int minRequestsPerWorker = 64,
+  }) async {
+    WorkerPool workers = pool ?? WorkerPool.shared;
+    int chunkCount = min(workers.size, requests.length ~/ minRequestsPerWorker);
+    if (chunkCount <= 1) return generateItineraries(requests);
+
+    int chunkSize = (requests.length / chunkCount).ceil();
+    List<Future<List<Map<String, dynamic>>>> chunks = [
+      for (int start = 0; start < requests.length; start += chunkSize)
+        workers.run(ItineraryBatchTask(
+          requests.sublist(start, min(start + chunkSize, requests.length)),
+          _planner,
+          exitWithResult: true,
+        )),
+    ];
+    return [for (List<Map<String, dynamic>> chunk in await Future.wait(chunks)) ...chunk];
+  }
+
+  static Map<String, dynamic> _buildItinerary(ItineraryRequest request, _ItineraryBlocks blocks) {
+    Map<String, dynamic> itinerary = {
+      'days': [],
+      'total_estimated_cost': 0,
+      'transportation_tips': [],
+      'weather_considerations': [],
+    };
+
+    ItineraryPlanner? planner = _planner;
+    List<List<Map<String, dynamic>>>? planned = planner == null ? null : blocks.planFor(request, planner);
+
+    for (int day = 1; day <= request.days; day++) {
+      Map<String, dynamic> dayPlan = {
+        'day': day,
+        'theme': _getDayTheme(day, request.interests),
+        'activities': planned?[day - 1] ?? blocks.activitiesFor(day, request.interests),
+        'meals': blocks.meals,
+        'transportation': _getTransportationForDay(day),
+        'estimated_cost': _calculateDayCost(day, request.budget),
+        'crowd_predictions': _getCrowdPredictions(day),
+      };
+      itinerary['days'].add(dayPlan);
+    }
+
+    itinerary['total_estimated_cost'] = _calculateTotalCost(request.days, request.budget);
+    itinerary['transportation_tips'] = _getTransportationTips();
+    itinerary['weather_considerations'] = _getWeatherConsiderations();
+
+    return itinerary;
+  }
+
+  static String _getDayTheme(int day, List<String> interests) {
+    List<String> themes = [];
+    if (interests.contains('devotional')) themes.add('Spiritual Journey');
+    if (interests.contains('adventure')) themes.add('Adventure & Nature');
+    if (interests.contains('culture')) themes.add('Cultural Exploration');
+    if (interests.contains('food')) themes.add('Culinary Experience');
+    
+    if (themes.isEmpty) themes = ['Cultural Exploration', 'Adventure & Nature', 'Spiritual Journey'];
+    
+    return themes[(day - 1) % themes.length];
+  }
+
+  static List<Activity> _getActivitiesForDay(int day, List<String> interests) {
+    return _dayActivities[day] ?? _dayActivities[1]!;
+  }
+
+  static List<Meal> _getMealRecommendations() => _meals;
+
+  static Map<String, dynamic> _getTransportationForDay(int day) => _transportation;
+
+  static int _calculateDayCost(int day, String budget) {
+    return _dailyBudgets[budget] ?? 2500;
+  }
+
+  // What one day's activities may cost once transport is paid for
+  static int _activityAllowance(int day, String budget) {
+    return _calculateDayCost(day, budget) - _transportCostPerDay;
+  }
+
+  static int _calculateTotalCost(int days, String budget) {
+    return _calculateDayCost(1, budget) * days;
+  }
+
+  static List<String> _getTransportationTips() => _transportationTips;
+
+  static List<String> _getWeatherConsiderations() => _weatherConsiderations;
+
+  static Map<String, dynamic> _getCrowdPredictions(int day) => _crowdPredictions;
+}
+
+class ItineraryRequest {
+  final int days;
+  final List<String> interests;
+  final String budget;
+  final String? startLocation;
+
+  const ItineraryRequest({
+    required this.days,
+    required this.interests,
+    required this.budget,
+    this.startLocation,
+  });
+
+  factory ItineraryRequest.fromJson(Map<String, dynamic> json) {
+    return ItineraryRequest(
+      days: json['days'] ?? 1,
+      interests: List<String>.from(json['interests'] ?? []),
+      budget: json['budget'] ?? 'moderate',
+      startLocation: json['start_location'],
+    );
+  }
+
+  Map<String, dynamic> toJson() {
+    return {
+      'days': days,
+      'interests': interests,
+      'budget': budget,
+      'start_location': startLocation,
+    };
+  }
+}
+
+// Serialized day blocks shared by the itineraries of one batch. Days that
+// resolve to the same activity table share one unmodifiable block, and
+// identical requests (common in group bookings) share one planned trip.
+// Unshared blocks are fresh mutable copies on every call, for callers that
+// edit a single itinerary in place.
+class _ItineraryBlocks {
+  final bool shared;
+  final Map<List<Activity>, List<Map<String, dynamic>>> _activities = {};
+  final Map<String, List<List<Map<String, dynamic>>>> _plans = {};
+  List<Map<String, dynamic>>? _meals;
+
+  _ItineraryBlocks({this.shared = true});
+
+  List<List<Map<String, dynamic>>> planFor(ItineraryRequest request, ItineraryPlanner planner) {
+    List<List<Map<String, dynamic>>> plan() => planner
+        .plan(request, dailyAllowance: ItineraryService._activityAllowance(1, request.budget))
+        .map((day) => _freeze(day.map((activity) => activity.toJson())))
+        .toList();
+    if (!shared) return plan();
+
+    String key = '${request.days}|${request.budget}|${request.startLocation}|${request.interests.join(',')}';
+    return _plans[key] ??= List<List<Map<String, dynamic>>>.unmodifiable(plan());
+  }
+
+  List<Map<String, dynamic>> activitiesFor(int day, List<String> interests) {
+    List<Activity> activities = ItineraryService._getActivitiesForDay(day, interests);
+    if (!shared) return _freeze(activities.map((activity) => activity.toJson()));
+    return _activities[activities] ??= _freeze(activities.map((activity) => activity.toJson()));
+  }
+
+  List<Map<String, dynamic>> get meals {
+    Iterable<Map<String, dynamic>> meals = ItineraryService._getMealRecommendations().map((meal) => meal.toJson());
+    if (!shared) return _freeze(meals);
+    return _meals ??= _freeze(meals);
+  }
+
+  List<Map<String, dynamic>> _freeze(Iterable<Map<String, dynamic>> entries) {
+    if (!shared) return entries.toList();
+    return List<Map<String, dynamic>>.unmodifiable(entries.map((entry) => Map<String, dynamic>.unmodifiable(entry)));
+  }
+}
+
+// Runs generateItineraries on a worker. The planner and the start
+// locations' coordinates travel with the task because statics on a worker
+// isolate are not the caller's.
+class ItineraryBatchTask extends WorkerTask<List<Map<String, dynamic>>> {
+  final List<ItineraryRequest> requests;
+  final ItineraryPlanner? planner;
+  final Map<String, GeoPoint> coordinates;
+  final bool shareBlocks;
+  @override
+  final bool exitWithResult;
+
+  ItineraryBatchTask(this.requests, this.planner, {this.shareBlocks = true, this.exitWithResult = false})
+      : coordinates = {
+          for (ItineraryRequest request in requests)
+            if (request.startLocation != null && LocationService.coordinatesOf(request.startLocation!) != null)
+              request.startLocation!: LocationService.coordinatesOf(request.startLocation!)!,
+        };
+
+  @override
+  List<Map<String, dynamic>> run() {
+    if (coordinates.isNotEmpty) LocationService.registerLocations(coordinates);
+    ItineraryService.usePlanner(planner);
+    return ItineraryService.generateItineraries(requests, shareBlocks: shareBlocks);
+  }
+}
+
+// services/candidate_table.dart
+// Recommendation candidates stored column-wise: one typed array per numeric
+// feature plus category and time-of-day codes, with the display maps kept
+// aside. A query is one pass of weighted dot products over the columns and a
+// bounded min-heap keeps the best k, so the cost is linear in the pool and
+// only the k winning maps are ever touched.
+class PreferenceVector {
+  final double relevance;
+  final double cost;
+  final double crowd;
+  final double distance; // per km from the traveller
+
+  const PreferenceVector({
+    this.relevance = 1.0,
+    this.cost = 0.0,
+    this.crowd = 0.0,
+    this.distance = 0.0,
+  });
+
+  static const Map<String, double> _costWeights = {
+    'budget': 0.3,
+    'moderate': 0.1,
+    'luxury': 0.0,
+  };
+
+  factory PreferenceVector.fromPreferences(Map<String, dynamic> preferences) {
+    return PreferenceVector(
+      cost: _costWeights[preferences['budget']] ?? 0.1,
+      crowd: preferences['avoid_crowds'] == true ? 0.2 : 0.05,
+      distance: 0.01,
+    );
+  }
+}
+
+class CandidateTable {
+  static const List<String> timesOfDay = ['morning', 'afternoon', 'evening', 'night'];
+  static const Map<String, double> costLevels = {'low': 0.0, 'moderate': 0.5, 'high': 1.0};
+  static const Map<String, double> crowdLevels = {'low': 0.0, 'moderate': 0.5, 'high': 1.0};
+
+  final List<String> categories;
+  final Map<String, int> _categoryIndex;
+  final Uint16List _category;
+  final Uint8List _timeMask;
+  final Float64List _relevance;
+  final Float64List _cost;
+  final Float64List _crowd;
+  final Float64List _lat; // NaN when unknown
+  final Float64List _lng;
+  final List<Map<String, dynamic>> _payloads;
+
+  CandidateTable._(this.categories, this._categoryIndex, int length)
+      : _category = Uint16List(length),
+        _timeMask = Uint8List(length),
+        _relevance = Float64List(length),
+        _cost = Float64List(length),
+        _crowd = Float64List(length),
+        _lat = Float64List(length),
+        _lng = Float64List(length),
+        _payloads = List<Map<String, dynamic>>.filled(length, const {});
+
+  // Each record carries the display fields returned to callers (name, type,
+  // relevance_score, cost_level, description) plus 'times', 'crowd_level'
+  // and optional 'lat'/'lng', which are only used for scoring.
+  factory CandidateTable.fromRecords(List<Map<String, dynamic>> records) {
+    Map<String, int> categoryIndex = {};
+    for (Map<String, dynamic> record in records) {
+      categoryIndex.putIfAbsent(record['type'], () => categoryIndex.length);
+    }
+    CandidateTable table = CandidateTable._(
+      List<String>.unmodifiable(categoryIndex.keys),
+      categoryIndex,
+      records.length,
+    );
+
+    for (int i = 0; i < records.length; i++) {
+      Map<String, dynamic> record = records[i];
+      int mask = 0;
+      for (dynamic time in record['times'] ?? timesOfDay) {
+        int bit = timesOfDay.indexOf(time);
+        if (bit != -1) mask |= 1 << bit;
+      }
+      table._category[i] = categoryIndex[record['type']]!;
+      table._timeMask[i] = mask;
+      table._relevance[i] = (record['relevance_score'] as num? ?? 0).toDouble();
+      table._cost[i] = costLevels[record['cost_level']] ?? 0.5;
+      table._crowd[i] = crowdLevels[record['crowd_level']] ?? 0.5;
+      table._lat[i] = (record['lat'] as num? ?? double.nan).toDouble();
+      table._lng[i] = (record['lng'] as num? ?? double.nan).toDouble();
+      table._payloads[i] = Map<String, dynamic>.unmodifiable({
+        'name': record['name'],
+        'type': record['type'],
+        'relevance_score': table._relevance[i],
+        'cost_level': record['cost_level'],
+        'description': record['description'] ?? '',
+      });
+    }
+    return table;
+  }
+
+  int get length => _payloads.length;
+
+  // The k best candidates in [interests], available at [timeOfDay] and
+  // costing at most [maxCost], best first.
+  List<Map<String, dynamic>> topK({
+    required PreferenceVector preferences,
+    required Set<String> interests,
+    String? timeOfDay,
+    double maxCost = 1.0,
+    GeoPoint? origin,
+    int k = 5,
+  }) {
+    Uint8List allowed = Uint8List(categories.length);
+    for (String interest in interests) {
+      int? index = _categoryIndex[interest];
+      if (index != null) allowed[index] = 1;
+    }
+    int timeBit = timeOfDay == null ? -1 : timesOfDay.indexOf(timeOfDay);
+    int timeMask = timeBit == -1 ? 0xff : 1 << timeBit;
+
+    // Equirectangular distance is accurate to well under 1% at city scale
+    bool hasOrigin = origin != null;
+    double originLat = origin?.lat ?? 0.0;
+    double originLng = origin?.lng ?? 0.0;
+    double kmPerLngDegree = 111.32 * cos(originLat * pi / 180);
+    const double kmPerLatDegree = 110.57;
+
+    double wRelevance = preferences.relevance;
+    double wCost = preferences.cost;
+    double wCrowd = preferences.crowd;
+    double wDistance = preferences.distance;
+
+    TopK best = TopK(k);
+    for (int i = 0; i < _payloads.length; i++) {
+      if (allowed[_category[i]] == 0 || _timeMask[i] & timeMask == 0 || _cost[i] > maxCost) continue;
+
+      double score = wRelevance * _relevance[i] - wCost * _cost[i] - wCrowd * _crowd[i];
+      if (hasOrigin && !_lat[i].isNaN) {
+        double dx = (_lng[i] - originLng) * kmPerLngDegree;
+        double dy = (_lat[i] - originLat) * kmPerLatDegree;
+        score -= wDistance * sqrt(dx * dx + dy * dy);
+      }
+      best.offer(i, score);
+    }
+
+    return [for (int i in best.indices()) Map<String, dynamic>.of(_payloads[i])];
+  }
+}
+
+// Keeps the k highest-scoring indices seen so far in a binary min-heap, so
+// each offer is O(log k). Ties go to the earlier index.
+class TopK {
+  final int k;
+  final Int32List _indices;
+  final Float64List _scores;
+  int _size = 0;
+
+  TopK(this.k)
+      : _indices = Int32List(k),
+        _scores = Float64List(k);
+
+  int get length => _size;
+
+  void offer(int index, double score) {
+    if (_size < k) {
+      _indices[_size] = index;
+      _scores[_size] = score;
+      _siftUp(_size++);
+    } else if (k > 0 && _worse(_indices[0], _scores[0], index, score)) {
+      _indices[0] = index;
+      _scores[0] = score;
+      _siftDown(0);
+    }
+  }
+
+  // Offered indices, best first
+  List<int> indices() => [for (int slot in _ranked()) _indices[slot]];
+
+  // Scores in the same order as indices()
+  List<double> scores() => [for (int slot in _ranked()) _scores[slot]];
+
+  List<int> _ranked() {
+    List<int> order = List<int>.generate(_size, (i) => i);
+    order.sort((a, b) => _worse(_indices[a], _scores[a], _indices[b], _scores[b]) ? 1 : -1);
+    return order;
+  }
+
+  // Whether (a, scoreA) ranks below (b, scoreB)
+  static bool _worse(int a, double scoreA, int b, double scoreB) {
+    return scoreA < scoreB || (scoreA == scoreB && a > b);
+  }
+
+  void _siftUp(int slot) {
+    while (slot > 0) {
+      int parent = (slot - 1) >> 1;
+      if (!_worse(_indices[slot], _scores[slot], _indices[parent], _scores[parent])) break;
+      _swap(slot, parent);
+      slot = parent;
+    }
+  }
+
+  void _siftDown(int slot) {
+    while (true) {
+      int left = 2 * slot + 1;
+      if (left >= _size) break;
+      int right = left + 1;
+      int worst = right < _size && _worse(_indices[right], _scores[right], _indices[left], _scores[left])
+          ? right
+          : left;
+      if (!_worse(_indices[worst], _scores[worst], _indices[slot], _scores[slot])) break;
+      _swap(slot, worst);
+      slot = worst;
+    }
+  }
+
+  void _swap(int a, int b) {
+    int index = _indices[a];
+    _indices[a] = _indices[b];
+    _indices[b] = index;
+    double score = _scores[a];
+    _scores[a] = _scores[b];
+    _scores[b] = score;
+  }
+}
+
+// services/recommendation_engine.dart
+class RecommendationEngine {
+  // Built-in candidates, used until a larger table is registered
+  static const List<Map<String, dynamic>> _seedCandidates = [
+    {
+      'name': 'Paradise Beach Adventure',
+      'type': 'adventure',
+      'relevance_score': 0.9,
+      'cost_level': 'moderate',
+      'description': 'Boat ride and water sports',
+      'times': ['morning'],
+      'crowd_level': 'high',
+      'lat': 12.0167,
+      'lng': 79.8667,
+    },
+    {
+      'name': 'Cycling Tour',
+      'type': 'adventure',
+      'relevance_score': 0.8,
+      'cost_level': 'low',
+      'description': 'Explore French Quarter on bike',
+      'times': ['morning'],
+      'crowd_level': 'moderate',
+      'lat': 11.9344,
+      'lng': 79.8309,
+    },
+    {
+      'name': 'Scuba Diving',
+      'type': 'adventure',
+      'relevance_score': 0.9,
+      'cost_level': 'high',
+      'description': 'Underwater exploration',
+      'times': ['afternoon'],
+      'crowd_level': 'low',
+      'lat': 11.9730,
+      'lng': 79.8440,
+    },
+    {
+      'name': 'Sri Aurobindo Ashram',
+      'type': 'devotional',
+      'relevance_score': 0.95,
+      'cost_level': 'low',
+      'description': 'Morning meditation session',
+      'times': ['morning'],
+      'crowd_level': 'moderate',
+      'lat': 11.9416,
+      'lng': 79.8083,
+    },
+    {
+      'name': 'Manakula Vinayagar Temple',
+      'type': 'devotional',
+      'relevance_score': 0.8,
+      'cost_level': 'low',
+      'description': 'Ancient Ganesha temple',
+      'times': ['morning'],
+      'crowd_level': 'high',
+      'lat': 11.9353,
+      'lng': 79.8352,
+    },
+  ];
+
+  static CandidateTable? _candidates;
+
+  static CandidateTable get candidates => _candidates ??= CandidateTable.fromRecords(_seedCandidates);
+
+  static void useCandidates(CandidateTable table) {
+    _candidates = table;
+  }
+
+  static List<Map<String, dynamic>> getPersonalizedRecommendations({
+    required Map<String, dynamic> userPreferences,
+    required String currentLocation,
+    required String timeOfDay,
+  }) {
+    return candidates.topK(
+      preferences: PreferenceVector.fromPreferences(userPreferences),
+      interests: Set<String>.from(userPreferences['interests'] ?? const []),
+      timeOfDay: timeOfDay,
+      // Budget travellers never see high-cost options
+      maxCost: userPreferences['budget'] == 'budget' ? CandidateTable.costLevels['moderate']! : 1.0,
+      origin: LocationService.coordinatesOf(currentLocation),
+      k: 5,
+    );
+  }
+
+  static const Map<String, double> _averageSpeedKmh = {
+    'light': 30.0,
+    'moderate': 22.0,
+    'heavy': 15.0,
+  };
+
+  static Map<String, dynamic> optimizeRoute(
+    List<String> destinations, {
+    Map<String, String> bestTimes = const {},
+    String? startLocation,
+  }) {
+    OptimizedRoute route = RouteOptimizer.optimize(
+      destinations,
+      bestTimes: bestTimes,
+      start: startLocation,
+    );
+
+    String traffic = destinations.isEmpty
+        ? 'light'
+        : LocationService.getTrafficCondition(startLocation ?? route.order.first);
+    int minutes = (route.distanceKm / _averageSpeedKmh[traffic]! * 60).round();
+
+    return {
+      'optimized_order': route.order,
+      'total_distance': '${route.distanceKm.toStringAsFixed(1)} km',
+      'estimated_time': minutes >= 60 ? '${minutes ~/ 60} h ${minutes % 60} min' : '$minutes min',
+      'fuel_cost': '₹${(route.distanceKm * 10).round()}',
+      'traffic_condition': traffic,
+    };
+  }
+}
+
+// services/conversation_store.dart
+// Per-session history as a fixed-capacity ring of structured turns: appends
+// overwrite the oldest turn in O(1), memory is bounded however long the
+// session runs, and reads are views over the ring rather than copies.
+class ConversationTurn {
+  static const String user = 'user';
+  static const String bot = 'bot';
+
+  final String role;
+  final String text;
+  final String intent;
+  final Map<String, String> entities;
+  final DateTime timestamp;
+  // Estimated once at creation; see ConversationStore.estimateTokens
+  final int tokens;
+
+  ConversationTurn({
+    required this.role,
+    required this.text,
+    this.intent = 'general',
+    this.entities = const {},
+    DateTime? timestamp,
+  })  : timestamp = timestamp ?? DateTime.now(),
+        tokens = ConversationStore.estimateTokens(text);
+
+  bool get isUser => role == user;
+
+  factory ConversationTurn.fromJson(Map<String, dynamic> json) {
+    return ConversationTurn(
+      role: json['role'] ?? user,
+      text: json['text'] ?? '',
+      intent: json['intent'] ?? 'general',
+      entities: Map<String, String>.from(json['entities'] ?? {}),
+      timestamp: DateTime.tryParse(json['timestamp'] ?? ''),
+    );
+  }
+
+  Map<String, dynamic> toJson() {
+    return {
+      'role': role,
+      'text': text,
+      'intent': intent,
+      'entities': entities,
+      'timestamp': timestamp.toIso8601String(),
+    };
+  }
+
+  // The 'User: ...' / 'Bot: ...' line format history has always used
+  @override
+  String toString() => '${isUser ? 'User' : 'Bot'}: $text';
+}
+
+// The most recent turns that fit a token budget, oldest first.
+class ContextWindow {
+  final List<ConversationTurn> turns;
+  final int tokens;
+  final int tokenBudget;
+  // Older turns exist that did not fit
+  final bool truncated;
+
+  const ContextWindow({
+    required this.turns,
+    required this.tokens,
+    required this.tokenBudget,
+    required this.truncated,
+  });
+
+  static const ContextWindow empty = ContextWindow(turns: [], tokens: 0, tokenBudget: 0, truncated: false);
+
+  List<String> toLines() => [for (ConversationTurn turn in turns) turn.toString()];
+}
+
+class ConversationStore {
+  // Roughly four characters per token for English text
+  static const int charsPerToken = 4;
+
+  final int capacity;
+  final List<ConversationTurn?> _ring;
+  int _start = 0;
+  int _length = 0;
+  // Bumped on every write so stale views fail loudly instead of reading
+  // turns that have since been overwritten
+  int _generation = 0;
+
+  ConversationStore({this.capacity = 64})
+      : assert(capacity > 0),
+        _ring = List<ConversationTurn?>.filled(capacity, null);
+
+  int get length => _length;
+
+  bool get isEmpty => _length == 0;
+
+  ConversationTurn? get last => _length == 0 ? null : this[_length - 1];
+
+  // Oldest turn is 0
+  ConversationTurn operator [](int index) {
+    RangeError.checkValidIndex(index, this, 'index', _length);
+    return _ring[(_start + index) % capacity]!;
+  }
+
+  void add(ConversationTurn turn) {
+    _generation++;
+    if (_length < capacity) {
+      _ring[(_start + _length) % capacity] = turn;
+      _length++;
+    } else {
+      _ring[_start] = turn;
+      _start = (_start + 1) % capacity;
+    }
+  }
+
+  void clear() {
+    _generation++;
+    _ring.fillRange(0, capacity, null);
+    _start = 0;
+    _length = 0;
+  }
+
+  // The last [count] turns (all when null), oldest first, as a read-only
+  // view. It is valid until the next add or clear.
+  List<ConversationTurn> recent([int? count]) {
+    int size = count == null ? _length : min(count, _length);
+    return _TurnView(this, _length - size, size, _generation);
+  }
+
+  // Newest turns whose estimated tokens sum to at most [tokenBudget], and
+  // at most [maxTurns] of them.
+  ContextWindow contextWindow({int tokenBudget = 512, int? maxTurns}) {
+    int limit = maxTurns == null ? _length : min(maxTurns, _length);
+    int tokens = 0;
+    int size = 0;
+    while (size < limit) {
+      int cost = this[_length - 1 - size].tokens;
+      if (tokens + cost > tokenBudget) break;
+      tokens += cost;
+      size++;
+    }
+    return ContextWindow(
+      turns: _TurnView(this, _length - size, size, _generation),
+      tokens: tokens,
+      tokenBudget: tokenBudget,
+      truncated: size < _length,
+    );
+  }
+
+  static int estimateTokens(String text) => (text.length + charsPerToken - 1) ~/ charsPerToken;
+}
+
+class _TurnView extends ListBase<ConversationTurn> with UnmodifiableListMixin<ConversationTurn> {
+  final ConversationStore _store;
+  final int _offset;
+  final int _generation;
+
+  @override
+  final int length;
+
+  _TurnView(this._store, this._offset, this.length, this._generation);
+
+  @override
+  ConversationTurn operator [](int index) {
+    if (_store._generation != _generation) throw ConcurrentModificationError(_store);
+    RangeError.checkValidIndex(index, this, 'index', length);
+    return _store[_offset + index];
+  }
+}
+
+// Light entity tagging for turns: known places, a trip length and a budget
+// level, enough for follow-ups to inherit what the previous turn was about.
+class TurnEntities {
+  static final RegExp _days = RegExp(r'\b(\d{1,2})\s*(?:day|night)s?\b');
+
+  static const Map<String, String> _budgetWords = {
+    'cheap': 'budget',
+    'budget': 'budget',
+    'affordable': 'budget',
+    'expensive': 'luxury',
+    'luxury': 'luxury',
+    'premium': 'luxury',
+  };
+
+  static Map<String, String> extract(String text) {
+    String lower = text.toLowerCase();
+    Map<String, String> entities = {};
+
+    for (String place in LocationService.knownLocations) {
+      if (lower.contains(place.toLowerCase())) {
+        entities['place'] = place;
+        break;
+      }
+    }
+
+    Match? days = _days.firstMatch(lower);
+    if (days != null) entities['days'] = days.group(1)!;
+
+    for (String word in KnowledgeBase.tokenize(lower)) {
+      String? budget = _budgetWords[word];
+      if (budget != null) {
+        entities['budget'] = budget;
+        break;
+      }
+    }
+    return entities;
+  }
+}
+
+// services/message_store.dart
+// Chat history on disk (sqflite), so a week-long trip's conversation
+// survives restarts without living in memory. Writes are queued and
+// committed as one batch; reads are keyset pages over the
+// (session_id, created_at, message_id) index, so opening a chat or
+// scrolling back is one indexed range scan whatever the history length.
+class StoredMessage {
+  final String messageId;
+  final String sessionId;
+  final bool isUser;
+  final String text;
+  final DateTime timestamp;
+
+  const StoredMessage({
+    required this.messageId,
+    required this.sessionId,
+    required this.isUser,
+    required this.text,
+    required this.timestamp,
+  });
+
+  factory StoredMessage.fromRow(Map<String, Object?> row) {
+    return StoredMessage(
+      messageId: row['message_id'] as String,
+      sessionId: row['session_id'] as String,
+      isUser: row['is_user'] == 1,
+      text: row['text'] as String,
+      timestamp: DateTime.fromMillisecondsSinceEpoch(row['created_at'] as int),
+    );
+  }
+
+  Map<String, Object?> toRow() {
+    return {
+      'message_id': messageId,
+      'session_id': sessionId,
+      'is_user': isUser ? 1 : 0,
+      'text': text,
+      'created_at': timestamp.millisecondsSinceEpoch,
+    };
+  }
+}
+
+class MessageStore {
+  static const String databaseName = 'chat_history.db';
+  static const int schemaVersion = 1;
+  static const String _table = 'messages';
+
+  static const Uuid _uuid = Uuid();
+
+  static Future<MessageStore>? _shared;
+
+  // One connection per process, shared by both chat screens
+  static Future<MessageStore> get shared => _shared ??= _openShared();
+
+  final Database _db;
+  final Duration flushDelay;
+  final int maxBatchSize;
+  final List<StoredMessage> _pending = [];
+  Timer? _flushTimer;
+  Future<void>? _flushing;
+
+  MessageStore._(
+    this._db, {
+    this.flushDelay = const Duration(milliseconds: 250),
+    this.maxBatchSize = 50,
+  });
+
+  // Random v4 ids: a message and its reply are often created in the same
+  // millisecond, and the id is both the primary key and the list key
+  static String newMessageId() => _uuid.v4();
+
+  static Future<MessageStore> open({String? databasePath}) async {
+    Database db = await openDatabase(
+      databasePath ?? join(await getDatabasesPath(), databaseName),
+      version: schemaVersion,
+      onCreate: _createSchema,
+    );
+    return MessageStore._(db);
+  }
+
+  // A failed open is not cached, so the next caller tries again
+  static Future<MessageStore> _openShared() async {
+    try {
+      return await open();
+    } catch (_) {
+      _shared = null;
+      rethrow;
+    }
+  }
+
+  static Future<void> _createSchema(Database db, int version) async {
+    await db.execute('''
+      CREATE TABLE $_table (
+        message_id TEXT PRIMARY KEY,
+        session_id TEXT NOT NULL,
+        is_user INTEGER NOT NULL,
+        text TEXT NOT NULL,
+        created_at INTEGER NOT NULL
+      )
+    ''');
+    await db.execute('CREATE INDEX idx_${_table}_session_time ON $_table (session_id, created_at, message_id)');
+  }
+
+  // Queued; written with the rest of its batch after [flushDelay], or at
+  // once when [maxBatchSize] messages are waiting.
+  void add(StoredMessage message) {
+    _pending.add(message);
+    if (_pending.length >= maxBatchSize) {
+      flushInBackground();
+    } else {
+      _flushTimer ??= Timer(flushDelay, flushInBackground);
+    }
+  }
+
+  // [flush] for callers that do not wait on it. A failed batch stays
+  // queued for the next flush, so the error is only logged.
+  void flushInBackground() {
+    flush().catchError((Object error, StackTrace stackTrace) {
+      developer.log('Message batch write failed', name: 'MessageStore', error: error, stackTrace: stackTrace);
+    });
+  }
+
+  Future<void> flush() async {
+    _flushTimer?.cancel();
+    _flushTimer = null;
+    // One batch in flight at a time keeps writes in order
+    while (_flushing != null) {
+      try {
+        await _flushing;
+      } catch (_) {
+        // Reported to that batch's own caller
+      }
+    }
+    if (_pending.isEmpty) return;
+
+    List<StoredMessage> messages = List<StoredMessage>.of(_pending);
+    _pending.clear();
+    Future<void> writing = _write(messages);
+    _flushing = writing;
+    try {
+      await writing;
+    } catch (_) {
+      // Retried with the next flush
+      _pending.insertAll(0, messages);
+      rethrow;
+    } finally {
+      _flushing = null;
+    }
+  }
+
+  // Up to [limit] messages of [sessionId] older than the message at
+  // ([before], [beforeId]), or the newest ones when [before] is null;
+  // oldest first.
+  Future<List<StoredMessage>> pageBefore(
+    String sessionId, {
+    DateTime? before,
+    String beforeId = '',
+    int limit = 50,
+  }) async {
+    await flush();
+
+    List<Map<String, Object?>> rows;
+    if (before == null) {
+      rows = await _db.query(
+        _table,
+        where: 'session_id = ?',
+        whereArgs: [sessionId],
+        orderBy: 'created_at DESC, message_id DESC',
+        limit: limit,
+      );
+    } else {
+      int createdAt = before.millisecondsSinceEpoch;
+      rows = await _db.query(
+        _table,
+        where: 'session_id = ? AND (created_at < ? OR (created_at = ? AND message_id < ?))',
+        whereArgs: [sessionId, createdAt, createdAt, beforeId],
+        orderBy: 'created_at DESC, message_id DESC',
+        limit: limit,
+      );
+    }
+    return [for (int i = rows.length - 1; i >= 0; i--) StoredMessage.fromRow(rows[i])];
+  }
+
+  Future<int> count(String sessionId) async {
+    await flush();
+    return Sqflite.firstIntValue(
+          await _db.rawQuery('SELECT COUNT(*) FROM $_table WHERE session_id = ?', [sessionId]),
+        ) ??
+        0;
+  }
+
+  Future<void> deleteSession(String sessionId) async {
+    _pending.removeWhere((message) => message.sessionId == sessionId);
+    await _db.delete(_table, where: 'session_id = ?', whereArgs: [sessionId]);
+  }
+
+  Future<void> close() async {
+    await flush();
+    await _db.close();
+    _shared = null;
+  }
+
+  Future<void> _write(List<StoredMessage> messages) async {
+    Batch batch = _db.batch();
+    for (StoredMessage message in messages) {
+      batch.insert(_table, message.toRow(), conflictAlgorithm: ConflictAlgorithm.ignore);
+    }
+    await batch.commit(noResult: true);
+  }
+}
+
+// services/realtime_data_service.dart
+// Crowd, traffic and weather data as versioned immutable snapshots. Polling
+// runs only while someone is subscribed, the app is in the foreground and
+// the session has been active recently, and it backs off while nothing
+// changes. Subscribers are notified only for keys whose value moved.
+class RealtimeSnapshot {
+  final int version;
+  final DateTime updatedAt;
+  final Map<String, dynamic> _data;
+
+  RealtimeSnapshot._(this.version, this.updatedAt, this._data);
+
+  factory RealtimeSnapshot.initial(Map<String, dynamic> data) {
+    return RealtimeSnapshot._(0, DateTime.now(), _freeze(data) as Map<String, dynamic>);
+  }
+
+  String? get weather => _data['weather'];
+
+  Map<String, dynamic> get crowdLevels => _data['crowd_levels'] ?? const {};
+
+  Map<String, dynamic> get trafficConditions => _data['traffic_conditions'] ?? const {};
+
+  // A top-level field ('weather', 'crowd_levels') or one entry of a map
+  // field ('crowd_levels/Paradise Beach').
+  Object? valueAt(String key) {
+    int slash = key.indexOf('/');
+    if (slash < 0) return _data[key];
+    Object? field = _data[key.substring(0, slash)];
+    return field is Map ? field[key.substring(slash + 1)] : null;
+  }
+
+  // Next version with [updates] merged in, or this snapshot when they change
+  // nothing. Untouched fields keep their instances.
+  RealtimeSnapshot merge(Map<String, dynamic> updates) {
+    Map<String, dynamic> data = Map<String, dynamic>.of(_data);
+    bool changed = false;
+    updates.forEach((key, value) {
+      if (sameValue(data[key], value)) return;
+      data[key] = _freeze(value);
+      changed = true;
+    });
+    if (!changed) return this;
+    return RealtimeSnapshot._(version + 1, DateTime.now(), Map<String, dynamic>.unmodifiable(data));
+  }
+
+  // Read-only view in the shape ChatbotAI's realtimeData has always had
+  Map<String, dynamic> toJson() => _data;
+
+  static bool sameValue(Object? a, Object? b) {
+    if (identical(a, b)) return true;
+    if (a is Map && b is Map) {
+      return a.length == b.length && a.keys.every((key) => b.containsKey(key) && sameValue(a[key], b[key]));
+    }
+    if (a is List && b is List) {
+      if (a.length != b.length) return false;
+      for (int i = 0; i < a.length; i++) {
+        if (!sameValue(a[i], b[i])) return false;
+      }
+      return true;
+    }
+    return a == b;
+  }
+
+  static Object? _freeze(Object? value) {
+    if (value is Map) {
+      return Map<String, dynamic>.unmodifiable({
+        for (MapEntry entry in value.entries) entry.key.toString(): _freeze(entry.value),
+      });
+    }
+    if (value is List) return List<dynamic>.unmodifiable(value.map(_freeze));
+    return value;
+  }
+}
+
+class RealtimeDataService {
+  final Future<Map<String, dynamic>> Function() _fetch;
+  final Duration interval;
+  final Duration maxInterval;
+  final Duration idleTimeout;
+
+  RealtimeSnapshot _current;
+  late final StreamController<RealtimeSnapshot> _changes;
+  final Map<String, StreamController<Object?>> _watchers = {};
+  Timer? _timer;
+  Future<RealtimeSnapshot>? _inFlight;
+  Duration _pollInterval;
+  DateTime? _lastPolled;
+  DateTime _lastActivity = DateTime.now();
+  bool _foreground = true;
+  bool _disposed = false;
+
+  RealtimeDataService({
+    required Future<Map<String, dynamic>> Function() fetch,
+    Map<String, dynamic>? initialData,
+    this.interval = const Duration(seconds: 30),
+    this.maxInterval = const Duration(minutes: 5),
+    this.idleTimeout = const Duration(minutes: 10),
+  })  : _fetch = fetch,
+        _current = RealtimeSnapshot.initial(initialData ?? ChatbotEngine.defaultRealtimeData()),
+        _pollInterval = interval {
+    _changes = StreamController<RealtimeSnapshot>.broadcast(onListen: _reschedule, onCancel: _reschedule);
+  }
+
+  RealtimeSnapshot get current => _current;
+
+  // Every snapshot that changed at least one value
+  Stream<RealtimeSnapshot> get changes => _changes.stream;
+
+  bool get hasSubscribers =>
+      _changes.hasListener || _watchers.values.any((controller) => controller.hasListener);
+
+  bool get isPolling => _timer != null;
+
+  bool get _isIdle => DateTime.now().difference(_lastActivity) > idleTimeout;
+
+  // New values of one key (see RealtimeSnapshot.valueAt). Nothing is
+  // replayed on listen; read [current] for the starting value. The stream
+  // stays open until [dispose], so it can be cached and listened to again.
+  Stream<Object?> watch(String key) {
+    StreamController<Object?>? existing = _watchers[key];
+    if (existing != null) return existing.stream;
+
+    StreamController<Object?> controller = StreamController<Object?>.broadcast(
+      onListen: _reschedule,
+      onCancel: _reschedule,
+    );
+    _watchers[key] = controller;
+    return controller.stream;
+  }
+
+  // App lifecycle: polling stops in the background and catches up on resume.
+  void setForeground(bool foreground) {
+    _foreground = foreground;
+    _reschedule();
+  }
+
+  // User interaction; a session that was idle resumes polling at once.
+  void markActive() {
+    bool wasIdle = _isIdle;
+    _lastActivity = DateTime.now();
+    if (wasIdle) _pollInterval = interval;
+    _reschedule();
+  }
+
+  // Polls now; concurrent calls share one fetch.
+  Future<RealtimeSnapshot> refresh() {
+    return _inFlight ??= _fetchAndPublish().whenComplete(() => _inFlight = null);
+  }
+
+  // Merges [updates] into a new snapshot and notifies only the watchers
+  // whose keys changed. Returns the current snapshot either way.
+  RealtimeSnapshot publish(Map<String, dynamic> updates) {
+    if (_disposed) return _current;
+
+    RealtimeSnapshot previous = _current;
+    RealtimeSnapshot next = previous.merge(updates);
+    if (identical(next, previous)) {
+      // Nothing moved: poll less often until something does
+      _pollInterval = _pollInterval * 2 > maxInterval ? maxInterval : _pollInterval * 2;
+      return previous;
+    }
+
+    _pollInterval = interval;
+    _current = next;
+    for (MapEntry<String, StreamController<Object?>> watcher in _watchers.entries) {
+      if (!watcher.value.hasListener) continue;
+      Object? value = next.valueAt(watcher.key);
+      if (!RealtimeSnapshot.sameValue(previous.valueAt(watcher.key), value)) {
+        watcher.value.add(value);
+      }
+    }
+    _changes.add(next);
+    return next;
+  }
+
+  void dispose() {
+    _disposed = true;
+    _timer?.cancel();
+    _timer = null;
+    for (StreamController<Object?> controller in _watchers.values.toList()) {
+      controller.close();
+    }
+    _watchers.clear();
+    _changes.close();
+  }
+
+  Future<RealtimeSnapshot> _fetchAndPublish() async {
+    try {
+      return publish(await _fetch());
+    } finally {
+      _lastPolled = DateTime.now();
+    }
+  }
+
+  void _reschedule() {
+    _timer?.cancel();
+    _timer = null;
+    if (_disposed || !_foreground || !hasSubscribers || _isIdle) return;
+
+    DateTime? lastPolled = _lastPolled;
+    Duration wait = lastPolled == null ? Duration.zero : _pollInterval - DateTime.now().difference(lastPolled);
+    _timer = Timer(wait.isNegative ? Duration.zero : wait, _poll);
+  }
+
+  Future<void> _poll() async {
+    _timer = null;
+    try {
+      await refresh();
+    } catch (_) {
+      // Keep serving the last snapshot and retry on the next tick
+    }
+    _reschedule();
+  }
+}
+
+// services/response_stream.dart
+// Incremental delivery of response text. The chat screen appends each chunk
+// to the in-progress bubble, and SentenceSplitter hands completed sentences
+// to TTS so speech can start before the rest of the reply has rendered.
+class ResponseChunker {
+  static final RegExp _wordEnd = RegExp(r'\S+\s*');
+
+  // Consecutive slices of [text] ending on word boundaries; joined they give
+  // back [text] exactly, whitespace and newlines included.
+  static Iterable<String> chunks(String text, {int wordsPerChunk = 3}) sync* {
+    int start = 0;
+    int words = 0;
+    for (Match word in _wordEnd.allMatches(text)) {
+      if (++words < wordsPerChunk) continue;
+      yield text.substring(start, word.end);
+      start = word.end;
+      words = 0;
+    }
+    if (start < text.length) yield text.substring(start);
+  }
+}
+
+class SentenceSplitter {
+  static final RegExp _sentenceEnd = RegExp(r'[.!?]+(?=\s)|\n+');
+
+  final StringBuffer _pending = StringBuffer();
+
+  // Sentences completed by [chunk]; the unfinished tail is kept for the next
+  // call or for flush().
+  List<String> add(String chunk) {
+    _pending.write(chunk);
+    String text = _pending.toString();
+    List<String> sentences = [];
+    int start = 0;
+    for (Match end in _sentenceEnd.allMatches(text)) {
+      String sentence = text.substring(start, end.end).trim();
+      if (sentence.isNotEmpty) sentences.add(sentence);
+      start = end.end;
+    }
+    if (start > 0) {
+      _pending
+        ..clear()
+        ..write(text.substring(start));
+    }
+    return sentences;
+  }
+
+  String? flush() {
+    String rest = _pending.toString().trim();
+    _pending.clear();
+    return rest.isEmpty ? null : rest;
+  }
+}
+
+// services/chatbot_engine.dart
+class ChatbotAI {
+  KnowledgeBase? knowledgeBase;
+  SemanticIndex? semanticIndex;
+  final ResponseCache responseCache = ResponseCache();
+  final LatencyTracker latency;
+  int _realtimeVersion = 0;
+
+  ChatbotAI({LatencyPolicy latencyPolicy = LatencyPolicy.production})
+      : latency = LatencyTracker(latencyPolicy);
+
+  static const Map<String, String> _weatherAdvice = {
+    'sunny': '☀️ Beautiful sunny weather! Perfect for beach visits and outdoor exploration. Don\'t forget sunscreen!',
+    'cloudy': '⛅ Nice cloudy weather - ideal for walking tours and sightseeing without harsh sun.',
+    'rainy': '🌧️ Monsoon vibes! Great time for indoor cultural sites, cafes, and ashram meditation sessions.',
+    'windy': '💨 Breezy conditions - perfect for water sports and beachside activities!',
+  };
+
+  // Intents whose text depends only on these context fields and the realtime
+  // data; the others pick random or time-of-day variants and are not cached.
+  static const Map<String, List<String>> _cacheableIntents = {
+    'adventure': [],
+    'culture': [],
+    'transport': [],
+    'weather': [],
+    'budget': [],
+    'food': ['budget_preference'],
+    'itinerary': ['visit_duration'],
+  };
+
+  Map<String, List<String>> _responseTemplates = {
+    'welcome': [
+      'Bonjour! Welcome to the beautiful union territory of Pondicherry! 🌺 I\'m your AI travel companion, ready to help you explore this French colonial paradise.',
+      'Namaste and Bonjour! I\'m thrilled you\'re here in Pondicherry! 🙏 Let me be your personal guide to discover the perfect blend of Indian spirituality and French elegance.',
+    ],
+    'devotional': [
+      'Pondicherry is a spiritual haven! Let me guide you through sacred spaces that will touch your soul.',
+      'The spiritual energy here is incredible! I can recommend ashrams, temples, and meditation centers perfect for your journey.',
+    ],
+    'adventure': [
+      'Ready for some excitement? Pondicherry offers amazing water sports, beach adventures, and thrilling experiences!',
+      'Adventure awaits! From scuba diving to parasailing, let\'s plan your adrenaline-filled itinerary.',
+    ],
+    'culture': [
+      'The rich Franco-Tamil culture here is fascinating! Let me show you the best museums, galleries, and cultural sites.',
+      'Dive into 300 years of French colonial history mixed with Tamil traditions - it\'s absolutely unique!',
+    ],
+  };
+
+  Future<AIResponse> generateResponse({
+    required String message,
+    required Map<String, dynamic> context,
+    List<ConversationTurn> conversationHistory = const [],
+    required Map<String, dynamic> realtimeData,
+  }) async {
+    return respond(
+      message: message,
+      context: context,
+      conversationHistory: conversationHistory,
+      realtimeData: realtimeData,
+    );
+  }
+
+  AIResponse respond({
+    required String message,
+    required Map<String, dynamic> context,
+    List<ConversationTurn> conversationHistory = const [],
+    required Map<String, dynamic> realtimeData,
+  }) {
+    Stopwatch stopwatch = Stopwatch()..start();
+
+    IntentResult classification = IntentClassifier.shared.classify(message);
+    String intent = classification.intent;
+    double confidence = classification.confidence;
+
+    String lookup = message;
+    String? answer;
+    List<SemanticMatch> related = const [];
+    if (intent == 'general') {
+      // A short question with no place of its own ("what are the timings?")
+      // is looked up against the place named in the previous turn
+      ConversationTurn? previous = _lastUserTurn(conversationHistory);
+      bool opener = _startsFollowUp(message);
+      bool mayFollow = previous != null && (opener || _isShortQuestion(message));
+      String? place = previous?.entities['place'];
+      if (mayFollow && place != null && !TurnEntities.extract(message).containsKey('place')) {
+        lookup = '$message $place';
+      }
+
+      // The message's own answer wins unless it opens as a follow-up
+      // ("and tomorrow?", "what about dinner?")
+      if (!opener) {
+        answer = _generateKnowledgeResponse(lookup);
+        // Paraphrases with no intent keyword fall back to embedding similarity
+        SemanticIndex? index = semanticIndex;
+        if (answer == null && index != null) {
+          related = index.search(message);
+          SemanticMatch? match = SemanticIndex.bestIntent(related);
+          if (match != null) {
+            intent = match.key;
+            confidence = match.similarity;
+          } else {
+            answer = _generateSemanticResponse(related);
+          }
+        }
+      }
+
+      // Nothing matched: stay on the previous turn's topic
+      if (answer == null && intent == 'general' && mayFollow && previous != null && previous.intent != 'general') {
+        intent = previous.intent;
+        confidence = _followUpConfidence;
+      }
+    }
+
+    String response = answer ?? _cachedContextualResponse(intent, lookup, context, realtimeData, related);
+    List<BotAction> actions = _generateActions(intent, message, context);
+
+    latency.record(stopwatch.elapsed);
+
+    return AIResponse(
+      text: response,
+      intent: intent,
+      confidence: confidence,
+      actions: actions,
+    );
+  }
+
+  // [response]'s text as word-boundary chunks, paced by the latency policy's
+  // chunkInterval. The text is complete by the time the first chunk is
+  // yielded, so time-to-first-chunk is the compute latency alone.
+  Stream<String> streamResponse(AIResponse response, {int wordsPerChunk = 3}) async* {
+    Duration interval = latency.policy.chunkInterval;
+    bool first = true;
+    for (String chunk in ResponseChunker.chunks(response.text, wordsPerChunk: wordsPerChunk)) {
+      if (!first) {
+        // Zero still yields to the event loop so each chunk gets a frame
+        await Future.delayed(interval);
+      }
+      first = false;
+      yield chunk;
+    }
+  }
+
+  Stream<String> generateResponseStream({
+    required String message,
+    required Map<String, dynamic> context,
+    List<ConversationTurn> conversationHistory = const [],
+    required Map<String, dynamic> realtimeData,
+  }) {
+    return streamResponse(respond(
+      message: message,
+      context: context,
+      conversationHistory: conversationHistory,
+      realtimeData: realtimeData,
+    ));
+  }
+
+  static const double _followUpConfidence = 0.5;
+  static const int _followUpMaxTerms = 5;
+  static const List<String> _followUpOpeners = ['and ', 'what about', 'how about', 'also', 'more ', 'same '];
+
+  static ConversationTurn? _lastUserTurn(List<ConversationTurn> history) {
+    for (int i = history.length - 1; i >= 0; i--) {
+      ConversationTurn turn = history[i];
+      if (turn.isUser) return turn;
+    }
+    return null;
+  }
+
+  static bool _startsFollowUp(String message) {
+    String lower = message.trim().toLowerCase();
+    return _followUpOpeners.any(lower.startsWith);
+  }
+
+  static bool _isShortQuestion(String message) {
+    String lower = message.trim().toLowerCase();
+    return lower.endsWith('?') && KnowledgeBase.tokenize(lower).length <= _followUpMaxTerms;
+  }
+
+  // [version] is the RealtimeSnapshot version when the data came from one
+  void onRealtimeDataUpdated([int? version]) {
+    _realtimeVersion = version ?? _realtimeVersion + 1;
+    responseCache.clear();
+  }
+
+  String _cachedContextualResponse(String intent, String message, Map<String, dynamic> context, Map<String, dynamic> realtimeData, [List<SemanticMatch> related = const []]) {
+    List<String>? keyFields = _cacheableIntents[intent];
+    if (keyFields == null) {
+      return _generateContextualResponse(intent, message, context, realtimeData, related);
+    }
+
+    String key = '$intent|$_realtimeVersion|${keyFields.map((field) => context[field]).join('|')}';
+    return responseCache.putIfAbsent(
+      key,
+      () => _generateContextualResponse(intent, message, context, realtimeData),
+    );
+  }
+
+  String _generateContextualResponse(String intent, String message, Map<String, dynamic> context, Map<String, dynamic> realtimeData, [List<SemanticMatch> related = const []]) {
+    switch (intent) {
+      case 'devotional':
+        return _generateDevotionalResponse(context, realtimeData);
+      case 'adventure':
+        return _generateAdventureResponse(context, realtimeData);
+      case 'culture':
+        return _generateCultureResponse(context, realtimeData);
+      case 'food':
+        return _generateFoodResponse(context, realtimeData);
+      case 'transport':
+        return _generateTransportResponse(context, realtimeData);
+      case 'weather':
+        return _generateWeatherResponse(realtimeData);
+      case 'budget':
+        return _generateBudgetResponse(context);
+      case 'itinerary':
+        return _generateItineraryResponse(context, realtimeData);
+      default:
+        return _generateKnowledgeResponse(message) ??
+            _generateSemanticResponse(related) ??
+            _generateGeneralResponse(context);
+    }
+  }
+
+  String? _generateKnowledgeResponse(String message) {
+    List<KnowledgeMatch> matches = knowledgeBase?.search(message) ?? [];
+    if (matches.isEmpty) return null;
+
+    String response = '📍 ${matches.first.text}';
+    if (matches.length > 1) {
+      response += '\n\nYou might also like: ${matches.skip(1).map((match) => match.key).join(', ')}';
+    }
+    return response;
+  }
+
+  // Closest knowledge-base entries and attractions by meaning, for messages
+  // that share no keywords with them
+  String? _generateSemanticResponse(List<SemanticMatch> related) {
+    List<SemanticMatch> entries = related
+        .where((match) => match.kind != 'intent' && match.similarity >= SemanticIndex.minEntrySimilarity)
+        .toList();
+    if (entries.isEmpty) return null;
+
+    String response = '📍 ${entries.first.text}';
+    if (entries.length > 1) {
+      response += '\n\nYou might also like: ${entries.skip(1).take(3).map((match) => match.key).join(', ')}';
+    }
+    return response;
+  }
+
+  String _generateDevotionalResponse(Map<String, dynamic> context, Map<String, dynamic> realtimeData) {
+    List<String> responses = [
+      '🕉️ For spiritual seekers like yourself, I recommend starting with the Sri Aurobindo Ashram - the spiritual heart of Pondicherry. The current crowd level is ${realtimeData['crowd_levels']?['Sri Aurobindo Ashram'] ?? 'moderate'}.',
+      '🙏 The divine energy here is palpable! Visit the Mother\'s Temple for morning meditation, then explore the peaceful Matrimandir in nearby Auroville. Perfect for your spiritual journey!',
+      '✨ Pondicherry\'s spiritual landscape is extraordinary! The Manakula Vinayagar Temple by the beach offers a unique Tamil spiritual experience, while the ashrams provide French-influenced meditation practices.',
+    ];
+    
+    String response = responses[Random().nextInt(responses.length)];
+    
+    // Add personalized recommendations based on time
+    int hour = DateTime.now().hour;
+    if (hour < 10) {
+      response += '\n\n🌅 Since it\'s morning, this is perfect timing for ashram visits and meditation sessions!';
+    } else if (hour > 17) {
+      response += '\n\n🌆 Evening aarti ceremonies are particularly beautiful at local temples.';
+    }
+    
+    return response;
+  }
+
+  String _generateAdventureResponse(Map<String, dynamic> context, Map<String, dynamic> realtimeData) {
+    return '🏄‍♂️ Adventure time! Based on current conditions:\n\n'
+           '🌊 Paradise Beach: Perfect for water sports (crowd level: ${realtimeData['crowd_levels']?['Paradise Beach'] ?? 'moderate'})\n'
+           '🤿 Scuba diving at Temple Adventures\n'
+           '🚴‍♂️ Cycling tour through French Quarter\n'
+           '🌅 Sunrise kayaking in the backwaters\n\n'
+           '💡 Pro tip: Early morning adventures have fewer crowds and better weather!';
+  }
+
+  String _generateCultureResponse(Map<String, dynamic> context, Map<String, dynamic> realtimeData) {
+    return '🏛️ Pondicherry\'s Franco-Tamil culture is absolutely fascinating!\n\n'
+           '🇫🇷 French Quarter highlights:\n'
+           '• French Institute for exhibitions\n'
+           '• Notre Dame Cathedral\n'
+           '• Colonial architecture walking tour\n\n'
+           '🎭 Cultural experiences:\n'
+           '• Traditional Tamil performances\n'
+           '• French cuisine cooking classes\n'
+           '• Local artisan workshops\n\n'
+           'Current crowd at French Quarter: ${realtimeData['crowd_levels']?['French Quarter'] ?? 'moderate'}';
+  }
+
+  String _generateFoodResponse(Map<String, dynamic> context, Map<String, dynamic> realtimeData) {
+    String budgetLevel = context['budget_preference'] ?? 'moderate';
+    
+    if (budgetLevel == 'budget') {
+      return '🍽️ Delicious budget-friendly options:\n\n'
+             '• Surguru Restaurant - Authentic South Indian (₹100-250)\n'
+             '• Hot Breads - Fresh bakery items (₹50-150)\n'
+             '• Local street food at Goubert Market\n\n'
+             '🥘 Don\'t miss the unique Pondicherry fusion cuisine!';
+    } else if (budgetLevel == 'luxury') {
+      return '🍾 Premium dining experiences:\n\n'
+             '• Villa Shanti - Fine dining French cuisine\n'
+             '• Le Dupleix - Colonial elegance with fusion menu\n'
+             '• Palais de Mahe - Royal dining experience\n\n'
+             '✨ Perfect for a memorable culinary journey!';
+    } else {
+      return '🍛 Wonderful mid-range dining options:\n\n'
+             '• Cafe des Arts - French-Tamil fusion\n'
+             '• Tanto - Italian with local ingredients\n'
+             '• Indian Coffee House - Historic charm\n\n'
+             '🌶️ Mix of traditional Tamil and French colonial flavors!';
+    }
+  }
+
+  String _generateTransportResponse(Map<String, dynamic> context, Map<String, dynamic> realtimeData) {
+    return '🏍️ Getting around Pondicherry:\n\n'
+           '🚲 **Recommended: Bike Rental**\n'
+           '• French Quarter Bikes: ₹250/day\n'
+           '• Pondy Bike Rentals: ₹300/day (premium bikes)\n\n'
+           '🚗 **Alternatives:**\n'
+           '• Auto rickshaws: ₹10-15/km\n'
+           '• Taxi services: ₹12-18/km\n\n'
+           '📱 **Apps:** Ola, Uber available\n\n'
+           'Current traffic on MG Road: ${realtimeData['traffic_conditions']?['MG Road'] ?? 'moderate'}\n'
+           '💡 Tip: Bikes give you the freedom to explore narrow French Quarter lanes!';
+  }
+
+  String _generateWeatherResponse(Map<String, dynamic> realtimeData) {
+    String weather = realtimeData['weather'] ?? 'sunny';
+    return 'Current weather: $weather\n\n${_weatherAdvice[weather] ?? 'Check local weather for updates.'}';
+  }
+
+  String _generateBudgetResponse(Map<String, dynamic> context) {
+    return '💰 Smart budget planning for Pondicherry:\n\n'
+           '🏠 **Accommodation (per night):**\n'
+           '• Budget: ₹800-1500 (hostels/guesthouses)\n'
+           '• Mid-range: ₹2000-4000 (boutique hotels)\n'
+           '• Luxury: ₹5000+ (heritage properties)\n\n'
+           '🍽️ **Food (per day):**\n'
+           '• Street food/local: ₹300-500\n'
+           '• Restaurants: ₹800-1200\n'
+           '• Fine dining: ₹2000+\n\n'
+           '🚲 **Transport:** ₹250-300 (bike rental)\n'
+           '🎫 **Attractions:** Most temples free, museums ₹10-50\n\n'
+           '💡 **Money-saving tips:**\n'
+           '• Visit during off-season (June-September)\n'
+           '• Try local eateries\n'
+           '• Walk in French Quarter (it\'s small!)';
+  }
+
+  String _generateItineraryResponse(Map<String, dynamic> context, Map<String, dynamic> realtimeData) {
+    int days = context['visit_duration'] ?? 3;
+    List<String> interests = List<String>.from(context['interests'] ?? ['culture']);
+    
+    return '📅 Perfect ${days}-day itinerary for you:\n\n'
+           '**Day 1: French Colonial Heritage** 🇫🇷\n'
+           '• 9 AM: Sri Aurobindo Ashram\n'
+           '• 11 AM: French Quarter walking tour\n'
+           '• 2 PM: Pondicherry Museum\n'
+           '• 5 PM: Promenade Beach sunset\n\n'
+           '**Day 2: Adventure & Nature** 🌊\n'
+           '• 8 AM: Paradise Beach (boat ride)\n'
+           '• 1 PM: Auroville exploration\n'
+           '• 4 PM: Scuba diving session\n\n'
+           '**Day 3: Culture & Relaxation** 🎭\n'
+           '• 9 AM: Local market visit\n'
+           '• 11 AM: Cathedral and churches\n'
+           '• 3 PM: Handicraft shopping\n'
+           '• 7 PM: Traditional dinner\n\n'
+           '🚦 Real-time tip: Current traffic is ${realtimeData['traffic_conditions']?['MG Road'] ?? 'moderate'} - plan accordingly!';
+  }
+
+  String _generateGeneralResponse(Map<String, dynamic> context) {
+    List<String> responses = [
+      'I\'m here to make your Pondicherry experience unforgettable! What would you like to explore? 🌺\n\n'
+      '• 🕉️ Spiritual ashrams and temples\n'
+      '• 🏄‍♂️ Beach adventures and water sports\n'
+      '• 🏛️ French colonial culture and history\n'
+      '• 🍽️ Fusion cuisine experiences\n'
+      '• 🚲 Transportation and local tips',
+      
+      'Pondicherry is a magical blend of cultures! Tell me what interests you most:\n\n'
+      '✨ Spiritual journeys and meditation\n'
+      '🌊 Coastal adventures and beaches\n'
+      '🎭 Cultural heritage and art\n'
+      '🍜 Local cuisine and dining\n'
+      '📍 Personalized itinerary planning',
+    ];
     
-    return intentScores.entries
-        .reduce((a, b) => a.value > b.value ? a : b)
-        .key;
+    return responses[Random().nextInt(responses.length)];
   }
 
-  static double calculateSentiment(String message) {
-    List<String> positiveWords = ['good', 'great', 'amazing', 'love', 'beautiful', 'wonderful', 'excellent'];
-    List<String> negativeWords = ['bad', 'terrible', 'awful', 'hate', 'horrible', 'disappointing'];
-    
-    String lowerMessage = message.toLowerCase();
-    double sentiment = 0.0;
+  List<BotAction> _generateActions(String intent, String message, Map<String, dynamic> context) {
+    List<BotAction> actions = [];
     
-    for (String word in positiveWords) {
-      if (lowerMessage.contains(word)) sentiment += 0.1;
+    switch (intent) {
+      case 'devotional':
+        actions.add(BotAction(type: 'show_map', data: {'location': 'Sri Aurobindo Ashram'}));
+        break;
+      case 'adventure':
+        actions.add(BotAction(type: 'show_map', data: {'location': 'Paradise Beach'}));
+        break;
+      case 'itinerary':
+        actions.add(BotAction(type: 'create_itinerary', data: context));
+        break;
+      case 'weather':
+        actions.add(BotAction(type: 'show_weather', data: {}));
+        break;
     }
     
-    for (String word in negativeWords) {
-      if (lowerMessage.contains(word)) sentiment -= 0.1;
+    return actions;
+  }
+
+  String generateWelcomeMessage(Map<String, dynamic> context) {
+    List<String> welcomeMessages = _responseTemplates['welcome']!;
+    String base = welcomeMessages[Random().nextInt(welcomeMessages.length)];
+    
+    String name = context['name'] ?? '';
+    if (name.isNotEmpty) {
+      base = base.replaceFirst('Welcome', 'Welcome, $name,');
     }
     
-    return sentiment.clamp(-1.0, 1.0);
+    return base + '\n\nWhat would you like to explore today?';
+  }
+
+  String getLocalizedMessage(String key, String language) {
+    return TranslationCatalog.shared.translate(
+      key,
+      locale: TranslationService.getLanguageCode(language),
+      orElse: 'Message not available',
+    );
   }
 }
 
-// services/location_service.dart
-class LocationService {
-  static const Map<String, Map<String, double>> _pondyLocations = {
-    'Sri Aurobindo Ashram': {'lat': 11.9416, 'lng': 79.8083},
-    'French Quarter': {'lat': 11.9344, 'lng': 79.8309},
-    'Paradise Beach': {'lat': 12.0167, 'lng': 79.8667},
-    'Auroville': {'lat': 12.0051, 'lng': 79.8095},
-    'Promenade Beach': {'lat': 11.9270, 'lng': 79.8368},
-  };
+class ResponseCache {
+  final int capacity;
+  final Map<String, String> _entries = {};
+  int hits = 0;
+  int misses = 0;
 
-  static double calculateDistance(String location1, String location2) {
-    if (!_pondyLocations.containsKey(location1) || !_pondyLocations.containsKey(location2)) {
-      return 0.0;
+  ResponseCache({this.capacity = 64});
+
+  int get length => _entries.length;
+
+  double get hitRate => hits + misses == 0 ? 0.0 : hits / (hits + misses);
+
+  String putIfAbsent(String key, String Function() build) {
+    String? cached = _entries.remove(key);
+    if (cached != null) {
+      hits++;
+      _entries[key] = cached; // re-insert as most recently used
+      return cached;
     }
-    
-    var loc1 = _pondyLocations[location1]!;
-    var loc2 = _pondyLocations[location2]!;
-    
-    // Simplified distance calculation (Haversine formula would be more accurate)
-    double deltaLat = (loc1['lat']! - loc2['lat']!);
-    double deltaLng = (loc1['lng']! - loc2['lng']!);
-    
-    return sqrt(deltaLat * deltaLat + deltaLng * deltaLng) * 111; // Approximate km
+
+    misses++;
+    String response = build();
+    _entries[key] = response;
+    if (_entries.length > capacity) {
+      _entries.remove(_entries.keys.first);
+    }
+    return response;
   }
 
-  static String getTrafficCondition(String location) {
-    // Simulate real-time traffic data
-    Random random = Random();
-    List<String> conditions = ['light', 'moderate', 'heavy'];
-    return conditions[random.nextInt(conditions.length)];
+  void clear() {
+    _entries.clear();
   }
+}
 
-  static String getCrowdDensity(String location) {
-    // Simulate crowd density based on location and time
-    DateTime now = DateTime.now();
-    int hour = now.hour;
+class AIResponse {
+  final String text;
+  final String intent;
+  final double confidence;
+  final List<BotAction> actions;
+
+  AIResponse({
+    required this.text,
+    required this.intent,
+    required this.confidence,
+    required this.actions,
+  });
+}
+
+class BotAction {
+  final String type;
+  final Map<String, dynamic> data;
+
+  BotAction({required this.type, required this.data});
+}
+
+class ConversationManager {
+  final ConversationStore store;
+  final int tokenBudget;
+
+  ConversationManager({int capacity = 64, this.tokenBudget = 512})
+      : store = ConversationStore(capacity: capacity);
+
+  void addUserMessage(String message, {String intent = 'general'}) {
+    store.add(ConversationTurn(
+      role: ConversationTurn.user,
+      text: message,
+      intent: intent,
+      entities: TurnEntities.extract(message),
+    ));
+  }
+  
+  void addBotMessage(String message, {String intent = 'general'}) {
+    store.add(ConversationTurn(role: ConversationTurn.bot, text: message, intent: intent));
+  }
+
+  // What the next response gets to see, bounded by [tokenBudget]
+  ContextWindow contextWindow() => store.contextWindow(tokenBudget: tokenBudget);
+  
+  List<String> getRecentHistory() => contextWindow().toLines();
+}
+
+class PersonalizationEngine {
+  void updatePreferences(Map<String, dynamic> context, String userMessage, AIResponse response) {
+    // Update user interests based on conversation
+    String intent = response.intent;
     
-    if (location.contains('Beach') && (hour >= 17 && hour <= 20)) {
-      return 'high'; // Evening beach crowds
-    } else if (location.contains('Ashram') && (hour >= 6 && hour <= 10)) {
-      return 'moderate'; // Morning meditation
-    } else {
-      return 'low';
+    List<String> interests = List<String>.from(context['interests'] ?? []);
+    if (!interests.contains(intent) && intent != 'general') {
+      interests.add(intent);
+      context['interests'] = interests.take(5).toList(); // Keep top 5 interests
     }
+    
+    // Update visit history
+    Map<String, int> visitHistory = Map<String, int>.from(context['visit_history'] ?? {});
+    visitHistory[intent] = (visitHistory[intent] ?? 0) + 1;
+    context['visit_history'] = visitHistory;
   }
 }
 
-// services/translation_service.dart
-class TranslationService {
-  static const Map<String, Map<String, String>> _translations = {
-    'welcome': {
-      'en': 'Welcome to Pondicherry!',
-      'fr': 'Bienvenue à Pondichéry!',
-      'ta': 'பாண்டிச்சேரிக்கு வரவேற்கிறோம்!',
-      'hi': 'पांडिचेरी में आपका स्वागत है!',
-      'es': '¡Bienvenido a Pondicherry!',
-      'de': 'Willkommen in Pondicherry!',
-    },
-    'how_can_help': {
-      'en': 'How can I help you explore?',
-      'fr': 'Comment puis-je vous aider à explorer?',
-      'ta': 'நான் எப்படி உங்களுக்கு உதவ முடியும்?',
-      'hi': 'मैं आपकी कैसे मदद कर सकता हूं?',
-      'es': '¿Cómo puedo ayudarte a explorar?',
-      'de': 'Wie kann ich Ihnen beim Erkunden helfen?',
-    },
-    'spiritual_places': {
-      'en': 'Spiritual Places',
-      'fr': 'Lieux Spirituels',
-      'ta': 'ஆன்மீக இடங்கள்',
-      'hi': 'आध्यात्मिक स्थान',
-      'es': 'Lugares Espirituales',
-      'de': 'Spirituelle Orte',
-    },
-    'adventure_spots': {
-      'en': 'Adventure Spots',
-      'fr': 'Spots d\'Aventure',
-      'ta': 'சாகசிக இடங்கள்',
-      'hi': 'साहसिक स्थान',
-      'es': 'Lugares de Aventura',
-      'de': 'Abenteuer-Spots',
-    },
-    'current_crowd': {
-      'en': 'Current crowd level',
-      'fr': 'Niveau de foule actuel',
-      'ta': 'தற்போதைய கூட்ட அளவு',
-      'hi': 'वर्तमान भीड़ का स्तर',
-      'es': 'Nivel de multitud actual',
-      'de': 'Aktuelle Menschenmenge',
-    },
-    'best_time': {
-      'en': 'Best time to visit',
-      'fr': 'Meilleur moment pour visiter',
-      'ta': 'பார்வையிட சிறந்த நேரம்',
-      'hi': 'यात्रा का सबसे अच्छा समय',
-      'es': 'Mejor momento para visitar',
-      'de': 'Beste Besuchszeit',
-    },
-  };
+class ChatQuery {
+  final String sessionId;
+  final String message;
 
-  static String translate(String key, String languageCode) {
-    return _translations[key]?[languageCode] ?? _translations[key]?['en'] ?? key;
+  const ChatQuery({
+    required this.message,
+    this.sessionId = 'default',
+  });
+}
+
+class _ChatSession {
+  Map<String, dynamic> context;
+  final ConversationManager conversation = ConversationManager();
+
+  _ChatSession(this.context);
+}
+
+// The conversation pipeline (ChatbotAI, ConversationManager and
+// PersonalizationEngine) without any widget, animation or TTS dependency.
+// The chat screen is one client; servers and load harnesses can drive it
+// directly through respond() and respondBatch().
+class ChatbotEngine {
+  final ChatbotAI ai;
+  final PersonalizationEngine personalization = PersonalizationEngine();
+  final Map<String, dynamic> realtimeData;
+  final Map<String, _ChatSession> _sessions = {};
+
+  ChatbotEngine({ChatbotAI? ai, Map<String, dynamic>? realtimeData})
+      : ai = ai ?? ChatbotAI(),
+        realtimeData = realtimeData ?? defaultRealtimeData();
+
+  static Map<String, dynamic> defaultContext() {
+    return {
+      'name': '',
+      'interests': <String>[],
+      'budget_preference': 'moderate',
+      'current_location': '',
+      'visit_history': <String, int>{},
+      'preferred_time': 'flexible',
+      'group_size': 1,
+      'visit_duration': 3, // days
+    };
   }
 
-  static String getLanguageCode(String language) {
-    Map<String, String> languageCodes = {
-      'English': 'en',
-      'French': 'fr',
-      'Tamil': 'ta',
-      'Hindi': 'hi',
-      'Spanish': 'es',
-      'German': 'de',
+  static Map<String, dynamic> defaultRealtimeData() {
+    return {
+      'weather': 'sunny',
+      'traffic_conditions': {},
+      'crowd_levels': {},
+      'events_today': [],
+      'special_offers': [],
     };
-    return languageCodes[language] ?? 'en';
+  }
+
+  int get sessionCount => _sessions.length;
+
+  Map<String, dynamic> contextFor(String sessionId) {
+    return _session(sessionId).context;
+  }
+
+  void setContext(String sessionId, Map<String, dynamic> context) {
+    _session(sessionId).context = context;
+  }
+
+  void endSession(String sessionId) {
+    _sessions.remove(sessionId);
+  }
+
+  void updateRealtimeData(Map<String, dynamic> updates) {
+    realtimeData.addAll(updates);
+    ai.onRealtimeDataUpdated();
+  }
+
+  void applySnapshot(RealtimeSnapshot snapshot) {
+    realtimeData
+      ..clear()
+      ..addAll(snapshot.toJson());
+    ai.onRealtimeDataUpdated(snapshot.version);
+  }
+
+  AIResponse respond(ChatQuery query) {
+    _ChatSession session = _session(query.sessionId);
+
+    // History up to, not including, this message
+    AIResponse response = ai.respond(
+      message: query.message,
+      context: session.context,
+      conversationHistory: session.conversation.contextWindow().turns,
+      realtimeData: realtimeData,
+    );
+
+    session.conversation.addUserMessage(query.message, intent: response.intent);
+    session.conversation.addBotMessage(response.text, intent: response.intent);
+    personalization.updatePreferences(session.context, query.message, response);
+    return response;
+  }
+
+  List<AIResponse> respondBatch(List<ChatQuery> queries) {
+    return queries.map(respond).toList(growable: false);
+  }
+
+  _ChatSession _session(String sessionId) {
+    return _sessions.putIfAbsent(sessionId, () => _ChatSession(defaultContext()));
   }
 }
 
-// services/itinerary_service.dart
-class ItineraryService {
-  static Map<String, dynamic> generateItinerary({
-    required int days,
-    required List<String> interests,
-    required String budget,
-    String? startLocation,
+// services/poi_catalog.dart
+// Points of interest loaded from the on-disk catalog (assets/data/
+// pondy_catalog.json) instead of a literal rebuilt per screen. The file is
+// read on first use and parsed once per process; category, location and
+// name indexes are built alongside and shared by every session.
+class PoiCatalog {
+  static const String assetPath = 'assets/data/pondy_catalog.json';
+
+  static Future<PoiCatalog>? _shared;
+
+  final List<Attraction> attractions;
+  final List<Event> events;
+  final List<BikeRental> bikeRentals;
+  final Map<String, List<Attraction>> _byCategory = {};
+  final Map<String, List<Attraction>> _byLocation = {};
+  final Map<String, Attraction> _byName = {};
+
+  PoiCatalog({
+    required this.attractions,
+    required this.events,
+    required this.bikeRentals,
   }) {
-    Map<String, dynamic> itinerary = {
-      'days': [],
-      'total_estimated_cost': 0,
-      'transportation_tips': [],
-      'weather_considerations': [],
+    for (Attraction attraction in attractions) {
+      (_byCategory[attraction.category] ??= []).add(attraction);
+      (_byLocation[attraction.location] ??= []).add(attraction);
+      _byName[attraction.name] = attraction;
+    }
+  }
+
+  factory PoiCatalog.fromJson(String source) {
+    Map<String, dynamic> json = jsonDecode(source);
+    return PoiCatalog(
+      attractions: List<Attraction>.unmodifiable(
+        (json['attractions'] as List? ?? []).map((entry) => Attraction.fromJson(entry)),
+      ),
+      events: List<Event>.unmodifiable(
+        (json['events'] as List? ?? []).map((entry) => Event.fromJson(entry)),
+      ),
+      bikeRentals: List<BikeRental>.unmodifiable(
+        (json['bike_rentals'] as List? ?? []).map((entry) => BikeRental.fromJson(entry)),
+      ),
+    );
+  }
+
+  // Loads the catalog once per process; later callers share the same
+  // instance. Coordinates are registered with LocationService and a
+  // planner over the attractions with ItineraryService on load.
+  static Future<PoiCatalog> load(Future<String> Function() read) {
+    return _shared ??= _load(read);
+  }
+
+  // A failed read is not cached, so the next caller tries again
+  static Future<PoiCatalog> _load(Future<String> Function() read) async {
+    try {
+      PoiCatalog catalog = PoiCatalog.fromJson(await read());
+      LocationService.registerLocations(catalog.coordinates);
+      ItineraryService.usePlanner(ItineraryPlanner(catalog.attractions));
+      return catalog;
+    } catch (_) {
+      _shared = null;
+      rethrow;
+    }
+  }
+
+  List<Attraction> byCategory(String category) => _byCategory[category] ?? const [];
+
+  List<Attraction> atLocation(String location) => _byLocation[location] ?? const [];
+
+  Attraction? named(String name) => _byName[name];
+
+  Map<String, GeoPoint> get coordinates {
+    return {
+      for (Attraction attraction in attractions)
+        if (attraction.coordinates != null) attraction.name: attraction.coordinates!,
     };
+  }
+}
 
-    for (int day = 1; day <= days; day++) {
-      Map<String, dynamic> dayPlan = {
-        'day': day,
-        'theme': _getDayTheme(day, interests),
-        'activities': _getActivitiesForDay(day, interests),
-        'meals': _getMealRecommendations(),
-        'transportation': _getTransportationForDay(day),
-        'estimated_cost': _calculateDayCost(day, budget),
-        'crowd_predictions': _getCrowdPredictions(day),
-      };
-      itinerary['days'].add(dayPlan);
+// services/pondy_guide.dart
+// Keyword-driven responder behind the home page chat. Kept free of widgets
+// so it can be benchmarked and reused outside the screen.
+class PondyGuide {
+  final PoiCatalog catalog;
+
+  PondyGuide(this.catalog);
+
+  String respond(String message) {
+    switch (IntentClassifier.shared.classify(message).intent) {
+      case 'devotional':
+        return _generateDevotionalRecommendations();
+      case 'adventure':
+        return _generateAdventureRecommendations();
+      case 'party':
+        return _generatePartyRecommendations();
+      case 'transport':
+        return _generateBikeRentalInfo();
+      case 'events':
+        return _generateEventInfo();
+      case 'itinerary':
+        return _generateItinerary();
+      case 'budget':
+        return _generateBudgetPlan();
+      case 'language':
+        return _handleLanguageChange(message);
+      default:
+        return _generateGeneralResponse();
     }
+  }
 
-    itinerary['total_estimated_cost'] = _calculateTotalCost(days, budget);
-    itinerary['transportation_tips'] = _getTransportationTips();
-    itinerary['weather_considerations'] = _getWeatherConsiderations();
+  String _generateDevotionalRecommendations() {
+    List<Attraction> devotionalSpots = catalog.byCategory('devotional');
+    StringBuffer response = StringBuffer();
+    
+    response.writeln('🕉️ Here are some spiritual places in Pondicherry:');
+    response.writeln();
+    
+    for (Attraction spot in devotionalSpots) {
+      response.writeln('📍 ${spot.name}');
+      response.writeln('   ${spot.description}');
+      response.writeln('   Location: ${spot.location}');
+      response.writeln('   Best time: ${spot.bestTime.key}');
+      response.writeln('   Story: ${spot.story}');
+      response.writeln('   Current crowd: ${spot.crowdLevel.name}');
+      response.writeln();
+    }
+    
+    response.writeln('Would you like me to create a spiritual itinerary for you? 🙏');
+    return response.toString();
+  }
 
-    return itinerary;
+  String _generateAdventureRecommendations() {
+    List<Attraction> adventureSpots = catalog.byCategory('adventure');
+    StringBuffer response = StringBuffer();
+    
+    response.writeln('🏄‍♂️ Adventure awaits in Pondicherry!');
+    response.writeln();
+    
+    for (Attraction spot in adventureSpots) {
+      response.writeln('🌊 ${spot.name}');
+      response.writeln('   ${spot.description}');
+      response.writeln('   Location: ${spot.location}');
+      response.writeln('   Best time: ${spot.bestTime.key}');
+      response.writeln('   Story: ${spot.story}');
+      response.writeln('   Current crowd: ${spot.crowdLevel.name}');
+      response.writeln();
+    }
+    
+    response.writeln('💡 Tip: Early morning visits help avoid crowds! Would you like transportation recommendations?');
+    return response.toString();
   }
 
-  static String _getDayTheme(int day, List<String> interests) {
-    List<String> themes = [];
-    if (interests.contains('devotional')) themes.add('Spiritual Journey');
-    if (interests.contains('adventure')) themes.add('Adventure & Nature');
-    if (interests.contains('culture')) themes.add('Cultural Exploration');
-    if (interests.contains('food')) themes.add('Culinary Experience');
+  String _generatePartyRecommendations() {
+    List<Attraction> partySpots = catalog.byCategory('party');
+    StringBuffer response = StringBuffer();
     
-    if (themes.isEmpty) themes = ['Cultural Exploration', 'Adventure & Nature', 'Spiritual Journey'];
+    response.writeln('🎉 Let\'s explore Pondy\'s nightlife!');
+    response.writeln();
     
-    return themes[(day - 1) % themes.length];
+    for (Attraction spot in partySpots) {
+      response.writeln('🍹 ${spot.name}');
+      response.writeln('   ${spot.description}');
+      response.writeln('   Location: ${spot.location}');
+      response.writeln('   Best time: ${spot.bestTime.key}');
+      response.writeln('   Story: ${spot.story}');
+      response.writeln('   Current crowd: ${spot.crowdLevel.name}');
+      response.writeln();
+    }
+    
+    response.writeln('🚨 Safety tip: Always travel in groups and inform someone about your plans!');
+    return response.toString();
   }
 
-  static List<Map<String, dynamic>> _getActivitiesForDay(int day, List<String> interests) {
-    Map<int, List<Map<String, dynamic>>> dayActivities = {
-      1: [
-        {
-          'time': '08:00',
-          'activity': 'Sri Aurobindo Ashram Visit',
-          'duration': '2 hours',
-          'location': 'White Town',
-          'type': 'devotional',
-        },
-        {
-          'time': '11:00',
-          'activity': 'French Quarter Walking Tour',
-          'duration': '3 hours',
-          'location': 'French Quarter',
-          'type': 'culture',
-        },
-        {
-          'time': '17:00',
-          'activity': 'Promenade Beach Sunset',
-          'duration': '2 hours',
-          'location': 'Promenade Beach',
-          'type': 'relaxation',
-        },
-      ],
-      2: [
-        {
-          'time': '07:00',
-          'activity': 'Paradise Beach Trip',
-          'duration': '4 hours',
-          'location': 'Chunnambar',
-          'type': 'adventure',
-        },
-        {
-          'time': '14:00',
-          'activity': 'Auroville Exploration',
-          'duration': '3 hours',
-          'location': 'Auroville',
-          'type': 'spiritual',
-        },
-        {
-          'time': '19:00',
-          'activity': 'Local Market Visit',
-          'duration': '2 hours',
-          'location': 'Mission Street',
-          'type': 'culture',
-        },
-      ],
-      3: [
-        {
-          'time': '09:00',
-          'activity': 'Scuba Diving Experience',
-          'duration': '3 hours',
-          'location': 'Auroville Beach',
-          'type': 'adventure',
-        },
-        {
-          'time': '15:00',
-          'activity': 'Cathedral Visit',
-          'duration': '1 hour',
-          'location': 'Mission Street',
-          'type': 'devotional',
-        },
-        {
-          'time': '21:00',
-          'activity': 'Le Club Nightlife',
-          'duration': '3 hours',
-          'location': 'Promenade Beach',
-          'type': 'party',
-        },
-      ],
-    };
+  String _generateBikeRentalInfo() {
+    List<BikeRental> rentals = catalog.bikeRentals;
+    StringBuffer response = StringBuffer();
+    
+    response.writeln('🏍️ Bike Rental Options in Pondicherry:');
+    response.writeln();
+    
+    for (BikeRental rental in rentals) {
+      response.writeln('🚲 ${rental.name}');
+      response.writeln('   Location: ${rental.location}');
+      response.writeln('   Price: ₹${rental.pricePerDay}/day');
+      response.writeln('   Available bikes: ${rental.types.join(', ')}');
+      response.writeln('   Contact: ${rental.contact}');
+      response.writeln();
+    }
+    
+    response.writeln('📋 Required documents: Valid ID, Driving License');
+    response.writeln('💡 Tip: Book in advance during peak season!');
+    return response.toString();
+  }
+
+  String _generateEventInfo() {
+    List<Event> events = catalog.events;
+    StringBuffer response = StringBuffer();
+    
+    response.writeln('🎭 Upcoming Events in Pondicherry:');
+    response.writeln();
+    
+    for (Event event in events) {
+      response.writeln('🎪 ${event.name}');
+      response.writeln('   Date: ${event.date}');
+      response.writeln('   Location: ${event.location}');
+      response.writeln('   ${event.description}');
+      response.writeln();
+    }
+    
+    response.writeln('Would you like me to add any of these events to your itinerary?');
+    return response.toString();
+  }
+
+  String _generateItinerary() {
+    StringBuffer response = StringBuffer();
+    
+    response.writeln('📅 Suggested 3-Day Pondicherry Itinerary:');
+    response.writeln();
+    
+    response.writeln('Day 1: French Heritage 🇫🇷');
+    response.writeln('• Morning: Sri Aurobindo Ashram');
+    response.writeln('• Afternoon: French Quarter walk');
+    response.writeln('• Evening: Promenade Beach sunset');
+    response.writeln();
+    
+    response.writeln('Day 2: Adventure & Nature 🌊');
+    response.writeln('• Morning: Paradise Beach (boat ride)');
+    response.writeln('• Afternoon: Auroville exploration');
+    response.writeln('• Evening: Scuba diving session');
+    response.writeln();
+    
+    response.writeln('Day 3: Culture & Relaxation 🎭');
+    response.writeln('• Morning: Local market visit');
+    response.writeln('• Afternoon: Cathedral visit');
+    response.writeln('• Evening: Le Club for nightlife');
+    response.writeln();
+    
+    response.writeln('⏰ Current traffic conditions suggest starting early morning for better experience!');
+    response.writeln('Would you like me to customize this based on your preferences?');
+    
+    return response.toString();
+  }
+
+  String _generateBudgetPlan() {
+    StringBuffer response = StringBuffer();
+    
+    response.writeln('💰 Budget-Friendly Pondicherry Plan:');
+    response.writeln();
+    
+    response.writeln('🏠 Accommodation (per night):');
+    response.writeln('• Budget: ₹800-1500 (hostels/guesthouses)');
+    response.writeln('• Mid-range: ₹2000-4000 (boutique hotels)');
+    response.writeln();
+    
+    response.writeln('🍽️ Food (per day):');
+    response.writeln('• Local eateries: ₹400-600');
+    response.writeln('• Mid-range restaurants: ₹800-1200');
+    response.writeln();
+    
+    response.writeln('🚲 Transportation:');
+    response.writeln('• Bike rental: ₹250-300/day');
+    response.writeln('• Auto/taxi: ₹500-800/day');
+    response.writeln();
+    
+    response.writeln('🎫 Attractions:');
+    response.writeln('• Most spiritual sites: Free');
+    response.writeln('• Museums: ₹10-50');
+    response.writeln('• Adventure activities: ₹500-2000');
+    response.writeln();
+    
+    response.writeln('💡 Total budget estimate: ₹1500-3000 per day');
+    response.writeln('Would you like specific money-saving tips?');
+    
+    return response.toString();
+  }
 
-    return dayActivities[day] ?? dayActivities[1]!;
-  }
-
-  static List<Map<String, dynamic>> _getMealRecommendations() {
-    return [
-      {
-        'meal': 'Breakfast',
-        'recommendation': 'Baker Street Cafe',
-        'cuisine': 'French-Indian Fusion',
-        'price_range': '₹200-400',
-      },
-      {
-        'meal': 'Lunch',
-        'recommendation': 'Surguru Restaurant',
-        'cuisine': 'South Indian',
-        'price_range': '₹150-300',
-      },
-      {
-        'meal': 'Dinner',
-        'recommendation': 'Villa Shanti',
-        'cuisine': 'Continental',
-        'price_range': '₹800-1500',
-      },
+  String _handleLanguageChange(String message) {
+    return 'To change language, please use the language selector at the top. I support English, French, Tamil, Hindi, Spanish, and German! 🌍';
+  }
+
+  String _generateGeneralResponse() {
+    List<String> responses = [
+      'I can help you with:\n• Tourist attractions (devotional, adventure, party spots)\n• Bike rentals and transportation\n• Cultural events and festivals\n• Budget planning\n• Custom itineraries\n• Real-time crowd and traffic updates\n\nWhat interests you most?',
+      'Pondicherry is beautiful! I can guide you through its French colonial charm, spiritual ashrams, pristine beaches, and vibrant culture. What aspect would you like to explore?',
+      'As your travel companion, I\'m here to make your Pondicherry experience unforgettable! Tell me about your interests - adventure, spirituality, culture, or nightlife?',
     ];
+    
+    return responses[Random().nextInt(responses.length)];
+  }
+}
+
+// models/poi.dart
+enum CrowdLevel {
+  low,
+  moderate,
+  high;
+
+  static CrowdLevel parse(String? name) {
+    return values.firstWhere((level) => level.name == name, orElse: () => moderate);
+  }
+}
+
+enum VisitTime {
+  earlyMorning('early_morning', 330, 480),
+  morning('morning', 480, 720),
+  afternoon('afternoon', 720, 1020),
+  evening('evening', 1020, 1200),
+  night('night', 1200, 1440),
+  anytime('', 480, 1320);
+
+  final String key;
+  // Window in which a visit should start, in minutes after midnight
+  final int startMinute;
+  final int endMinute;
+
+  const VisitTime(this.key, this.startMinute, this.endMinute);
+
+  static VisitTime parse(String? key) {
+    return values.firstWhere((time) => time.key == key, orElse: () => anytime);
+  }
+}
+
+class Attraction {
+  final String name;
+  final String category;
+  final String description;
+  final String location;
+  final GeoPoint? coordinates;
+  final CrowdLevel crowdLevel;
+  final VisitTime bestTime;
+  final String story;
+  final int durationMinutes;
+  final int cost; // entry or activity fee in rupees
+  final int opensMinute; // minutes after midnight
+  final int closesMinute;
+
+  const Attraction({
+    required this.name,
+    required this.category,
+    required this.description,
+    required this.location,
+    this.coordinates,
+    required this.crowdLevel,
+    required this.bestTime,
+    required this.story,
+    this.durationMinutes = 90,
+    this.cost = 0,
+    this.opensMinute = 0,
+    this.closesMinute = 1440,
+  });
+
+  static Attraction fromJson(Map<String, dynamic> json) {
+    return Attraction(
+      name: json['name'],
+      category: json['category'],
+      description: json['description'] ?? '',
+      location: json['location'] ?? '',
+      coordinates: json['lat'] == null || json['lng'] == null
+          ? null
+          : GeoPoint((json['lat'] as num).toDouble(), (json['lng'] as num).toDouble()),
+      crowdLevel: CrowdLevel.parse(json['crowd_level']),
+      bestTime: VisitTime.parse(json['best_time']),
+      story: json['story'] ?? '',
+      durationMinutes: json['duration_minutes'] ?? 90,
+      cost: json['cost'] ?? 0,
+      opensMinute: _parseClock(json['opens'], 0),
+      closesMinute: _parseClock(json['closes'], 1440),
+    );
   }
 
-  static Map<String, dynamic> _getTransportationForDay(int day) {
+  Map<String, dynamic> toJson() {
     return {
-      'recommended': 'Bike Rental',
-      'cost': '₹300/day',
-      'alternatives': ['Auto Rickshaw', 'Taxi', 'Walking'],
-      'tips': 'Book bike early morning for best rates',
+      'name': name,
+      'category': category,
+      'description': description,
+      'location': location,
+      if (coordinates != null) 'lat': coordinates!.lat,
+      if (coordinates != null) 'lng': coordinates!.lng,
+      'crowd_level': crowdLevel.name,
+      'best_time': bestTime.key,
+      'story': story,
+      'duration_minutes': durationMinutes,
+      'cost': cost,
+      'opens': _formatClock(opensMinute),
+      'closes': _formatClock(closesMinute),
     };
   }
 
-  static int _calculateDayCost(int day, String budget) {
-    Map<String, int> budgetRanges = {
-      'budget': 1500,
-      'moderate': 2500,
-      'luxury': 4000,
+  static int _parseClock(String? clock, int fallback) {
+    if (clock == null) return fallback;
+    List<String> parts = clock.split(':');
+    return int.parse(parts[0]) * 60 + int.parse(parts[1]);
+  }
+
+  static String _formatClock(int minute) {
+    return '${(minute ~/ 60).toString().padLeft(2, '0')}:${(minute % 60).toString().padLeft(2, '0')}';
+  }
+}
+
+class Event {
+  final String name;
+  final String date;
+  final String location;
+  final String description;
+
+  const Event({
+    required this.name,
+    required this.date,
+    required this.location,
+    required this.description,
+  });
+
+  static Event fromJson(Map<String, dynamic> json) {
+    return Event(
+      name: json['name'],
+      date: json['date'] ?? '',
+      location: json['location'] ?? '',
+      description: json['description'] ?? '',
+    );
+  }
+
+  Map<String, dynamic> toJson() {
+    return {
+      'name': name,
+      'date': date,
+      'location': location,
+      'description': description,
     };
-    return budgetRanges[budget] ?? 2500;
   }
+}
 
-  static int _calculateTotalCost(int days, String budget) {
-    return _calculateDayCost(1, budget) * days;
+class BikeRental {
+  final String name;
+  final String location;
+  final int pricePerDay;
+  final List<String> types;
+  final String contact;
+
+  const BikeRental({
+    required this.name,
+    required this.location,
+    required this.pricePerDay,
+    required this.types,
+    required this.contact,
+  });
+
+  static BikeRental fromJson(Map<String, dynamic> json) {
+    return BikeRental(
+      name: json['name'],
+      location: json['location'] ?? '',
+      pricePerDay: json['price_per_day'] ?? 0,
+      types: List<String>.unmodifiable(json['types'] ?? const []),
+      contact: json['contact'] ?? '',
+    );
   }
 
-  static List<String> _getTransportationTips() {
-    return [
-      'Rent a bike for maximum flexibility',
-      'Avoid peak hours (8-10 AM, 5-7 PM) for better traffic',
-      'Keep your documents handy',
-      'Wear helmet at all times',
-      'Use GPS navigation for unfamiliar routes',
-    ];
+  Map<String, dynamic> toJson() {
+    return {
+      'name': name,
+      'location': location,
+      'price_per_day': pricePerDay,
+      'types': types,
+      'contact': contact,
+    };
   }
+}
 
-  static List<String> _getWeatherConsiderations() {
-    return [
-      'Carry sunscreen and hat for daytime activities',
-      'Keep light jacket for evening beach visits',
-      'Monsoon season (June-September): Carry umbrella',
-      'Best visiting months: October to March',
-    ];
+class Activity {
+  final int startMinute; // minutes after midnight
+  final int durationMinutes;
+  final String name;
+  final String location;
+  final String type;
+  final int cost;
+
+  const Activity({
+    required this.startMinute,
+    required this.durationMinutes,
+    required this.name,
+    required this.location,
+    required this.type,
+    this.cost = 0,
+  });
+
+  int get endMinute => startMinute + durationMinutes;
+
+  String get time => '${(startMinute ~/ 60).toString().padLeft(2, '0')}:${(startMinute % 60).toString().padLeft(2, '0')}';
+
+  String get duration {
+    int hours = durationMinutes ~/ 60;
+    int minutes = durationMinutes % 60;
+    if (minutes != 0) return hours == 0 ? '$minutes min' : '$hours h $minutes min';
+    return hours == 1 ? '1 hour' : '$hours hours';
+  }
+
+  static Activity fromJson(Map<String, dynamic> json) {
+    List<String> clock = (json['time'] as String? ?? '00:00').split(':');
+    return Activity(
+      startMinute: int.parse(clock[0]) * 60 + int.parse(clock[1]),
+      durationMinutes: json['duration_minutes'] ?? 60,
+      name: json['activity'],
+      location: json['location'] ?? '',
+      type: json['type'] ?? '',
+      cost: json['cost'] ?? 0,
+    );
   }
 
-  static Map<String, dynamic> _getCrowdPredictions(int day) {
+  Map<String, dynamic> toJson() {
     return {
-      'morning': 'Low to Moderate',
-      'afternoon': 'Moderate to High',
-      'evening': 'High (especially beaches)',
-      'night': 'Low to Moderate',
+      'time': time,
+      'activity': name,
+      'duration': duration,
+      'duration_minutes': durationMinutes,
+      'location': location,
+      'type': type,
+      'cost': cost,
     };
   }
 }
 
-// services/recommendation_engine.dart
-class RecommendationEngine {
-  static List<Map<String, dynamic>> getPersonalizedRecommendations({
-    required Map<String, dynamic> userPreferences,
-    required String currentLocation,
-    required String timeOfDay,
-  }) {
-    List<Map<String, dynamic>> recommendations = [];
-    
-    // Sample recommendation logic
-    if (userPreferences['interests']?.contains('adventure') == true) {
-      recommendations.addAll(_getAdventureRecommendations(timeOfDay));
-    }
-    
-    if (userPreferences['interests']?.contains('devotional') == true) {
-      recommendations.addAll(_getDevotionalRecommendations(timeOfDay));
-    }
-    
-    if (userPreferences['budget'] == 'budget') {
-      recommendations = recommendations.where((rec) => 
-        rec['cost_level'] == 'low' || rec['cost_level'] == 'moderate'
-      ).toList();
-    }
-    
-    // Sort by relevance score
-    recommendations.sort((a, b) => 
-      (b['relevance_score'] as double).compareTo(a['relevance_score'] as double)
-    );
-    
-    return recommendations.take(5).toList();
-  }
-
-  static List<Map<String, dynamic>> _getAdventureRecommendations(String timeOfDay) {
-    if (timeOfDay == 'morning') {
-      return [
-        {
-          'name': 'Paradise Beach Adventure',
-          'type': 'adventure',
-          'relevance_score': 0.9,
-          'cost_level': 'moderate',
-          'description': 'Boat ride and water sports',
-        },
-        {
-          'name': 'Cycling Tour',
-          'type': 'adventure',
-          'relevance_score': 0.8,
-          'cost_level': 'low',
-          'description': 'Explore French Quarter on bike',
-        },
-      ];
-    } else if (timeOfDay == 'afternoon') {
-      return [
-        {
-          'name': 'Scuba Diving',
-          'type': 'adventure',
-          'relevance_score': 0.9,
-          'cost_level': 'high',
-          'description': 'Underwater exploration',
-        },
-      ];
-    }
-    return [];
-  }
-
-  static List<Map<String, dynamic>> _getDevotionalRecommendations(String timeOfDay) {
-    if (timeOfDay == 'morning') {
-      return [
-        {
-          'name': 'Sri Aurobindo Ashram',
-          'type': 'devotional',
-          'relevance_score': 0.95,
-          'cost_level': 'low',
-          'description': 'Morning meditation session',
-        },
-        {
-          'name': 'Manakula Vinayagar Temple',
-          'type': 'devotional',
-          'relevance_score': 0.8,
-          'cost_level': 'low',
-          'description': 'Ancient Ganesha temple',
-        },
-      ];
-    }
-    return [];
-  }
-
-  static Map<String, dynamic> optimizeRoute(List<String> destinations) {
-    // Simple route optimization (in production, use Google Maps API)
+class Meal {
+  final String meal;
+  final String recommendation;
+  final String cuisine;
+  final int minPrice;
+  final int maxPrice;
+
+  const Meal({
+    required this.meal,
+    required this.recommendation,
+    required this.cuisine,
+    required this.minPrice,
+    required this.maxPrice,
+  });
+
+  String get priceRange => '₹$minPrice-$maxPrice';
+
+  static Meal fromJson(Map<String, dynamic> json) {
+    return Meal(
+      meal: json['meal'],
+      recommendation: json['recommendation'] ?? '',
+      cuisine: json['cuisine'] ?? '',
+      minPrice: json['min_price'] ?? 0,
+      maxPrice: json['max_price'] ?? 0,
+    );
+  }
+
+  Map<String, dynamic> toJson() {
     return {
-      'optimized_order': destinations,
-      'total_distance': '15 km',
-      'estimated_time': '2 hours',
-      'fuel_cost': '₹150',
-      'traffic_condition': 'moderate',
+      'meal': meal,
+      'recommendation': recommendation,
+      'cuisine': cuisine,
+      'price_range': priceRange,
+      'min_price': minPrice,
+      'max_price': maxPrice,
     };
   }
 }